@@ -13,7 +13,18 @@ logger.debug(f"Loaded configuration from database: {config}")
 
 container = get_container()
 container.config.from_dict(config.model_dump())
-container.wire(["genai_monitor.registration.api"])
+container.wire(
+    [
+        "genai_monitor.registration.api",
+        "genai_monitor.write_behind",
+        "genai_monitor.streaming",
+        "genai_monitor.sampling",
+        "genai_monitor.latency",
+        "genai_monitor.context",
+        "genai_monitor.leases",
+        "genai_monitor.query.api",
+    ]
+)
 logger.success(f"Configured Dependency Container with values: {config}")
 
 logger.debug("User registration module imported.")
@@ -17,3 +17,11 @@ class NotJsonableError(Exception):
 
     def __init__(self, o: object):
         super().__init__(f"Object {o} is not jsonable!")
+
+
+class GenerationTakenOverError(Exception):
+    """Raised when a call waiting for a generation takes over its expired lease and has to generate it itself."""
+
+    def __init__(self, sample_id: int):
+        super().__init__(f"Took over the expired lease of generation {sample_id}.")
+        self.sample_id = sample_id
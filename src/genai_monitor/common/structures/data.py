@@ -1,7 +1,8 @@
-from typing import TYPE_CHECKING, Any, ClassVar, Dict, List, Optional, Type, Union
+from typing import TYPE_CHECKING, Any, ClassVar, Dict, List, Mapping, Optional, Type, Union
 
-from attrs import define, field
+from attrs import define, field, fields_dict
 from loguru import logger
+from sqlalchemy import Row, inspect
 
 from genai_monitor.common.errors import NotJsonableError
 from genai_monitor.common.utils import is_jsonable
@@ -34,10 +35,43 @@ class ORMConvertible:
         field_values = cls._get_field_values_from_orm(orm_instance=orm_instance)
         return cls(**field_values)
 
+    @classmethod
+    def from_row(cls, row: Union[Row, Mapping[str, Any], BaseModel]) -> "ORMConvertible":
+        """Gets a dataclass instance from the column values of a row, leaving its relationships unset.
+
+        Unlike `from_orm`, the relationships are neither loaded nor converted, so the conversion does not depend on
+        the size of the related collections.
+
+        Args:
+            row: A row selected with `DBManager.search_columns`, a mapping of column names to values or an ORM
+                instance. The columns which are not fields of the dataclass are ignored.
+
+        Returns:
+            A dataclass instance.
+        """
+        if isinstance(row, BaseModel):
+            values = {column: getattr(row, column) for column in row.columns}
+        elif isinstance(row, Row):
+            values = row._mapping
+        else:
+            values = row
+
+        field_names = fields_dict(cls)
+        return cls(
+            **{
+                name: value
+                for name, value in values.items()
+                if name in field_names and name not in cls._from_orm_excluded_fields
+            }
+        )
+
     @classmethod
     def _get_field_values_from_orm(cls, orm_instance: BaseModel) -> Dict[str, Any]:
         """Gets values of dataclass fields from its corresponding ORM class.
 
+        Only the relationships of the dataclass fields which are already loaded are converted, so that the conversion
+        neither queries the database nor serializes unrelated collections.
+
         Args:
             orm_instance: The instance of ORM class from SQLAlchemy.
 
@@ -47,16 +81,27 @@ class ORMConvertible:
         Raises:
             ValueError if an incompatible ORM class is provided for conversion.
         """
-        data_dict = orm_instance.to_dict(nested=True)
+        field_names = fields_dict(cls)
+        unloaded_relations = inspect(orm_instance).unloaded
+        data_dict = {column: getattr(orm_instance, column) for column in orm_instance.columns}
+        for relation in orm_instance.relations:
+            if relation not in field_names or relation in unloaded_relations:
+                continue
+            related = getattr(orm_instance, relation)
+            if isinstance(related, BaseModel):
+                data_dict[relation] = related.to_dict()
+            elif related is not None:
+                data_dict[relation] = [item.to_dict() for item in related]
+
         for field_ in cls._relationship_fields:
-            field_value = data_dict.get(field_, None)
+            field_value = data_dict.get(field_)
             if field_value is not None:
                 data_dict[field_] = cls._instantiate_related(field_name=field_, value=data_dict[field_])
 
         field_values = {
             field_: field_value
             for field_, field_value in data_dict.items()
-            if (field not in cls._from_orm_excluded_fields) and (not field_.startswith("_"))
+            if (field_ not in cls._from_orm_excluded_fields) and (not field_.startswith("_"))
         }
 
         return field_values
@@ -189,6 +234,15 @@ class Sample(ORMConvertible):
     version: Optional[str] = field(
         default=None, metadata={"description": "GenAI Monitor database version identifier for the sample."}
     )
+    lease_owner: Optional[str] = field(
+        default=None, metadata={"description": "Identifier of the process generating the in-progress sample."}
+    )
+    lease_expires_at: Optional[float] = field(
+        default=None, metadata={"description": "Unix time after which the generation of the sample can be taken over."}
+    )
+    heartbeat_at: Optional[float] = field(
+        default=None, metadata={"description": "Unix time of the last renewal of the generation lease."}
+    )
 
     data: Optional[bytes] = None
     conditioning: Optional[Conditioning] = None
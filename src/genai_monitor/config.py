@@ -1,4 +1,9 @@
-from pydantic_settings import BaseSettings
+from typing import Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from genai_monitor.db.sqlite import DEFAULT_SQLITE_PRAGMAS
 
 
 class PersistencyManagerConfig(BaseSettings):
@@ -8,10 +13,36 @@ class PersistencyManagerConfig(BaseSettings):
     path: str
 
 
+class SQLiteConfig(BaseSettings):
+    """The pragmas set on the connections to a SQLite database, the pragmas set to None keep the SQLite defaults."""
+
+    model_config = SettingsConfigDict(env_prefix="GENAI_MONITOR_SQLITE_")
+
+    journal_mode: Optional[str] = DEFAULT_SQLITE_PRAGMAS["journal_mode"]
+    busy_timeout: Optional[int] = DEFAULT_SQLITE_PRAGMAS["busy_timeout"]
+    synchronous: Optional[str] = DEFAULT_SQLITE_PRAGMAS["synchronous"]
+    mmap_size: Optional[int] = DEFAULT_SQLITE_PRAGMAS["mmap_size"]
+    cache_size: Optional[int] = DEFAULT_SQLITE_PRAGMAS["cache_size"]
+    temp_store: Optional[str] = DEFAULT_SQLITE_PRAGMAS["temp_store"]
+
+
+class DBPoolConfig(BaseSettings):
+    """The settings of the connection pool of the database engine, the settings set to None keep the defaults."""
+
+    model_config = SettingsConfigDict(env_prefix="GENAI_MONITOR_DB_")
+
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    pool_recycle: Optional[int] = None
+    pool_pre_ping: Optional[bool] = None
+
+
 class DBManagerConfig(BaseSettings):
     """The configuration for the database manager."""
 
     url: str
+    sqlite: SQLiteConfig = Field(default_factory=SQLiteConfig)
+    pool: DBPoolConfig = Field(default_factory=DBPoolConfig)
 
 
 class Config(BaseSettings):
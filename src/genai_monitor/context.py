@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+from typing import Generator
+
+from dependency_injector.wiring import Provide, inject
+
+from genai_monitor.injectors.containers import DependencyContainer
+from genai_monitor.structures.runtime_manager import RuntimeManager, TrackingState
+
+
+@inject
+def _get_runtime_manager(
+    runtime_manager: RuntimeManager = Provide[DependencyContainer.runtime_manager],
+) -> RuntimeManager:
+    return runtime_manager
+
+
+@contextmanager
+def tracking_context() -> Generator[TrackingState, None, None]:
+    """Scope the latest sample and the artifacts for the next sample to the block.
+
+    Artifacts registered within the block are attached only to the samples created within it, and backward artifacts
+    are attached to the latest sample of the block. Threads and asyncio tasks already get their own tracking state,
+    which a task starts with the latest sample of its creator. Use a tracking context to serve a request from a clean
+    state, or to separate the requests handled one after another by the same thread or task.
+
+    Yields:
+        The tracking state of the block.
+    """
+    with _get_runtime_manager().tracking_context() as state:
+        yield state
@@ -1,20 +1,64 @@
+from datetime import datetime
+
 from dependency_injector.wiring import Provide, inject
+from sqlalchemy import Integer, String, cast
 
 from genai_monitor.db.manager import DBManager
 from genai_monitor.db.schemas.tables import ConfigurationTable
 from genai_monitor.injectors.containers import DependencyContainer
+from genai_monitor.static.constants import VERSION_GENERATION_KEY
 from genai_monitor.structures.runtime_manager import RuntimeManager
 
 
 @inject
-def set_database_version(version: str, db_manager: DBManager = Provide[DependencyContainer.db_manager]):
+def set_database_version(
+    version: str,
+    db_manager: DBManager = Provide[DependencyContainer.db_manager],
+    runtime_manager: RuntimeManager = Provide[DependencyContainer.runtime_manager],
+):
     """Set the database version.
 
+    The version generation counter is incremented together with the version, so that other processes drop their
+    cached database version.
+
     Args:
         version: The version to set.
         db_manager: The database manager.
+        runtime_manager: The runtime manager.
+    """
+    with db_manager.unit_of_work():
+        db_manager.update(model=ConfigurationTable, filters={"key": "version"}, values={"value": version})
+        _increment_version_generation(db_manager=db_manager)
+
+    runtime_manager.invalidate_database_version()
+
+
+def _increment_version_generation(db_manager: DBManager):
+    """Increment the version generation counter, creating it if it does not exist.
+
+    The counter is incremented by a single UPDATE statement, so that concurrent increments are never lost.
+
+    Args:
+        db_manager: The database manager.
     """
-    db_manager.update(model=ConfigurationTable, filters={"key": "version"}, values={"value": version})
+    current_time = datetime.utcnow().isoformat()
+    incremented_value = cast(cast(ConfigurationTable.value, Integer) + 1, String)
+    updated_count = db_manager.update_where(
+        model=ConfigurationTable,
+        filters={"key": VERSION_GENERATION_KEY},
+        values={"value": incremented_value, "updated_at": current_time},
+    )
+
+    if not updated_count:
+        db_manager.save(
+            ConfigurationTable(
+                key=VERSION_GENERATION_KEY,
+                value="1",
+                description="Counter of database version changes",
+                updated_at=current_time,
+                is_default=False,
+            )
+        )
 
 
 @inject
@@ -66,7 +110,4 @@ def get_current_version(
     Returns:
         str: The current version.
     """
-    if runtime_manager.version is not None:
-        return runtime_manager.version
-
-    return get_database_version(db_manager=db_manager)
+    return runtime_manager.get_current_version(db_manager=db_manager)
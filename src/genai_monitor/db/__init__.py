@@ -1,23 +1,32 @@
 import sys
+from typing import Any, Dict, Optional
 
 from loguru import logger
 
 from .config import SessionManager
+from .engines import dispose_engines
+from .migrations import migrate_db
 
 
-def init_db(database_url: str = "sqlite:///genai_monitor.db") -> SessionManager:
+def init_db(
+    database_url: str = "sqlite:///genai_monitor.db",
+    sqlite_pragmas: Optional[Dict[str, Any]] = None,
+    pool_settings: Optional[Dict[str, Any]] = None,
+) -> SessionManager:
     """Initializes the database connection.
 
     Args:
         database_url: The URL of the database to connect to.
+        sqlite_pragmas: The pragmas set on the connections to a SQLite database, overriding the defaults.
+        pool_settings: The settings of the connection pool, see `POOL_SETTINGS`.
 
     Returns:
         A `SessionManager` object.
     """
-    return SessionManager(database_url=database_url)
+    return SessionManager(database_url=database_url, sqlite_pragmas=sqlite_pragmas, pool_settings=pool_settings)
 
 
 logger.remove(0)
 logger.add(sys.stderr, format="{time} | {level} | {message}")
 
-__all__ = ["init_db"]
+__all__ = ["dispose_engines", "init_db", "migrate_db"]
@@ -1,19 +1,27 @@
 from contextlib import contextmanager
-from typing import Generator, Optional
+from contextvars import ContextVar
+from typing import Any, Dict, Generator, Optional
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from .schemas.base import BaseModel
+from .engines import get_engine
 from .schemas.tables import (  # noqa: F401
     ConditioningTable,
     ConditioningTypeTable,
     ModelTable,
     SampleTable,
 )
+from .sqlite import SQLITE_IMMEDIATE_OPTION
 
 DEFAULT_DATABASE_URL = "sqlite:///genai_monitor.db"
 
+# Sessions of the units of work open in the current context, keyed by the id of their engine, so that the session
+# managers sharing an engine join the same unit of work
+_unit_of_work_sessions: ContextVar[Optional[Dict[int, Session]]] = ContextVar(
+    "genai_monitor_unit_of_work_sessions", default=None
+)
+
 
 class SessionManager:
     """Manages the database engine and provides session management."""
@@ -21,22 +29,37 @@ class SessionManager:
     _engine: Optional[Engine] = None
     _session_factory: Optional[sessionmaker] = None
 
-    def __init__(self, database_url: str = DEFAULT_DATABASE_URL):  # noqa: ANN204,D107
-        self.initialize(database_url=database_url)
+    def __init__(  # noqa: ANN204,D107
+        self,
+        database_url: str = DEFAULT_DATABASE_URL,
+        sqlite_pragmas: Optional[Dict[str, Any]] = None,
+        pool_settings: Optional[Dict[str, Any]] = None,
+    ):
+        self.initialize(database_url=database_url, sqlite_pragmas=sqlite_pragmas, pool_settings=pool_settings)
 
-    def initialize(self, database_url: str = DEFAULT_DATABASE_URL) -> "SessionManager":
+    def initialize(
+        self,
+        database_url: str = DEFAULT_DATABASE_URL,
+        sqlite_pragmas: Optional[Dict[str, Any]] = None,
+        pool_settings: Optional[Dict[str, Any]] = None,
+    ) -> "SessionManager":
         """Initializes the database engine and session factory. This should be called once on application start.
 
+        The engine is shared by all the session managers of the database in the process, see `get_engine`. SQLite
+        connections are set up for concurrent access by several processes, with WAL journaling and a busy timeout, see
+        `DEFAULT_SQLITE_PRAGMAS`.
+
         Args:
             database_url: The URL for the database connection. Defaults to sqlite:///genai_eval.db.
+            sqlite_pragmas: The pragmas set on the connections to a SQLite database, overriding the defaults.
+            pool_settings: The settings of the connection pool, see `POOL_SETTINGS`.
 
         Returns:
             The `SessionManager` object.
         """
         if self._engine is None:
-            self._engine = create_engine(database_url)
+            self._engine = get_engine(database_url, sqlite_pragmas=sqlite_pragmas, pool_settings=pool_settings)
             self._session_factory = sessionmaker(bind=self._engine, expire_on_commit=False)
-            BaseModel.metadata.create_all(bind=self._engine)
 
         return self
 
@@ -44,6 +67,9 @@ class SessionManager:
     def session_scope(self) -> Generator[Session, None, None]:
         """Provide a transactional scope around a series of operations. Commits or rolls back on error.
 
+        If a unit of work is open in the current context, its session is yielded instead and the commit (or rollback)
+        is left to the unit of work.
+
         Raises:
             Exception: on any error during database transaction
             ConnectionError: if the database connection has not been initialized yet
@@ -56,6 +82,11 @@ class SessionManager:
                 "The connection to the database must be initialized through, SessionManager.initialize()"
             )
 
+        active_session = (_unit_of_work_sessions.get() or {}).get(id(self._engine))
+        if active_session is not None:
+            yield active_session
+            return
+
         session = self._session_factory(expire_on_commit=False)
         try:
             yield session
@@ -65,3 +96,32 @@ class SessionManager:
             raise
         finally:
             session.close()
+
+    @contextmanager
+    def unit_of_work(self, immediate: bool = False) -> Generator[Session, None, None]:
+        """Run all database operations of the enclosed block in a single session and a single transaction.
+
+        Every `session_scope()` entered within the block reuses the session of the unit of work, so the block is
+        committed once on exit (or rolled back on error). Nested units of work join the outermost one.
+
+        Args:
+            immediate: Whether the transaction takes the write lock of a SQLite database as soon as it begins, so that
+                the reads of the block are serialized with the writes of other connections. Ignored by nested units of
+                work and by other databases.
+
+        Yields:
+            The database session shared by the unit of work
+        """
+        active_sessions = _unit_of_work_sessions.get() or {}
+        if id(self._engine) in active_sessions:
+            yield active_sessions[id(self._engine)]
+            return
+
+        with self.session_scope() as session:
+            if immediate:
+                session.connection(execution_options={SQLITE_IMMEDIATE_OPTION: True})
+            token = _unit_of_work_sessions.set({**active_sessions, id(self._engine): session})
+            try:
+                yield session
+            finally:
+                _unit_of_work_sessions.reset(token)
@@ -0,0 +1,103 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import Engine, create_engine, make_url
+
+from .migrations import add_missing_columns, create_missing_indexes, warn_about_missing_indexes
+from .schemas.base import BaseModel
+from .sqlite import apply_sqlite_pragmas, enable_immediate_transactions, get_sqlite_pragma_statements
+
+# The keyword arguments of `create_engine` configuring the connection pool
+POOL_SETTINGS = ("pool_size", "max_overflow", "pool_recycle", "pool_pre_ping")
+
+# The engines shared by the session managers of the process, keyed by the URL and the settings of the engine
+_engines: Dict[Tuple, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(
+    database_url: str,
+    sqlite_pragmas: Optional[Dict[str, Any]] = None,
+    pool_settings: Optional[Dict[str, Any]] = None,
+) -> Engine:
+    """Gets the engine of the process for the database, creating it and its schema on first use.
+
+    All the session managers of a database share a single engine, and so a single connection pool, and the schema is
+    created and checked once per process. In-memory SQLite databases are private to their engine, so a new engine is
+    created for every call.
+
+    Args:
+        database_url: The URL of the database.
+        sqlite_pragmas: The pragmas set on the connections to a SQLite database, overriding the defaults.
+        pool_settings: The settings of the connection pool, see `POOL_SETTINGS`. The settings set to None are left at
+            the SQLAlchemy defaults.
+
+    Returns:
+        The engine of the database.
+
+    Raises:
+        ValueError: If a pool setting is not supported.
+    """
+    pool_settings = {name: value for name, value in (pool_settings or {}).items() if value is not None}
+    unsupported_settings = set(pool_settings) - set(POOL_SETTINGS)
+    if unsupported_settings:
+        raise ValueError(f"Unsupported connection pool settings: {', '.join(sorted(unsupported_settings))}.")
+
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    pragma_statements = tuple(get_sqlite_pragma_statements(sqlite_pragmas)) if is_sqlite else ()
+    if is_sqlite and _is_in_memory(database_url):
+        return _create_engine(database_url, sqlite_pragmas, pool_settings)
+
+    key = (url.render_as_string(hide_password=False), pragma_statements, tuple(sorted(pool_settings.items())))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _create_engine(database_url, sqlite_pragmas, pool_settings)
+            _engines[key] = engine
+        return engine
+
+
+def dispose_engines():
+    """Closes the connections of the shared engines and forgets them, e.g. before dropping their databases."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def _create_engine(
+    database_url: str, sqlite_pragmas: Optional[Dict[str, Any]], pool_settings: Dict[str, Any]
+) -> Engine:
+    engine = create_engine(database_url, **pool_settings)
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(engine, sqlite_pragmas)
+        enable_immediate_transactions(engine)
+    BaseModel.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    # The unique indexes cover the natural keys of the upserts and their tables are small, so they are created now
+    create_missing_indexes(engine, unique_only=True)
+    warn_about_missing_indexes(engine)
+    return engine
+
+
+def _is_in_memory(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def _reset_engines_after_fork():
+    # The pooled connections are shared with the parent process, so they are dropped without closing them, and the
+    # lock is replaced as it might have been held by another thread of the parent when it forked
+    global _engines_lock  # noqa: PLW0603
+    _engines_lock = threading.Lock()
+    for engine in _engines.values():
+        engine.dispose(close=False)
+    if _engines:
+        logger.debug(f"Reset the connection pools of {len(_engines)} engines in the forked process {os.getpid()}.")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_engines_after_fork)
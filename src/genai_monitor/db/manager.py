@@ -1,13 +1,35 @@
 # mypy: ignore-errors
-from typing import Any, Dict, Optional, Sequence, Type, Union
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, Iterator, List, Literal, Optional, Sequence, Tuple, Type, Union
 
 from attrs import define
 from loguru import logger
-from sqlalchemy import Row, and_
+from sqlalchemy import Engine, Row, and_, bindparam, insert, inspect, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, noload, selectinload
 
 from genai_monitor.db.config import SessionManager
 from genai_monitor.db.schemas.base import BaseModel
 
+# The INSERT constructs supporting ON CONFLICT, by dialect name
+_DIALECT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+# The column sets of the unique indexes and constraints of the tables, inspected once per engine and table
+_unique_keys: "weakref.WeakKeyDictionary[Engine, Dict[str, List[frozenset]]]" = weakref.WeakKeyDictionary()
+_unique_keys_lock = threading.Lock()
+
+# How the relationships of the found records are loaded: "none" leaves them empty without querying them, "selectin"
+# loads each relationship of all the records with one more SELECT, "joined" loads them with LEFT OUTER JOINs in the same
+# SELECT, and a list of relationship names loads only these relationships with "selectin"
+RelationLoading = Union[Literal["none", "selectin", "joined"], Sequence[str]]
+
+# The rows of the bulk operations, either ORM model instances or dictionaries of column values
+BulkRows = Sequence[Union[BaseModel, Dict[str, Any]]]
+
 
 @define
 class DBManager:
@@ -15,10 +37,28 @@ class DBManager:
 
     Class provides basic operations for saving, updating and searching records
     in the database using SQLAlchemy ORM models.
+
+    Each operation runs in its own transaction, unless it is executed within `unit_of_work()`, in which case all
+    operations share a single session and are committed together.
+
+    Filters map column names to values. A list, tuple or set value matches any of its elements.
     """
 
     session_manager: Optional[SessionManager] = None
 
+    @contextmanager
+    def unit_of_work(self, immediate: bool = False) -> Generator[Session, None, None]:
+        """Groups all operations executed within the block into a single session and transaction.
+
+        Args:
+            immediate: Whether the transaction takes the write lock of a SQLite database as soon as it begins.
+
+        Yields:
+            The database session shared by the operations.
+        """
+        with self.session_manager.unit_of_work(immediate=immediate) as session:
+            yield session
+
     def save(self, instance: BaseModel) -> BaseModel:
         """Saves an instance of a model to the database.
 
@@ -30,28 +70,169 @@ class DBManager:
         """
         with self.session_manager.session_scope() as session:
             session.add(instance)
-            session.commit()
+            session.flush()
             self._eager_load_instance_relations(instance=instance)
             return instance
 
-    def search(self, model: Type[BaseModel], filters: Optional[Dict[str, Any]] = None) -> Sequence[Row]:
+    def upsert(self, instance: BaseModel, keys: Sequence[str]) -> BaseModel:
+        """Saves an instance unless a record with the same natural key exists, returning the stored record.
+
+        On SQLite and PostgreSQL, the record is got or created with a single `INSERT ... ON CONFLICT ... RETURNING`
+        statement, so concurrent callers never create duplicates. The conflict updates the key columns to their own
+        values, so that the existing record is returned without modifying it. On other databases, the record is
+        looked up and inserted in a savepoint, and looked up again if a concurrent insert wins.
+
+        ON CONFLICT requires the natural key to be covered by a unique index or constraint, so the record is got or
+        created as on other databases if the database lacks it, e.g. if it was created by an earlier version.
+
+        Args:
+            instance: The ORM model instance to save.
+            keys: The names of the columns of the natural key.
+
+        Returns:
+            The stored record, either inserted or existing.
+        """
+        model = type(instance)
+        values = self._column_values(instance)
+
+        with self.session_manager.session_scope() as session:
+            dialect = session.get_bind().dialect
+            insert_upsert = _DIALECT_INSERTS.get(dialect.name)
+            if insert_upsert is not None and dialect.insert_returning and self._has_unique_key(session, model, keys):
+                statement = insert_upsert(model).values(**values)
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(keys), set_={keys[0]: statement.excluded[keys[0]]}
+                ).returning(model)
+                stored = session.scalars(statement, execution_options={"populate_existing": True}).one()
+            else:
+                stored = self._get_or_create(session, model, values, keys)
+
+            self._eager_load_instance_relations(stored)
+            return stored
+
+    def search(
+        self, model: Type[BaseModel], filters: Optional[Dict[str, Any]] = None, load: RelationLoading = "selectin"
+    ) -> Sequence[Row]:
         """Searches for records in the database that match the given filters.
 
         Args:
             model: The ORM model class representing the database table to search.
             filters: Dictionary of filter criteria to locate specific records.
+            load: How the relationships of the records are loaded, see `RelationLoading`. Lookups which do not use the
+                relationships should pass "none", since loading e.g. the samples of a conditioning can fetch thousands
+                of rows.
 
         Returns:
             A sequence of rows matching the filter criteria.
+
+        Raises:
+            ValueError: If the relationship loading is unknown.
         """
         with self.session_manager.session_scope() as session:
-            query = session.query(model)
+            # Refresh instances already present in the session, e.g. when polling within a unit of work
+            query = session.query(model).populate_existing().options(*self._loading_options(model, load))
             if filters:
-                query = query.filter_by(**filters)
-            result = query.all()
-            for instance in result:
-                self._eager_load_instance_relations(instance)
-            return result
+                query = query.filter(*self._filter_conditions(model, filters))
+            return query.all()
+
+    def iter_search(
+        self,
+        model: Type[BaseModel],
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+        order_by: str = "id",
+        after: Optional[Any] = None,
+        load: RelationLoading = "selectin",
+    ) -> Iterator[BaseModel]:
+        """Iterates over the records matching the given filters in batches, without loading them all into memory.
+
+        The records are paged by the values of the `order_by` column, so every batch is a fresh query for the records
+        past the last one of the previous batch, which stays fast however deep the iteration goes. The rows of a batch
+        are streamed from the database cursor. Outside of a unit of work, every batch is read in its own session, so
+        the records of the consumed batches can be garbage collected.
+
+        Args:
+            model: The ORM model class representing the database table to search.
+            filters: Dictionary of filter criteria to locate specific records.
+            batch_size: The number of records read with each query.
+            order_by: The name of the column ordering the records, its values must be unique and not null.
+            after: The value of the `order_by` column after which the iteration starts, e.g. the value of the last
+                record of a previous page.
+            load: How the relationships of the records are loaded, see `RelationLoading`. "joined" cannot be combined
+                with streaming for collections, use "selectin" instead.
+
+        Yields:
+            The records matching the filter criteria, in ascending order of the `order_by` column.
+
+        Raises:
+            ValueError: If the batch size is not positive or the relationship loading is unknown.
+        """
+        if batch_size < 1:
+            raise ValueError(f"The batch size must be positive, got {batch_size}.")
+
+        column = getattr(model, order_by)
+        loading_options = self._loading_options(model, load)
+        while True:
+            with self.session_manager.session_scope() as session:
+                query = session.query(model).populate_existing().options(*loading_options)
+                if filters:
+                    query = query.filter(*self._filter_conditions(model, filters))
+                if after is not None:
+                    query = query.filter(column > after)
+
+                read_count = 0
+                for instance in query.order_by(column).limit(batch_size).yield_per(batch_size):
+                    read_count += 1
+                    after = getattr(instance, order_by)
+                    yield instance
+
+            if read_count < batch_size:
+                return
+
+    def get(self, model: Type[BaseModel], primary_key: Any, load: RelationLoading = "selectin") -> Optional[BaseModel]:
+        """Gets a record by its primary key.
+
+        Args:
+            model: The ORM model class representing the database table.
+            primary_key: The primary key of the record.
+            load: How the relationships of the record are loaded, see `RelationLoading`.
+
+        Returns:
+            The record or None if it does not exist.
+
+        Raises:
+            ValueError: If the relationship loading is unknown.
+        """
+        with self.session_manager.session_scope() as session:
+            return session.get(model, primary_key, options=self._loading_options(model, load), populate_existing=True)
+
+    def search_columns(
+        self,
+        model: Type[BaseModel],
+        columns: Sequence[str],
+        filters: Optional[Dict[str, Any]] = None,
+        named: bool = True,
+    ) -> Sequence[Union[Row, Tuple]]:
+        """Searches for records matching the given filters, selecting only the given columns.
+
+        No ORM instances are built, so projecting the needed columns is much cheaper than `search` for large results.
+        The named rows can be converted to dataclasses with `ORMConvertible.from_row`.
+
+        Args:
+            model: The ORM model class representing the database table to search.
+            columns: The names of the columns to select.
+            filters: Dictionary of filter criteria to locate specific records.
+            named: Whether to return rows whose columns are accessible by their names, or plain tuples.
+
+        Returns:
+            A sequence of rows with the selected columns, in the order of `columns`.
+        """
+        with self.session_manager.session_scope() as session:
+            query = session.query(*[getattr(model, column) for column in columns])
+            if filters:
+                query = query.filter(*self._filter_conditions(model, filters))
+            rows = query.all()
+            return rows if named else [tuple(row) for row in rows]
 
     def update(
         self,
@@ -59,6 +240,7 @@ class DBManager:
         model: Optional[Type[BaseModel]] = None,
         filters: Optional[Dict[str, Any]] = None,
         values: Optional[Dict[str, Any]] = None,
+        load: RelationLoading = "selectin",
     ) -> Union[BaseModel, Sequence[Row]]:
         """Updates records in the database.
 
@@ -70,6 +252,8 @@ class DBManager:
             model: The ORM model class representing the table to update.
             filters: Dictionary of filter criteria to locate records to update.
             values: Dictionary of field names and values to update.
+            load: How the relationships of the records located by `model` and `filters` are loaded, see
+                `RelationLoading`. Writes which do not use the related records should pass "none".
 
         Returns:
            The updated instance if `instance` was provided or the updated DB rows.
@@ -92,19 +276,171 @@ class DBManager:
                 for field_name, field_value in values.items():  # type: ignore
                     setattr(instance, field_name, field_value)
                 session.add(instance)
-                session.commit()
+                session.flush()
                 return instance
 
-            query = session.query(model).filter_by(**filters)
+            query = (
+                session.query(model)
+                .options(*self._loading_options(model, load))
+                .filter(*self._filter_conditions(model, filters))
+            )
             query_results = query.all()
             for result in query_results:
                 for field_name, field_value in values.items():  # type: ignore
                     setattr(result, field_name, field_value)
-            session.commit()
-            for result in query_results:
-                self._eager_load_instance_relations(result)
+            session.flush()
             return query_results
 
+    def update_where(
+        self,
+        model: Type[BaseModel],
+        filters: Dict[str, Any],
+        values: Dict[str, Any],
+        conditions: Optional[Sequence[Any]] = None,
+    ) -> int:
+        """Updates the matching records with a single UPDATE statement, without loading them.
+
+        The statement is atomic, so filtering on the previously read values of the updated columns makes it a
+        compare-and-swap.
+
+        Args:
+            model: The ORM model class representing the table to update.
+            filters: Dictionary of filter criteria to locate records to update.
+            values: Dictionary of field names and values to update.
+            conditions: Additional SQLAlchemy conditions on the columns of the model.
+
+        Returns:
+            The number of updated records.
+        """
+        with self.session_manager.session_scope() as session:
+            statement = (
+                update(model)
+                .where(*self._filter_conditions(model, filters), *(conditions or []))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            return session.execute(statement).rowcount
+
+    def bulk_save(
+        self, model: Type[BaseModel], rows: BulkRows, returning: Optional[Sequence[str]] = None
+    ) -> Sequence[Row]:
+        """Inserts many records with a single executemany INSERT statement, bypassing the ORM.
+
+        The inserted records are neither loaded into the session nor refreshed, which makes this suitable for
+        backfills and imports of many records. If columns are returned on a database that cannot return them from an
+        executemany INSERT, the records are added through the ORM instead.
+
+        Args:
+            model: The ORM model class representing the table to insert into.
+            rows: The records to insert, as ORM model instances or dictionaries of column values. All the rows must set
+                the same columns.
+            returning: The names of the columns of the inserted records to return, e.g. their generated ids.
+
+        Returns:
+            The returned columns of the inserted records, in the order of the rows, or an empty list if `returning` is
+            not given.
+        """
+        if not rows:
+            return []
+
+        with self.session_manager.session_scope() as session:
+            if returning and not session.get_bind().dialect.insert_executemany_returning:
+                records = [model(**self._column_values(row)) for row in rows]
+                session.add_all(records)
+                session.flush()
+                return [tuple(getattr(record, column) for column in returning) for record in records]
+
+            return self._execute_bulk_insert(session, insert(model.__table__), model, rows, returning)
+
+    def bulk_upsert(
+        self,
+        model: Type[BaseModel],
+        rows: BulkRows,
+        keys: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        returning: Optional[Sequence[str]] = None,
+    ) -> Sequence[Row]:
+        """Inserts many records, keeping or updating the stored records with the same natural key.
+
+        On SQLite and PostgreSQL, the records are inserted with a single executemany `INSERT ... ON CONFLICT`
+        statement. On other databases, or if the natural key is not covered by a unique index or constraint, each
+        record is got or created as by `upsert`, and then updated.
+
+        Args:
+            model: The ORM model class representing the table to insert into.
+            rows: The records to insert, as ORM model instances or dictionaries of column values. All the rows must set
+                the same columns.
+            keys: The names of the columns of the natural key.
+            update_columns: The names of the columns of the stored records overwritten with the values of the rows,
+                the stored records are kept as they are if None.
+            returning: The names of the columns of the inserted or stored records to return, e.g. their ids.
+
+        Returns:
+            The returned columns of the inserted or stored records, in the order of the rows, or an empty list if
+            `returning` is not given.
+        """
+        if not rows:
+            return []
+
+        # The conflict updates the first key column to its own value when no column is updated, so that the stored
+        # records are returned as well
+        update_columns = list(update_columns or keys[:1])
+        with self.session_manager.session_scope() as session:
+            dialect = session.get_bind().dialect
+            insert_upsert = _DIALECT_INSERTS.get(dialect.name)
+            if (
+                insert_upsert is not None
+                and (returning is None or dialect.insert_executemany_returning)
+                and self._has_unique_key(session, model, keys)
+            ):
+                statement = insert_upsert(model.__table__)
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(keys), set_={column: statement.excluded[column] for column in update_columns}
+                )
+                return self._execute_bulk_insert(session, statement, model, rows, returning)
+
+            stored_records = []
+            for row in rows:
+                values = self._column_values(row)
+                stored = self._get_or_create(session, model, values, keys)
+                for column in update_columns:
+                    setattr(stored, column, values[column])
+                stored_records.append(stored)
+            session.flush()
+
+            if not returning:
+                return []
+            return [tuple(getattr(stored, column) for column in returning) for stored in stored_records]
+
+    def bulk_update(self, model: Type[BaseModel], rows: Sequence[Dict[str, Any]], key: str = "id") -> int:
+        """Updates many records with a single executemany UPDATE statement, without loading them.
+
+        Each row holds the value of the key column of the record to update and the new values of its columns. The
+        records already loaded into the session are not refreshed.
+
+        Args:
+            model: The ORM model class representing the table to update.
+            rows: Dictionaries of the key column value and the column values to update.
+            key: The name of the column identifying the records.
+
+        Returns:
+            The number of updated records.
+        """
+        table = model.__table__
+        updated_count = 0
+        with self.session_manager.session_scope() as session:
+            # The rows updating the same columns are executed together
+            for columns, column_rows in self._group_by_columns(rows, excluded=key).items():
+                # The bound parameters are prefixed, as the names of the columns are reserved by the SET clause
+                statement = (
+                    update(table)
+                    .where(table.c[key] == bindparam(f"_{key}"))
+                    .values({column: bindparam(f"_{column}") for column in columns})
+                )
+                parameters = [{f"_{name}": value for name, value in row.items()} for row in column_rows]
+                updated_count += session.execute(statement, parameters).rowcount
+        return updated_count
+
     def join_search(
         self,
         target_model: Type[BaseModel],
@@ -129,16 +465,115 @@ class DBManager:
             query = session.query(target_model).join(join_model, on_condition)
 
             if target_filters:
-                target_conditions = [getattr(target_model, key) == value for key, value in target_filters.items()]
-                query = query.filter(and_(*target_conditions))
+                query = query.filter(and_(*self._filter_conditions(target_model, target_filters)))
 
             if join_filters:
-                join_conditions = [getattr(join_model, key) == value for key, value in join_filters.items()]
-                query = query.filter(and_(*join_conditions))
+                query = query.filter(and_(*self._filter_conditions(join_model, join_filters)))
 
             results = query.all()
             return results
 
+    def _execute_bulk_insert(
+        self,
+        session: Session,
+        statement: Any,
+        model: Type[BaseModel],
+        rows: BulkRows,
+        returning: Optional[Sequence[str]],
+    ) -> Sequence[Row]:
+        parameters = [self._column_values(row) for row in rows]
+        if not returning:
+            session.execute(statement, parameters)
+            return []
+
+        table = model.__table__
+        statement = statement.returning(*(table.c[column] for column in returning), sort_by_parameter_order=True)
+        return session.execute(statement, parameters).all()
+
+    @staticmethod
+    def _column_values(row: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+        # Primary keys and columns with defaults left unset are generated by the database
+        if isinstance(row, dict):
+            return dict(row)
+        return {
+            column.key: getattr(row, column.key)
+            for column in type(row).__table__.columns
+            if getattr(row, column.key) is not None
+            or not (column.primary_key or column.default is not None or column.server_default is not None)
+        }
+
+    @staticmethod
+    def _group_by_columns(rows: Sequence[Dict[str, Any]], excluded: str) -> Dict[Tuple[str, ...], List[Dict]]:
+        groups: Dict[Tuple[str, ...], List[Dict]] = {}
+        for row in rows:
+            columns = tuple(sorted(column for column in row if column != excluded))
+            groups.setdefault(columns, []).append(row)
+        return groups
+
+    def _get_or_create(
+        self, session: Session, model: Type[BaseModel], values: Dict[str, Any], keys: Sequence[str]
+    ) -> BaseModel:
+        key_filters = {key: values[key] for key in keys}
+        existing = session.query(model).filter(*self._filter_conditions(model, key_filters)).first()
+        if existing is not None:
+            return existing
+
+        try:
+            with session.begin_nested():
+                instance = model(**values)
+                session.add(instance)
+            return instance
+        except IntegrityError:
+            return session.query(model).filter(*self._filter_conditions(model, key_filters)).one()
+
+    @staticmethod
+    def _has_unique_key(session: Session, model: Type[BaseModel], keys: Sequence[str]) -> bool:
+        engine = session.get_bind()
+        table_name = model.__tablename__
+        with _unique_keys_lock:
+            tables = _unique_keys.setdefault(engine, {})
+            if table_name not in tables:
+                inspector = inspect(session.connection())
+                unique_keys = [frozenset(inspector.get_pk_constraint(table_name)["constrained_columns"])]
+                unique_keys.extend(
+                    frozenset(index["column_names"]) for index in inspector.get_indexes(table_name) if index["unique"]
+                )
+                unique_keys.extend(
+                    frozenset(constraint["column_names"]) for constraint in inspector.get_unique_constraints(table_name)
+                )
+                tables[table_name] = unique_keys
+            unique_keys = tables[table_name]
+
+        # ON CONFLICT matches a unique index over exactly the columns of the natural key
+        if frozenset(keys) in unique_keys:
+            return True
+        logger.debug(f"{table_name} lacks a unique index on ({', '.join(keys)}), its records are got or created.")
+        return False
+
+    @staticmethod
+    def _filter_conditions(model: Type[BaseModel], filters: Dict[str, Any]) -> List[Any]:
+        conditions = []
+        for key, value in filters.items():
+            column = getattr(model, key)
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(column.in_(value))
+            else:
+                conditions.append(column == value)
+        return conditions
+
+    @staticmethod
+    def _loading_options(model: Type[BaseModel], load: RelationLoading) -> List[Any]:
+        # The relationships left unloaded are set empty, since the records are detached when their session closes
+        if load == "none":
+            return [noload("*")]
+        if load == "selectin":
+            return [selectinload(getattr(model, relation)) for relation in model.relations]
+        if load == "joined":
+            return [joinedload(getattr(model, relation)) for relation in model.relations]
+        if isinstance(load, str):
+            raise ValueError(f"Unknown relationship loading {load!r}, expected 'none', 'selectin' or 'joined'.")
+        return [selectinload(getattr(model, relation)) for relation in load] + [noload("*")]
+
     @staticmethod
     def _eager_load_instance_relations(instance: BaseModel):  # noqa: ANN205
         for relation in instance.relations:
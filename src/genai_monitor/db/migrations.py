@@ -0,0 +1,155 @@
+from typing import List
+
+from loguru import logger
+from sqlalchemy import Engine, create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+
+from .schemas import tables  # noqa: F401
+from .schemas.base import BaseModel
+from .sqlite import apply_sqlite_pragmas
+
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """Adds the nullable columns of the schema that are missing from the existing tables of the database.
+
+    `create_all` creates the missing tables but never alters the existing ones, so the columns added to the schema
+    after a database was created are added in place.
+
+    Args:
+        engine: The engine of the database.
+
+    Returns:
+        The added columns, as `table.column`.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added_columns = []
+
+    with engine.begin() as connection:
+        for table in BaseModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                added_columns.append(f"{table.name}.{column.name}")
+
+    if added_columns:
+        logger.info(f"Added the columns {', '.join(added_columns)} to the existing database.")
+    return added_columns
+
+
+def find_missing_indexes(engine: Engine) -> List[str]:
+    """Finds the indexes of the schema that are missing from the existing tables of the database.
+
+    `create_all` creates the indexes of the tables it creates, so only the databases created by earlier versions lack
+    indexes.
+
+    Args:
+        engine: The engine of the database.
+
+    Returns:
+        The names of the missing indexes.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing_indexes = []
+    for table in BaseModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing_indexes.extend(index.name for index in table.indexes if index.name not in existing_indexes)
+    return missing_indexes
+
+
+def create_missing_indexes(engine: Engine, unique_only: bool = False) -> List[str]:
+    """Creates the indexes of the schema that are missing from the existing tables of the database.
+
+    Building an index scans its table, so this can take a while on large databases. A unique index cannot be created
+    while the table holds duplicates of its key, e.g. created by concurrent writers of earlier versions, so it is
+    skipped with an error until the duplicates are merged.
+
+    Args:
+        engine: The engine of the database.
+        unique_only: Whether to create only the unique indexes, which cover the natural keys of the upserts.
+
+    Returns:
+        The names of the created indexes.
+    """
+    missing_indexes = set(find_missing_indexes(engine))
+    created_indexes = []
+    for table in BaseModel.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in missing_indexes or (unique_only and not index.unique):
+                continue
+
+            logger.info(f"Creating index {index.name} on table {table.name}...")
+            try:
+                # Other processes starting on the same database might create the index concurrently
+                with engine.begin() as connection:
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+            except IntegrityError as e:
+                columns = ", ".join(column.name for column in index.columns)
+                logger.error(
+                    f"Could not create the unique index {index.name}, {table.name} has duplicates of ({columns}): {e}"
+                )
+                continue
+            created_indexes.append(index.name)
+    return created_indexes
+
+
+def warn_about_missing_indexes(engine: Engine) -> List[str]:
+    """Warns if the indexes of the schema are missing from the existing tables of the database.
+
+    Args:
+        engine: The engine of the database.
+
+    Returns:
+        The names of the missing indexes.
+    """
+    missing_indexes = find_missing_indexes(engine)
+    if missing_indexes:
+        logger.warning(
+            f"The database {engine.url.render_as_string(hide_password=True)} lacks the indexes "
+            f"{', '.join(missing_indexes)}, so its lookups scan whole tables. "
+            "Run `genai_monitor.db.migrate_db` with its URL to create them."
+        )
+
+    unique_indexes = {
+        index.name for table in BaseModel.metadata.sorted_tables for index in table.indexes if index.unique
+    }
+    missing_unique_indexes = [name for name in missing_indexes if name in unique_indexes]
+    if missing_unique_indexes:
+        logger.warning(
+            f"The unique indexes {', '.join(missing_unique_indexes)} are missing, so concurrent writers can record "
+            "duplicate conditionings, models and users. Merge the duplicates and run `genai_monitor.db.migrate_db`."
+        )
+    return missing_indexes
+
+
+def migrate_db(database_url: str) -> List[str]:
+    """Migrates a database created by an earlier version to the current schema in place.
+
+    The missing tables, columns and indexes are created, and the existing rows are kept.
+
+    Args:
+        database_url: The URL of the database to migrate.
+
+    Returns:
+        The added columns, as `table.column`, and the names of the created indexes.
+    """
+    engine = create_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(engine)
+    try:
+        BaseModel.metadata.create_all(bind=engine)
+        return add_missing_columns(engine) + create_missing_indexes(engine)
+    finally:
+        engine.dispose()
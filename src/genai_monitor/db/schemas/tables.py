@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from sqlalchemy import JSON, ForeignKey, UniqueConstraint, text
+from sqlalchemy import JSON, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import BaseModel
@@ -27,6 +27,8 @@ class ConditioningTable(BaseModel):
 
     samples: Mapped[List["SampleTable"]] = relationship(back_populates="conditioning")
 
+    __table_args__ = (Index("uq_conditioning_hash", "hash", unique=True),)
+
 
 class SampleTable(BaseModel):
     """Database table representing the sample - an atomic unit of data in the system."""
@@ -42,11 +44,22 @@ class SampleTable(BaseModel):
     generation_id: Mapped[Optional[int]] = mapped_column()
     status: Mapped[str] = mapped_column()
     version: Mapped[str] = mapped_column()
+    lease_owner: Mapped[Optional[str]] = mapped_column()
+    lease_expires_at: Mapped[Optional[float]] = mapped_column()
+    heartbeat_at: Mapped[Optional[float]] = mapped_column()
 
     conditioning: Mapped["ConditioningTable"] = relationship(back_populates="samples")
     user: Mapped["UserTable"] = relationship(back_populates="samples")
     artifacts: Mapped[List["ArtifactTable"]] = relationship(back_populates="sample")
 
+    __table_args__ = (
+        # The generation slots of a (model, conditioning, version) triple
+        Index("ix_sample_slot", "model_id", "conditioning_id", "version", "status", "generation_id"),
+        Index("ix_sample_hash", "hash"),
+        # The in-progress samples with expired leases, found by the sweeper
+        Index("ix_sample_status_lease", "status", "lease_expires_at"),
+    )
+
 
 class ModelTable(BaseModel):
     """Database table representing the generative model."""
@@ -60,6 +73,8 @@ class ModelTable(BaseModel):
     training_step: Mapped[Optional[int]] = mapped_column()
     model_metadata: Mapped[Optional[dict]] = mapped_column(JSON)
 
+    __table_args__ = (Index("uq_model_hash_class", "hash", "model_class", unique=True),)
+
 
 class ConfigurationTable(BaseModel):
     """Database table representing system configuration.
@@ -89,6 +104,8 @@ class UserTable(BaseModel):
 
     samples: Mapped[List["SampleTable"]] = relationship(back_populates="user")
 
+    __table_args__ = (Index("uq_user_hash", "hash", unique=True),)
+
 
 class ArtifactTable(BaseModel):
     """Database table representing the artifact - an atomic unit of data in the system."""
@@ -101,3 +118,5 @@ class ArtifactTable(BaseModel):
 
     sample_id: Mapped[int] = mapped_column(ForeignKey("sample.id"))
     sample: Mapped["SampleTable"] = relationship(back_populates="artifacts")
+
+    __table_args__ = (Index("ix_artifact_sample_name_hash", "sample_id", "name", "hash"),)
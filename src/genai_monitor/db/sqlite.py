@@ -0,0 +1,80 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Connection, Engine, event
+
+# Pragmas letting several processes share a SQLite database: readers do not block the writer in WAL mode, writers
+# wait for the lock instead of failing, and commits are synced at checkpoints only, which is still safe in WAL mode
+DEFAULT_SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "wal",
+    "busy_timeout": 5000,
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "memory",
+}
+
+# The execution option beginning the transaction of a SQLite connection with BEGIN IMMEDIATE
+SQLITE_IMMEDIATE_OPTION = "genai_monitor_sqlite_immediate"
+
+_PRAGMA_VALUE_PATTERN = re.compile(r"^-?\w+$")
+
+
+def get_sqlite_pragma_statements(pragmas: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Builds the statements setting the pragmas on a SQLite connection.
+
+    Args:
+        pragmas: The values of the pragmas by name, the pragmas set to None are left at the SQLite defaults. The
+            pragmas of `DEFAULT_SQLITE_PRAGMAS` missing from it are set to their default values.
+
+    Returns:
+        The PRAGMA statements.
+
+    Raises:
+        ValueError: If the name or the value of a pragma is not a plain identifier or number.
+    """
+    pragmas = {**DEFAULT_SQLITE_PRAGMAS, **(pragmas or {})}
+    statements = []
+    for name, value in pragmas.items():
+        if value is None:
+            continue
+        if name not in DEFAULT_SQLITE_PRAGMAS or not _PRAGMA_VALUE_PATTERN.match(str(value)):
+            raise ValueError(f"Invalid SQLite pragma {name}={value}.")
+        statements.append(f"PRAGMA {name}={value}")
+    return statements
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Optional[Dict[str, Any]] = None):
+    """Sets the pragmas on every new connection of a SQLite engine.
+
+    Args:
+        engine: The SQLite engine.
+        pragmas: The values of the pragmas by name, see `get_sqlite_pragma_statements`.
+    """
+    statements = get_sqlite_pragma_statements(pragmas)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection: Any, connection_record: Any):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def enable_immediate_transactions(engine: Engine):
+    """Lets the connections of a SQLite engine begin their transactions with BEGIN IMMEDIATE.
+
+    pysqlite begins a transaction only before its first write, so the reads preceding it are not serialized with the
+    writes of other connections. The connections with the `SQLITE_IMMEDIATE_OPTION` execution option take the write
+    lock of the database as soon as their transaction begins instead, waiting for it up to the busy timeout.
+
+    Args:
+        engine: The SQLite engine.
+    """
+
+    @event.listens_for(engine, "begin")
+    def begin_immediate(connection: Connection):
+        if connection.get_execution_options().get(SQLITE_IMMEDIATE_OPTION):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
@@ -219,6 +219,7 @@ TRANSFORMERS_AVAILABLE = is_extra_available("transformers", EXTRAS_REQUIRE)
 OPENAI_AVAILABLE = is_extra_available("openai", EXTRAS_REQUIRE)
 LITELLM_AVAILABLE = is_extra_available("litellm", EXTRAS_REQUIRE)
 ALL_AVAILABLE = all((DIFFUSERS_AVAILABLE, TRANSFORMERS_AVAILABLE, OPENAI_AVAILABLE, LITELLM_AVAILABLE))
+TORCH_AVAILABLE = _check_package_available("torch")
 
 if __name__ == "__main__":
     print(f"Diffusers available: {DIFFUSERS_AVAILABLE}")
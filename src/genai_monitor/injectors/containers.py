@@ -10,10 +10,19 @@ from genai_monitor.injectors.registry import ArtifactRegistry, WrapperRegistry
 from genai_monitor.injectors.wrapper import ArtifactWrapperFactory, WrapperFactory
 from genai_monitor.registration.collection import register_class_collection, register_function_collection
 from genai_monitor.registration.utils import ClassDefinitionCollection, FunctionDefinitionCollection
+from genai_monitor.static.constants import DEFAULT_CONDITIONING_CACHE_SIZE, DEFAULT_OUTPUT_CACHE_MAX_BYTES
+from genai_monitor.structures.cache import ByteBoundedLRUCache, LRUCache
+from genai_monitor.structures.completion_notifier import CompletionNotifier
+from genai_monitor.structures.latency import LatencyRecorder
+from genai_monitor.structures.leases import LeaseKeeper
 from genai_monitor.structures.persistency_manager import PersistencyManager
 from genai_monitor.structures.runtime_manager import RuntimeManager
+from genai_monitor.structures.sampling import SamplingSettings
+from genai_monitor.structures.single_flight import SingleFlight
+from genai_monitor.structures.stream import StreamReplayer
+from genai_monitor.structures.write_behind_queue import WriteBehindQueue
 from genai_monitor.utils.data import get_absolute_path
-from genai_monitor.utils.model_hashing import default_model_hashing_function
+from genai_monitor.utils.model_hashing import default_model_hashing_function, memoize_model_hash
 
 _TRANSFORMERS_JSON_PATH = "../registration/data/transformers2.json"
 _PROVIDERS_JSON_PATH = "../registration/data/providers.json"
@@ -26,11 +35,37 @@ class DependencyContainer(containers.DeclarativeContainer):
 
     config = providers.Configuration()
 
-    wrapper_factory = providers.Singleton(provides=WrapperFactory)
+    conditioning_cache = providers.Singleton(provides=LRUCache, maxsize=DEFAULT_CONDITIONING_CACHE_SIZE)
+    output_cache = providers.Singleton(provides=ByteBoundedLRUCache, maxbytes=DEFAULT_OUTPUT_CACHE_MAX_BYTES)
+    write_behind_queue = providers.Singleton(provides=WriteBehindQueue)
+    completion_notifier = providers.Singleton(provides=CompletionNotifier)
+    stream_replayer = providers.Singleton(provides=StreamReplayer)
+    sampling_settings = providers.Singleton(provides=SamplingSettings)
+    latency_recorder = providers.Singleton(provides=LatencyRecorder)
+    single_flight = providers.Singleton(provides=SingleFlight)
+    lease_keeper = providers.Singleton(provides=LeaseKeeper)
+    wrapper_factory = providers.Singleton(
+        provides=WrapperFactory,
+        conditioning_cache=conditioning_cache,
+        write_behind_queue=write_behind_queue,
+        completion_notifier=completion_notifier,
+        output_cache=output_cache,
+        stream_replayer=stream_replayer,
+        sampling_settings=sampling_settings,
+        latency_recorder=latency_recorder,
+        single_flight=single_flight,
+        lease_keeper=lease_keeper,
+    )
     wrapper_registry = providers.Singleton(provides=WrapperRegistry, wrapper_factory=wrapper_factory)
 
     # Managers
-    session_manager = providers.Factory(provides=SessionManager, database_url=config.db.url)
+    # Session managers are cheap, all the session managers of a database share its engine and connection pool
+    session_manager = providers.Factory(
+        provides=SessionManager,
+        database_url=config.db.url,
+        sqlite_pragmas=config.db.sqlite,
+        pool_settings=config.db.pool,
+    )
     db_manager = providers.Factory(provides=DBManager, session_manager=session_manager)
     persistency_manager = providers.Singleton(
         provides=PersistencyManager, path=config.persistency.path, enabled=config.persistency.enabled
@@ -55,7 +90,7 @@ class DependencyContainer(containers.DeclarativeContainer):
 
         transformers_output_parser = providers.Factory(provides=TransformersTextGenerationParser)
         transformers_conditioning_parser = providers.Factory(TransformersTextGenerationConditioningParser)
-        transformers_hashing_function = providers.Object(provides=get_transformers_model_hash)
+        transformers_hashing_function = providers.Object(provides=memoize_model_hash(get_transformers_model_hash))
 
         transformers_json_path = providers.Factory(
             get_absolute_path, _TRANSFORMERS_JSON_PATH, relative_to=os.path.abspath(__file__)
@@ -113,7 +148,7 @@ class DependencyContainer(containers.DeclarativeContainer):
 
         diffusers_output_parser = providers.Factory(provides=StableDiffusionOutputParser)
         diffusers_conditioning_parser = providers.Factory(StableDiffusionConditioningParser)
-        diffusers_hashing_function = providers.Object(provides=get_diffusers_model_hash)
+        diffusers_hashing_function = providers.Object(provides=memoize_model_hash(get_diffusers_model_hash))
 
         diffusers_json_path = providers.Factory(
             get_absolute_path, _DIFFUSERS_JSON_PATH, relative_to=os.path.abspath(__file__)
@@ -1,6 +1,6 @@
 import inspect
 import sys
-from typing import Any, Callable, Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from attrs import define, field
 from loguru import logger
@@ -10,8 +10,7 @@ from genai_monitor.injectors.wrapper import (
     ArtifactFunctionWrapper,
     ArtifactMethodWrapper,
     ArtifactWrapperFactory,
-    FunctionWrapper,
-    MethodWrapper,
+    Wrapper,
     WrapperFactory,
     is_class_func,
 )
@@ -19,6 +18,7 @@ from genai_monitor.structures.conditioning_parsers.base import BaseConditioningP
 from genai_monitor.structures.output_parsers.base import BaseModelOutputParser
 from genai_monitor.structures.persistency_manager import PersistencyManager
 from genai_monitor.structures.runtime_manager import RuntimeManager
+from genai_monitor.structures.sampling import SamplingPolicy
 
 
 @define
@@ -33,7 +33,7 @@ class WrapperRegistry:
     """
 
     _wrapper_factory: WrapperFactory
-    _registry: Dict[str, Union[FunctionWrapper, MethodWrapper]] = field(factory=dict)
+    _registry: Dict[str, Wrapper] = field(factory=dict)
 
     def register(  # noqa: PLR0913
         self,
@@ -45,6 +45,8 @@ class WrapperRegistry:
         conditioning_parser: BaseConditioningParser,
         hashing_function: Callable[[Any], str],
         max_unique_instances: int = 1,
+        batch_generation: bool = False,
+        sampling_policy: Optional[SamplingPolicy] = None,
     ):
         """Register a function with the registry.
 
@@ -57,6 +59,8 @@ class WrapperRegistry:
             conditioning_parser: The conditioning parser.
             hashing_function: The hashing function.
             max_unique_instances: The maximum number of unique sample instances for each conditioning.
+            batch_generation: Whether the missing sample instances are generated by a single batched call.
+            sampling_policy: The policy deciding which calls are recorded, the global policy applies if None.
         """
         func_name = func.__qualname__
 
@@ -72,6 +76,8 @@ class WrapperRegistry:
             conditioning_parser=conditioning_parser,
             hashing_function=hashing_function,
             max_unique_instances=max_unique_instances,
+            batch_generation=batch_generation,
+            sampling_policy=sampling_policy,
         )
         self._registry[func_name] = wrapper
         func_wrapped = wrapper.wrap(func=func)
@@ -92,6 +98,17 @@ class WrapperRegistry:
         override_func_in_module(func=func, func_override=wrapper.func)
         override_func_in_imported_modules(func=func, func_override=wrapper.func)
 
+    def get_wrapper(self, func: Callable) -> Optional[Wrapper]:
+        """Get the wrapper of a registered function.
+
+        Args:
+            func: The registered function, either original or wrapped.
+
+        Returns:
+            The wrapper of the function, None if the function is not registered.
+        """
+        return self._registry.get(func.__qualname__)
+
     def get_registered_list(self) -> List[str]:
         """Get a list of registered functions.
 
@@ -1,71 +1,1328 @@
 # mypy: ignore-errors
+import asyncio
 import inspect
 import json
 import textwrap
 import time
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from copy import deepcopy
 from dataclasses import field
-from functools import wraps
-from typing import Any, Callable, List, Optional, Tuple, Type, Union
+from functools import partial, wraps
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, Union
 
-from attrs import define
+from attrs import Factory, define, evolve
 from loguru import logger
+from sqlalchemy import Row
 
+from genai_monitor.common.errors import GenerationTakenOverError
 from genai_monitor.common.structures.data import Artifact, Conditioning, Model, Sample
 from genai_monitor.common.types import SampleStatus
 from genai_monitor.db.manager import DBManager
 from genai_monitor.db.schemas.tables import (
     ArtifactTable,
     ConditioningTable,
-    ConfigurationTable,
     ModelTable,
     SampleTable,
 )
 from genai_monitor.static.constants import EMPTY_MODEL_HASH, UNKNOWN_MODEL_HASH
 from genai_monitor.static.fields import CONDITIONING_METADATA_FIELDNAME
+from genai_monitor.structures.cache import ByteBoundedLRUCache, LRUCache
+from genai_monitor.structures.completion_notifier import CompletionNotifier
 from genai_monitor.structures.conditioning_parsers.base import BaseConditioningParser
+from genai_monitor.structures.latency import LatencyRecorder
+from genai_monitor.structures.leases import LeaseKeeper
 from genai_monitor.structures.output_parsers.base import BaseModelOutputParser
 from genai_monitor.structures.persistency_manager import PersistencyManager
 from genai_monitor.structures.runtime_manager import RuntimeManager
+from genai_monitor.structures.sampling import SamplingPolicy, SamplingSettings
+from genai_monitor.structures.single_flight import Flight, FlightKey, SingleFlight
+from genai_monitor.structures.stream import AsyncChunkStream, ChunkStream, StreamReplayer
+from genai_monitor.structures.write_behind_queue import WriteBehindQueue
 from genai_monitor.utils.data_hashing import get_hash_from_jsonable
 
+# The columns of the sample table identifying the generation slots of a (model, conditioning, version) triple
+_SLOT_COLUMNS = ["id", "conditioning_id", "generation_id", "status", "lease_owner", "lease_expires_at"]
+
+# Set while the model of a tracked call runs, so that tracked functions called by the model itself are not tracked again
+_inside_tracked_call: ContextVar[bool] = ContextVar("genai_monitor_inside_tracked_call", default=False)
+
+
+@define
+class GenerationContext:
+    """State of a single tracked call, passed between the stages of the wrapper.
+
+    Attributes:
+        conditioning: The resolved conditioning.
+        generator: The model/function that produces the output.
+        generation_id: The generation id (from 0 to `max_unique_instances` - 1) reserved for the output.
+        placeholder: The sample placeholder created for the output, None if the output is not recorded.
+        batch_placeholders: The placeholders of all generation slots filled by a batched call, including `placeholder`,
+            empty if the call is not batched.
+        existing_generations: The slots of the existing generations to load the output from, empty if the output is
+            generated.
+        cached: Whether the output was loaded from an existing generation.
+        model_output: The output loaded from an existing generation.
+        generation_latency: The time in seconds the model took to generate the output, None if it did not run.
+    """
+
+    conditioning: Conditioning
+    generator: Optional[Model]
+    generation_id: Optional[int] = None
+    placeholder: Optional[Sample] = None
+    batch_placeholders: List[Sample] = Factory(list)
+    existing_generations: List[Row] = Factory(list)
+    cached: bool = False
+    model_output: Any = None
+    generation_latency: Optional[float] = None
+
+
+@define
+class BatchedCallContext:
+    """State of a tracked call decomposed into rows, passed between the stages of the wrapper.
+
+    Attributes:
+        rows: The contexts of the distinct rows of the call, in the order of their first occurrence.
+        row_indices: The index in `rows` of each row of the call.
+        args: The positional arguments of the call.
+        kwargs: The keyword arguments of the call.
+        call_args: The positional arguments running the model on the rows to generate.
+        call_kwargs: The keyword arguments running the model on the rows to generate.
+        merge_options: The keyword arguments of the output parser merging the outputs of the rows.
+        restricted: Whether the model runs on a subset of the rows of the call, or does not run at all.
+    """
+
+    rows: List[GenerationContext]
+    row_indices: List[int]
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    call_args: Tuple[Any, ...]
+    call_kwargs: Dict[str, Any]
+    merge_options: Dict[str, Any] = Factory(dict)
+    restricted: bool = False
+
+    @property
+    def generated_rows(self) -> List[GenerationContext]:
+        """The contexts of the rows the model runs on."""
+        return [row for row in self.rows if not row.cached]
+
 
 @define
 class Wrapper(ABC):
     """Abstract class for wrapping functions and methods.
 
-    This class is responsible for wrapping functions and methods with listening logic.
+    This class is responsible for wrapping functions and methods with listening logic.
+
+    Attributes:
+        db_manager: DBManager: The database manager.
+        persistency_manager: PersistencyManager: The persistency manager.
+        runtime_manager: RuntimeManager: The runtime manager.
+        output_parser: BaseModelOutputParser: The output parser.
+        conditioning_parser: BaseConditioningParser: The conditioning parser.
+        hashing_function: The hashing function.
+        func: The wrapped function or method.
+        conditioning_cache: The cache of resolved conditionings, keyed by the conditioning hash.
+        write_behind_queue: The queue recording the outputs in the background, if enabled.
+        completion_notifier: The notifier waking up the calls waiting for in-progress samples.
+        output_cache: The cache of decoded model outputs, keyed by the sample id.
+        batch_generation: Whether the missing generation slots of a conditioning are filled by a single batched call.
+        stream_replayer: The replayer of the outputs of streamed calls loaded from existing generations.
+        sampling_policy: The policy deciding which calls are recorded, the global policy applies if None.
+        sampling_settings: The global sampling settings.
+        latency_recorder: The recorder of the latencies of the stages of tracked calls.
+        single_flight: The table of the generations running in this process, followed by identical calls.
+        lease_keeper: The keeper of the leases of the sample placeholders generated in this process.
+    """
+
+    db_manager: DBManager
+    persistency_manager: PersistencyManager
+    runtime_manager: RuntimeManager
+    output_parser: BaseModelOutputParser
+    conditioning_parser: BaseConditioningParser
+    max_unique_instances: int
+    hashing_function: Callable[[Any], str]
+    func: Callable = field(init=False)
+    conditioning_cache: Optional[LRUCache[str, Conditioning]] = None
+    write_behind_queue: Optional[WriteBehindQueue] = None
+    completion_notifier: CompletionNotifier = Factory(CompletionNotifier)
+    output_cache: Optional[ByteBoundedLRUCache[int, Any]] = None
+    batch_generation: bool = False
+    stream_replayer: StreamReplayer = Factory(StreamReplayer)
+    sampling_policy: Optional[SamplingPolicy] = None
+    sampling_settings: SamplingSettings = Factory(SamplingSettings)
+    latency_recorder: LatencyRecorder = Factory(LatencyRecorder)
+    single_flight: SingleFlight = Factory(SingleFlight)
+    lease_keeper: LeaseKeeper = Factory(LeaseKeeper)
+
+    @abstractmethod
+    def wrap(self, func: Callable) -> Callable:
+        """Wraps the function or method.
+
+        Args:
+            func: The function or method to wrap.
+
+        Returns:
+            Callable: The wrapped function or method.
+        """
+
+    def _call_tracked(
+        self,
+        *,
+        func: Callable,
+        call: Callable,
+        model: Any,
+        name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """Executes a call of the wrapped function or method with tracking.
+
+        Args:
+            func: The original function or method, inspected to parse the conditioning.
+            call: The callable running the model on the call arguments.
+            model: The object identifying the model, passed to the hashing function.
+            name: The name of the model class/function.
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call.
+
+        Returns:
+            The output of the model, either generated or loaded from an existing generation. Streamed calls return
+            a stream of chunks, recorded once the caller exhausts it.
+        """
+        if _inside_tracked_call.get():
+            kwargs.pop(CONDITIONING_METADATA_FIELDNAME, None)
+            return call(*args, **kwargs)
+
+        sampling_policy = self._get_sampling_policy()
+        if sampling_policy is not None and not sampling_policy.sample():
+            return self._call_unsampled(
+                func=func,
+                call=call,
+                model=model,
+                name=name,
+                args=args,
+                kwargs=kwargs,
+                cache_lookup=sampling_policy.cache_lookup,
+            )
+
+        streamed = self._is_streamed_call(kwargs)
+        context = self._begin_call(func=func, model=model, name=name, args=args, kwargs=kwargs)
+        if isinstance(context, BatchedCallContext):
+            return self._call_rows_tracked(context=context, call=call)
+
+        if context.cached:
+            return self._replay_stream(context.model_output) if streamed else context.model_output
+
+        token = _inside_tracked_call.set(True)
+        started = time.perf_counter()
+        try:
+            model_output = call(*args, **kwargs)
+
+        except Exception as e:
+            self._fail_generation(context)
+            logger.error(f"Could not generate sample: {e}")
+            raise e
+
+        finally:
+            _inside_tracked_call.reset(token)
+
+        return self._finish_tracked_call(context=context, model_output=model_output, started=started, streamed=streamed)
+
+    async def _call_tracked_async(
+        self,
+        *,
+        func: Callable,
+        call: Callable[..., Awaitable[Any]],
+        model: Any,
+        name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """Executes a call of the wrapped coroutine function or method with tracking.
+
+        The database and persistency operations are offloaded to a worker thread, so they do not block the event loop.
+
+        Args:
+            func: The original coroutine function or method, inspected to parse the conditioning.
+            call: The coroutine function running the model on the call arguments.
+            model: The object identifying the model, passed to the hashing function.
+            name: The name of the model class/function.
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call.
+
+        Returns:
+            The output of the model, either generated or loaded from an existing generation. Streamed calls return
+            an asynchronous stream of chunks, recorded once the caller exhausts it.
+        """
+        if _inside_tracked_call.get():
+            kwargs.pop(CONDITIONING_METADATA_FIELDNAME, None)
+            return await call(*args, **kwargs)
+
+        # The worker threads run in copies of the caller's context, so the tracking state must exist before offloading
+        self.runtime_manager.get_tracking_state()
+
+        sampling_policy = self._get_sampling_policy()
+        if sampling_policy is not None and not sampling_policy.sample():
+            return await self._call_unsampled_async(
+                func=func,
+                call=call,
+                model=model,
+                name=name,
+                args=args,
+                kwargs=kwargs,
+                cache_lookup=sampling_policy.cache_lookup,
+            )
+
+        streamed = self._is_streamed_call(kwargs)
+        context = await asyncio.to_thread(self._begin_call, func=func, model=model, name=name, args=args, kwargs=kwargs)
+        if isinstance(context, BatchedCallContext):
+            return await self._call_rows_tracked_async(context=context, call=call)
+
+        if context.cached:
+            return self._replay_stream(context.model_output, asynchronous=True) if streamed else context.model_output
+
+        token = _inside_tracked_call.set(True)
+        started = time.perf_counter()
+        try:
+            model_output = await call(*args, **kwargs)
+
+        except Exception as e:
+            await asyncio.to_thread(self._fail_generation, context)
+            logger.error(f"Could not generate sample: {e}")
+            raise e
+
+        finally:
+            _inside_tracked_call.reset(token)
+
+        return await self._finish_tracked_call_async(
+            context=context, model_output=model_output, started=started, streamed=streamed
+        )
+
+    def _finish_tracked_call(
+        self, *, context: "GenerationContext", model_output: Any, started: float, streamed: bool
+    ) -> Any:
+        """Records the output of the model, or wraps a streamed output to record it once the caller exhausts it.
+
+        Args:
+            context: The context of the generation.
+            model_output: The output of the model.
+            started: The value of `time.perf_counter()` when the model was called.
+            streamed: Whether the call is streamed.
+
+        Returns:
+            The output for the caller.
+        """
+        if not streamed:
+            self._finish_model_execution(started, [context])
+            return self._complete_generation(context=context, model_output=model_output)
+
+        if context.placeholder is None:
+            return model_output
+        return ChunkStream(
+            model_output,
+            on_complete=partial(self._complete_stream, context, started),
+            on_abort=partial(self._fail_generation, context),
+        )
+
+    async def _finish_tracked_call_async(
+        self, *, context: "GenerationContext", model_output: Any, started: float, streamed: bool
+    ) -> Any:
+        """Records the output of the model in a worker thread, or wraps a streamed output in an asynchronous stream.
+
+        Args:
+            context: The context of the generation.
+            model_output: The output of the model.
+            started: The value of `time.perf_counter()` when the model was called.
+            streamed: Whether the call is streamed.
+
+        Returns:
+            The output for the caller.
+        """
+        if not streamed:
+            self._finish_model_execution(started, [context])
+            return await asyncio.to_thread(self._complete_generation, context=context, model_output=model_output)
+
+        if context.placeholder is None:
+            return model_output
+        return AsyncChunkStream(
+            model_output,
+            on_complete=partial(asyncio.to_thread, self._complete_stream, context, started),
+            on_abort=partial(asyncio.to_thread, self._fail_generation, context),
+        )
+
+    def _call_unsampled(
+        self,
+        *,
+        func: Callable,
+        call: Callable,
+        model: Any,
+        name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        cache_lookup: bool,
+    ) -> Any:
+        """Executes a call that is not sampled by the sampling policy, without recording its output.
+
+        Args:
+            func: The original function or method, inspected to parse the conditioning.
+            call: The callable running the model on the call arguments.
+            model: The object identifying the model, passed to the hashing function.
+            name: The name of the model class/function.
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call.
+            cache_lookup: Whether to return the output of an existing generation if there is one.
+
+        Returns:
+            The output of the model, either generated or loaded from an existing generation.
+        """
+        # The artifacts logged for the call would otherwise be attached to the next sampled call
+        self._take_pending_artifacts()
+        if cache_lookup:
+            found, model_output = self._lookup_existing_output(
+                func=func, model=model, name=name, args=args, kwargs=kwargs
+            )
+            if found:
+                return self._replay_stream(model_output) if self._is_streamed_call(kwargs) else model_output
+
+        kwargs.pop(CONDITIONING_METADATA_FIELDNAME, None)
+        token = _inside_tracked_call.set(True)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            _inside_tracked_call.reset(token)
+
+    async def _call_unsampled_async(
+        self,
+        *,
+        func: Callable,
+        call: Callable[..., Awaitable[Any]],
+        model: Any,
+        name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        cache_lookup: bool,
+    ) -> Any:
+        """Executes a coroutine call that is not sampled by the sampling policy, without recording its output.
+
+        Args:
+            func: The original coroutine function or method, inspected to parse the conditioning.
+            call: The coroutine function running the model on the call arguments.
+            model: The object identifying the model, passed to the hashing function.
+            name: The name of the model class/function.
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call.
+            cache_lookup: Whether to return the output of an existing generation if there is one.
+
+        Returns:
+            The output of the model, either generated or loaded from an existing generation.
+        """
+        self._take_pending_artifacts()
+        if cache_lookup:
+            found, model_output = await asyncio.to_thread(
+                self._lookup_existing_output, func=func, model=model, name=name, args=args, kwargs=kwargs
+            )
+            if found:
+                if self._is_streamed_call(kwargs):
+                    return self._replay_stream(model_output, asynchronous=True)
+                return model_output
+
+        kwargs.pop(CONDITIONING_METADATA_FIELDNAME, None)
+        token = _inside_tracked_call.set(True)
+        try:
+            return await call(*args, **kwargs)
+        finally:
+            _inside_tracked_call.reset(token)
+
+    def _lookup_existing_output(
+        self, *, func: Callable, model: Any, name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+    ) -> Tuple[bool, Any]:
+        """Looks up the output of a complete existing generation of the call, without writing to the database.
+
+        The generation with the latest instance id of the conditioning is preferred. Lookup errors are logged and
+        reported as a miss.
+
+        Args:
+            func: The original function or method, inspected to parse the conditioning.
+            model: The object identifying the model, passed to the hashing function.
+            name: The name of the model class/function.
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call.
+
+        Returns:
+            Whether an existing generation was found, and its output.
+        """
+        try:
+            hash_value = self.hashing_function(model)
+            if hash_value == UNKNOWN_MODEL_HASH:
+                return False, None
+
+            stream_argument = self.output_parser.stream_argument
+            conditioning_kwargs = (
+                {key: value for key, value in kwargs.items() if key != stream_argument}
+                if self._is_streamed_call(kwargs)
+                else kwargs
+            )
+            conditioning = self.conditioning_parser.parse_conditioning(func, *args, **conditioning_kwargs)
+
+            with self.db_manager.unit_of_work():
+                resolved_conditioning = self._get_cached_conditioning(conditioning)
+                if resolved_conditioning is None:
+                    existing_conditionings = self.db_manager.search(
+                        ConditioningTable, {"hash": conditioning.hash}, load="none"
+                    )
+                    if not existing_conditionings:
+                        return False, None
+                    resolved_conditioning = Conditioning.from_row(existing_conditionings[0])
+                    resolved_conditioning.value = conditioning.value
+                    self._cache_conditioning(resolved_conditioning)
+
+                existing_generators = self.db_manager.search(
+                    ModelTable, {"hash": hash_value, "model_class": name}, load="none"
+                )
+                if not existing_generators:
+                    return False, None
+
+                generator = Model.from_row(existing_generators[0])
+                complete_slots = [
+                    slot
+                    for slot in self._get_slots(generator, [resolved_conditioning]).get(resolved_conditioning.id, [])
+                    if slot.status == SampleStatus.COMPLETE.value
+                ]
+                if not complete_slots:
+                    return False, None
+
+                latest_instance = resolved_conditioning.value_metadata.get("latest_instance")
+                slot = next(
+                    (slot for slot in complete_slots if slot.generation_id == latest_instance), complete_slots[0]
+                )
+                sample = self.db_manager.get(SampleTable, slot.id)
+                logger.debug(f"Returning existing generation #{sample.id} for a call that is not sampled.")
+                return True, self._load_model_output(sample)
+
+        except Exception as e:
+            logger.error(f"Could not look up existing generations: {e}")
+            return False, None
+
+    def _get_sampling_policy(self) -> Optional[SamplingPolicy]:
+        """Gets the sampling policy of the wrapper, or the global sampling policy if the wrapper has none.
+
+        Returns:
+            The sampling policy, None if all calls are recorded.
+        """
+        if self.sampling_policy is not None:
+            return self.sampling_policy
+        return self.sampling_settings.policy
+
+    def _call_rows_tracked(self, *, context: "BatchedCallContext", call: Callable) -> Any:
+        """Executes a call decomposed into rows, running the model only on the rows without existing generations.
+
+        Args:
+            context: The context of the call.
+            call: The callable running the model on the call arguments.
+
+        Returns:
+            The output of the model for all rows of the call.
+        """
+        model_output = None
+        if context.generated_rows:
+            token = _inside_tracked_call.set(True)
+            started = time.perf_counter()
+            try:
+                model_output = call(*context.call_args, **context.call_kwargs)
+
+            except Exception as e:
+                self._fail_rows(context)
+                logger.error(f"Could not generate samples: {e}")
+                raise e
+
+            finally:
+                _inside_tracked_call.reset(token)
+
+            self._finish_model_execution(started, context.generated_rows)
+
+        return self._complete_rows(context=context, model_output=model_output)
+
+    async def _call_rows_tracked_async(
+        self, *, context: "BatchedCallContext", call: Callable[..., Awaitable[Any]]
+    ) -> Any:
+        """Executes a coroutine call decomposed into rows, running the model only on the rows to generate.
+
+        Args:
+            context: The context of the call.
+            call: The coroutine function running the model on the call arguments.
+
+        Returns:
+            The output of the model for all rows of the call.
+        """
+        model_output = None
+        if context.generated_rows:
+            token = _inside_tracked_call.set(True)
+            started = time.perf_counter()
+            try:
+                model_output = await call(*context.call_args, **context.call_kwargs)
+
+            except Exception as e:
+                await asyncio.to_thread(self._fail_rows, context)
+                logger.error(f"Could not generate samples: {e}")
+                raise e
+
+            finally:
+                _inside_tracked_call.reset(token)
+
+            self._finish_model_execution(started, context.generated_rows)
+
+        return await asyncio.to_thread(self._complete_rows, context=context, model_output=model_output)
+
+    def _begin_call(
+        self, *, func: Callable, model: Any, name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+    ) -> Union["GenerationContext", "BatchedCallContext"]:
+        """Hashes the model, parses the conditioning of the call and prepares the generation.
+
+        Calls passing batched values of the row arguments of the conditioning parser are decomposed into rows.
+        Calls identical to a generation of the only slot of a conditioning running in this process follow it.
+        If the generation is batched, the batch size argument of the output parser is added to the keyword arguments.
+        Streamed calls are neither decomposed nor batched, and share the conditioning of the same call without
+        streaming.
+
+        Args:
+            func: The original function or method, inspected to parse the conditioning.
+            model: The object identifying the model, passed to the hashing function.
+            name: The name of the model class/function.
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call, the conditioning metadata is removed from them.
+
+        Returns:
+            The context of the generation, or the context of the rows if the call is decomposed into rows.
+        """
+        with self.latency_recorder.measure("model_hashing"):
+            hash_value = self.hashing_function(model)
+        streamed = self._is_streamed_call(kwargs)
+        if self.conditioning_parser.row_arguments and not streamed:
+            batched_context = self._begin_batched_call(
+                func=func, model=model, hash_value=hash_value, name=name, args=args, kwargs=kwargs
+            )
+            if batched_context is not None:
+                return batched_context
+
+        stream_argument = self.output_parser.stream_argument
+        conditioning_kwargs = (
+            {key: value for key, value in kwargs.items() if key != stream_argument} if streamed else kwargs
+        )
+        with self.latency_recorder.measure("parse_conditioning"):
+            conditioning = self.conditioning_parser.parse_conditioning(func, *args, **conditioning_kwargs)
+        kwargs.pop(CONDITIONING_METADATA_FIELDNAME, None)
+
+        batch_size_argument = self.output_parser.batch_size_argument
+        allow_batch = (
+            self.batch_generation
+            and not streamed
+            and batch_size_argument is not None
+            and batch_size_argument not in kwargs
+        )
+        context = self._prepare_generation(
+            conditioning=conditioning, hash_value=hash_value, name=name, allow_batch=allow_batch
+        )
+        if context.batch_placeholders:
+            kwargs[batch_size_argument] = len(context.batch_placeholders)
+        return context
+
+    def _begin_batched_call(
+        self,
+        *,
+        func: Callable,
+        model: Any,
+        hash_value: str,
+        name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Optional["BatchedCallContext"]:
+        """Decomposes a batched call into rows and prepares the generation of each row.
+
+        Every row gets the conditioning of a single-row call. Rows with the same conditioning share a single
+        generation. The arguments of the call are restricted to the rows without existing generations. Calls whose
+        output the output parser cannot split into rows and merge back are not decomposed.
+
+        Args:
+            func: The original function or method, inspected to parse the conditionings.
+            model: The object identifying the model, passed to the output parser checking the output of the call.
+            hash_value: The hash of the model/function.
+            name: The name of the model class/function.
+            args: The positional arguments of the call.
+            kwargs: The keyword arguments of the call.
+
+        Returns:
+            The context of the rows, or None if the call is not decomposed into rows.
+        """
+        call_kwargs = {key: value for key, value in kwargs.items() if key != CONDITIONING_METADATA_FIELDNAME}
+        metadata = {key: value for key, value in kwargs.items() if key == CONDITIONING_METADATA_FIELDNAME}
+
+        # Every row of a call generating multiple outputs per row would need multiple samples
+        batch_size_argument = self.output_parser.batch_size_argument
+        if batch_size_argument is not None and call_kwargs.get(batch_size_argument) not in (None, 1):
+            return None
+
+        rows = self.conditioning_parser.split_rows(func, *args, **call_kwargs)
+        if rows is None:
+            return None
+
+        merge_options = self.output_parser.get_row_merge_options(model, call_kwargs)
+        if merge_options is None:
+            logger.debug("The output of the call cannot be split into rows, the call is not decomposed.")
+            return None
+
+        conditionings: List[Conditioning] = []
+        distinct_rows: List[Dict[str, Any]] = []
+        row_indices: List[int] = []
+        indices_by_hash: Dict[str, int] = {}
+        for row in rows:
+            row_args, row_kwargs = self.conditioning_parser.replace_call_arguments(func, args, call_kwargs, row)
+            with self.latency_recorder.measure("parse_conditioning"):
+                conditioning = self.conditioning_parser.parse_conditioning(func, *row_args, **row_kwargs, **metadata)
+            if conditioning.hash not in indices_by_hash:
+                indices_by_hash[conditioning.hash] = len(conditionings)
+                conditionings.append(conditioning)
+                distinct_rows.append(row)
+            row_indices.append(indices_by_hash[conditioning.hash])
+
+        row_contexts = self._prepare_rows(conditionings=conditionings, hash_value=hash_value, name=name)
+        context = BatchedCallContext(
+            rows=row_contexts,
+            row_indices=row_indices,
+            args=args,
+            kwargs=call_kwargs,
+            call_args=args,
+            call_kwargs=call_kwargs,
+            merge_options=merge_options,
+        )
+
+        missing_rows = [
+            row for row, row_context in zip(distinct_rows, row_contexts, strict=True) if not row_context.cached
+        ]
+        logger.info(
+            f"Found existing generations for {len(distinct_rows) - len(missing_rows)} of {len(distinct_rows)} "
+            "distinct rows."
+        )
+        # The repeated rows are generated once, so the call is restricted to the distinct rows if it repeats any
+        if len(missing_rows) == len(distinct_rows) and len(distinct_rows) == len(rows):
+            return context
+
+        context.restricted = True
+        if missing_rows:
+            context.call_args, context.call_kwargs = self.conditioning_parser.replace_call_arguments(
+                func, args, call_kwargs, self.conditioning_parser.merge_rows(missing_rows)
+            )
+        return context
+
+    def _prepare_generation(
+        self, conditioning: Conditioning, hash_value: str, name: str, allow_batch: bool = False
+    ) -> "GenerationContext":
+        """Resolves the conditioning and the model, and either loads an existing generation or reserves a new one.
+
+        The lookups, the sample placeholder and the reserved generation id are committed in a single unit of work
+        before the model runs. On SQLite, the unit of work takes the write lock of the database as soon as it begins,
+        so that concurrent calls, in this or other processes, never read the same generations and reserve the same
+        generation id. On other databases, the reservations are isolated only as far as the transaction isolation
+        level of the database allows.
+
+        Calls identical to a generation of the only slot of a conditioning running in this process follow it. The
+        flight of the slot is claimed before the slot is reserved, so that the identical calls arriving meanwhile follow
+        the call instead of racing it to the database.
+
+        Args:
+            conditioning: The conditioning parsed from the call arguments.
+            hash_value: The hash of the model/function.
+            name: The name of the model class/function.
+            allow_batch: Whether all missing generation slots can be reserved for a single batched call.
+
+        Returns:
+            The context of the generation, holding the model output if an existing generation was returned.
+        """
+        flight, flight_key, claimed = None, None, False
+        try:
+            with self.db_manager.unit_of_work(immediate=True):
+                # The flight key is computed in the unit of work, so that reading the version opens no other session
+                flight_key = self._get_joinable_flight_key(conditioning=conditioning, hash_value=hash_value)
+                if flight_key is not None:
+                    flight, claimed = self.single_flight.join(flight_key)
+                if flight is None or claimed:
+                    with self.latency_recorder.measure("resolve_conditioning"):
+                        conditioning = self._resolve_conditioning(conditioning)
+                    with self.latency_recorder.measure("get_generations"):
+                        generator, existing_generations = self._get_generations(hash_value, conditioning, name)
+                    context = self._reserve_generation(
+                        conditioning=conditioning,
+                        generator=generator,
+                        existing_generations=existing_generations,
+                        allow_batch=allow_batch,
+                    )
+
+        except Exception:
+            if claimed:
+                self.single_flight.abandon(flight, flight_key)
+            # The conditioning might have been cached with an id that was rolled back
+            if self.conditioning_cache is not None:
+                self.conditioning_cache.pop(conditioning.hash)
+            raise
+
+        if flight is not None and not claimed:
+            return self._follow_joined_flight(
+                flight, conditioning=conditioning, hash_value=hash_value, name=name, allow_batch=allow_batch
+            )
+
+        self._hold_leases(context)
+        self._begin_flights(hash_value, context)
+        if claimed:
+            # The followers look the generation up themselves if the call did not reserve the slot
+            self.single_flight.abandon(flight, flight_key)
+        if context.existing_generations:
+            self._load_existing_generation(context)
+        return context
+
+    def _prepare_rows(self, conditionings: List[Conditioning], hash_value: str, name: str) -> List["GenerationContext"]:
+        """Resolves the conditionings of the rows of a call and prepares the generation of each row.
+
+        The conditionings and the existing generations of all rows are looked up with a single query each, and the
+        placeholders of the rows to generate are reserved in a single unit of work, taking the write lock of a SQLite
+        database as soon as it begins, as in `_prepare_generation`.
+
+        Args:
+            conditionings: The distinct conditionings of the rows.
+            hash_value: The hash of the model/function.
+            name: The name of the model class/function.
+
+        Returns:
+            The contexts of the generations of the rows, in the order of the conditionings.
+        """
+        try:
+            with self.db_manager.unit_of_work(immediate=True):
+                with self.latency_recorder.measure("resolve_conditioning"):
+                    conditionings = self._resolve_conditionings(conditionings)
+                with self.latency_recorder.measure("get_generations"):
+                    generator = self._get_generator(hash_value, name)
+                    existing_generations = self._get_slots(generator, conditionings)
+                rows = [
+                    self._reserve_generation(
+                        conditioning=conditioning,
+                        generator=generator,
+                        existing_generations=existing_generations.get(conditioning.id, []),
+                    )
+                    for conditioning in conditionings
+                ]
+
+        except Exception:
+            if self.conditioning_cache is not None:
+                for conditioning in conditionings:
+                    self.conditioning_cache.pop(conditioning.hash)
+            raise
+
+        for row in rows:
+            self._hold_leases(row)
+            self._begin_flights(hash_value, row)
+            if row.existing_generations:
+                # Each row is loaded in its own unit of work, so that no write lock is held while waiting
+                self._load_existing_generation(row)
+            if row.cached and row.model_output is None:
+                row.cached = False
+        return rows
+
+    def _reserve_generation(
+        self,
+        conditioning: Conditioning,
+        generator: Model,
+        existing_generations: List[Row],
+        allow_batch: bool = False,
+    ) -> "GenerationContext":
+        """Reserves the generation slots filled by the call, or selects the existing generation to return.
+
+        Args:
+            conditioning: The resolved conditioning.
+            generator: The generator.
+            existing_generations: The slots of the complete and in-progress generations of the conditioning.
+            allow_batch: Whether all missing generation slots can be reserved for a single batched call.
+
+        Returns:
+            The context of the generation, with the existing generations to load the output from if all generation
+            slots are taken.
+        """
+        max_unique_instances = generator.model_metadata.get("max_unique_instances", 1)
+        next_instance = (conditioning.value_metadata.get("latest_instance", -1) + 1) % max_unique_instances
+        context = GenerationContext(conditioning=conditioning, generator=generator)
+
+        if not self.persistency_manager.enabled:
+            logger.info("PersistencyManager is disabled. Output will be generated.")
+            if not existing_generations:
+                context.placeholder = self._create_sample_placeholder(conditioning=conditioning, generator=generator)
+            return context
+
+        missing_instances = sorted(
+            set(range(max_unique_instances)) - {slot.generation_id for slot in existing_generations}
+        )
+        if allow_batch and len(existing_generations) < max_unique_instances and len(missing_instances) > 1:
+            if next_instance not in missing_instances:
+                next_instance = missing_instances[0]
+            logger.info(f"Generating {len(missing_instances)} instances in a single batched call.")
+            context.generation_id = next_instance
+            context.batch_placeholders = [
+                self._create_sample_placeholder(
+                    conditioning=conditioning, generator=generator, generation_id=generation_id
+                )
+                for generation_id in missing_instances
+            ]
+            context.placeholder = context.batch_placeholders[missing_instances.index(next_instance)]
+            self.update_generation_id(conditioning, next_instance)
+            return context
+
+        if len(existing_generations) < max_unique_instances:
+            context.generation_id = next_instance
+            context.placeholder = self._create_sample_placeholder(
+                conditioning=conditioning, generator=generator, generation_id=next_instance
+            )
+            self.update_generation_id(conditioning, next_instance)
+            return context
+
+        logger.info(f"Max instances ({max_unique_instances}) reached. Returning existing generation.")
+        context.generation_id = next_instance
+        context.existing_generations = existing_generations
+        return context
+
+    def _load_existing_generation(self, context: "GenerationContext"):
+        """Loads the output of the selected existing generation into the context.
+
+        If the generation runs in this process, its output is taken from its flight instead of the database and disk.
+        If the generation was abandoned by another process and the call takes over its lease, the output is generated
+        into its placeholder. If the output cannot be loaded, the context is left uncached and the output is generated
+        without recording.
+
+        Args:
+            context: The context of the generation.
+        """
+        try:
+            flight = self._find_flight_of_slot(context)
+            if flight is not None:
+                context.model_output = self._follow_flight(flight)
+                with self.db_manager.unit_of_work():
+                    self.update_generation_id(context.conditioning, context.generation_id)
+            else:
+                # Waits outside of a unit of work, so that the polls see the commits of the other processes
+                context.model_output = self._return_existing_generation(
+                    existing_generations=context.existing_generations,
+                    generator=context.generator,
+                    generation_id=context.generation_id,
+                    conditioning=context.conditioning,
+                )
+            context.cached = True
+
+        except GenerationTakenOverError as e:
+            self._resume_generation(context, e.sample_id)
+
+        except Exception as e:
+            logger.error(f"Could not return existing generation: {e}")
+            logger.info("Generating new sample without sample creation.")
+
+    def _complete_generation(self, context: "GenerationContext", model_output: Any) -> Any:
+        """Records the output of the model in a single unit of work.
+
+        The output of a batched call is split into the outputs of the reserved generation slots, which are all
+        recorded in the same unit of work. If the write-behind queue is enabled, the outputs are recorded by its
+        background worker instead.
+
+        Args:
+            context: The context of the generation.
+            model_output: The output of the model.
+
+        Returns:
+            The output for the caller, the output of the reserved generation slot if the call was batched.
+
+        Raises:
+            ValueError: If the output of a batched call does not split into the outputs of its generation slots.
+        """
+        if context.placeholder is None:
+            return model_output
+
+        outputs = [(context.placeholder, model_output)]
+        if context.batch_placeholders:
+            try:
+                split_outputs = self.output_parser.split_model_output(model_output)
+                if len(split_outputs) != len(context.batch_placeholders):
+                    raise ValueError(
+                        f"Expected {len(context.batch_placeholders)} outputs, but got {len(split_outputs)}."
+                    )
+            except Exception as e:
+                # The call was extended to the whole batch, so its output does not match what the caller asked for
+                logger.error(f"Could not split the output of the batched generation: {e}")
+                self._fail_generation(context)
+                raise
+
+            outputs = list(zip(context.batch_placeholders, split_outputs, strict=True))
+            model_output = split_outputs[context.batch_placeholders.index(context.placeholder)]
+
+        self._record_generations([(context, outputs)])
+        return model_output
+
+    def _complete_stream(self, context: "GenerationContext", started: float, chunks: List[Any]):
+        """Assembles the chunks of a streamed call and records the complete output.
+
+        The generation latency of a streamed call lasts until the caller exhausts the stream.
+
+        Args:
+            context: The context of the generation.
+            started: The value of `time.perf_counter()` when the model was called.
+            chunks: The chunks delivered to the caller.
+        """
+        self._finish_model_execution(started, [context])
+        try:
+            model_output = self.output_parser.assemble_stream(chunks)
+        except Exception as e:
+            logger.error(f"Could not assemble the streamed output: {e}")
+            self._fail_generation(context)
+            return
+
+        self._complete_generation(context=context, model_output=model_output)
+
+    def _replay_stream(self, model_output: Any, asynchronous: bool = False) -> Union[ChunkStream, AsyncChunkStream]:
+        """Replays the output loaded from an existing generation as a stream of synthetic chunks.
+
+        Args:
+            model_output: The output loaded from an existing generation.
+            asynchronous: Whether to replay the output as an asynchronous stream.
+
+        Returns:
+            The stream of the chunks.
+        """
+        chunks = self.output_parser.stream_model_output(model_output, self.stream_replayer.chunk_size)
+        return self.stream_replayer.replay_async(chunks) if asynchronous else self.stream_replayer.replay(chunks)
+
+    def _finish_model_execution(self, started: float, contexts: List["GenerationContext"]):
+        """Records the latency of a model run in the latency recorder and in the contexts of the generations.
+
+        Args:
+            started: The value of `time.perf_counter()` when the model was called.
+            contexts: The contexts of the generations produced by the model run.
+        """
+        generation_latency = time.perf_counter() - started
+        self.latency_recorder.record("model_execution", generation_latency)
+        for context in contexts:
+            context.generation_latency = generation_latency
+
+    def _is_streamed_call(self, kwargs: Dict[str, Any]) -> bool:
+        """Checks whether the call requests its output as a stream of chunks.
+
+        Args:
+            kwargs: The keyword arguments of the call.
+
+        Returns:
+            Whether the call is streamed.
+        """
+        stream_argument = self.output_parser.stream_argument
+        return stream_argument is not None and bool(kwargs.get(stream_argument))
+
+    def _complete_rows(self, context: "BatchedCallContext", model_output: Any) -> Any:
+        """Records the outputs of the generated rows and merges the outputs of all rows of the call.
+
+        The outputs of the generated rows are recorded in a single unit of work, or by the write-behind queue.
+
+        Args:
+            context: The context of the call.
+            model_output: The output of the model for the generated rows, None if the model did not run.
+
+        Returns:
+            The output for all rows of the call.
+
+        Raises:
+            ValueError: If the output of the generated rows does not split into rows, or the outputs of the rows do
+                not merge, while the model did not run on all rows of the call.
+        """
+        generated_rows = context.generated_rows
+        if generated_rows:
+            try:
+                split_outputs = self.output_parser.split_model_output(model_output)
+                if len(split_outputs) != len(generated_rows):
+                    raise ValueError(f"Expected {len(generated_rows)} outputs, but got {len(split_outputs)}.")
+            except Exception as e:
+                logger.error(f"Could not split the output of the batched call into rows: {e}")
+                self._fail_rows(context)
+                # The output of the model covers the call only if the model ran on all of its rows
+                if context.restricted:
+                    raise
+                return model_output
+
+            for row, row_output in zip(generated_rows, split_outputs, strict=True):
+                row.model_output = row_output
+            self._record_generations(
+                [(row, [(row.placeholder, row.model_output)]) for row in generated_rows if row.placeholder is not None]
+            )
+
+        try:
+            return self._merge_row_outputs(context)
+        except Exception as e:
+            logger.error(f"Could not merge the outputs of the rows: {e}")
+            if context.restricted:
+                raise
+            return model_output
+
+    def _merge_row_outputs(self, context: "BatchedCallContext") -> Any:
+        """Merges the outputs of the rows in the order of the call, copying the outputs shared by repeated rows.
+
+        Args:
+            context: The context of the call.
+
+        Returns:
+            The output for all rows of the call.
+        """
+        outputs, merged_rows = [], set()
+        for index in context.row_indices:
+            row_output = context.rows[index].model_output
+            outputs.append(self.output_parser.copy_model_output(row_output) if index in merged_rows else row_output)
+            merged_rows.add(index)
+        return self.output_parser.merge_model_outputs(outputs, **context.merge_options)
+
+    def _record_generations(self, generations: List[Tuple["GenerationContext", List[Tuple[Sample, Any]]]]):
+        """Records the outputs of generations in a single unit of work, or submits them to the write-behind queue.
+
+        If the write-behind queue is enabled, the placeholders become the latest sample right away and the pending
+        artifacts are taken from the caller's runtime state, so the outputs must not be modified in place until the
+        queue is flushed.
+
+        Args:
+            generations: The contexts of the generations, with the sample placeholders and the model outputs to record.
+        """
+        if self.write_behind_queue is not None and self.write_behind_queue.enabled:
+            for context, outputs in generations:
+                self.runtime_manager.latest_sample = context.placeholder
+                self.write_behind_queue.submit(
+                    db_manager=self.db_manager,
+                    job=partial(
+                        self._record_outputs,
+                        context=context,
+                        outputs=outputs,
+                        artifacts=self._take_pending_artifacts(),
+                        update_latest_sample=False,
+                    ),
+                    on_commit=partial(self._notify_completion, outputs),
+                    on_error=partial(self._notify_failure, outputs),
+                )
+            return
+
+        try:
+            with self.db_manager.unit_of_work():
+                for context, outputs in generations:
+                    self._record_outputs(context=context, outputs=outputs)
+                commit_started = time.perf_counter()
+        except Exception:
+            for _, outputs in generations:
+                self._notify_failure(outputs)
+            raise
+        self.latency_recorder.record("db_commit", time.perf_counter() - commit_started)
+        for _, outputs in generations:
+            self._notify_completion(outputs)
+
+    def _record_outputs(
+        self,
+        context: "GenerationContext",
+        outputs: List[Tuple[Sample, Any]],
+        artifacts: Optional[List[Artifact]] = None,
+        update_latest_sample: bool = True,
+    ):
+        """Updates the sample placeholders with the model outputs.
+
+        The artifacts are attached and the latest sample is set only for the placeholder of the call.
+
+        Args:
+            context: The context of the generation.
+            outputs: The sample placeholders and the model outputs to record in them.
+            artifacts: The artifacts to attach to the sample, the pending artifacts of the runtime manager if None.
+            update_latest_sample: Whether the sample of the call becomes the latest sample of the runtime manager.
+        """
+        for sample, model_output in outputs:
+            is_call_sample = sample is context.placeholder
+            self._finish_sample_generation(
+                sample=sample,
+                model_output=model_output,
+                conditioning=context.conditioning,
+                generator=context.generator,
+                generation_id=sample.generation_id,
+                artifacts=artifacts if is_call_sample else [],
+                update_latest_sample=update_latest_sample and is_call_sample,
+                generation_latency=context.generation_latency,
+            )
+
+    def _notify_completion(self, outputs: List[Tuple[Sample, Any]]):
+        self._release_leases(outputs)
+        for sample, model_output in outputs:
+            self.completion_notifier.notify(sample.id)
+            self.single_flight.complete(sample.id, model_output)
+
+    def _notify_failure(self, outputs: List[Tuple[Sample, Any]]):
+        # The placeholders stay in progress, their leases expire so that the waiting calls can take them over
+        self._release_leases(outputs)
+        for sample, _ in outputs:
+            self.completion_notifier.notify(sample.id)
+            self.single_flight.fail(sample.id)
+
+    def _release_leases(self, outputs: List[Tuple[Sample, Any]]):
+        for sample, _ in outputs:
+            self.lease_keeper.release(sample.id)
+
+    def _hold_leases(self, context: "GenerationContext"):
+        """Renews the leases of the sample placeholders reserved by the call until the generation is finished.
+
+        The leases are held only once the reservation is committed, so that the heartbeat does not miss them.
+
+        Args:
+            context: The context of the generation.
+        """
+        for sample in context.batch_placeholders or ([context.placeholder] if context.placeholder else []):
+            self.lease_keeper.hold(self.db_manager, sample.id)
+
+    def _resume_generation(self, context: "GenerationContext", sample_id: int):
+        """Makes the call generate the output of an abandoned generation whose lease it took over.
+
+        Args:
+            context: The context of the generation.
+            sample_id: The id of the placeholder of the abandoned generation.
+        """
+        context.placeholder = Sample.from_row(self.db_manager.get(SampleTable, sample_id, load="none"))
+        context.existing_generations = []
+        with self.db_manager.unit_of_work():
+            self.update_generation_id(context.conditioning, context.generation_id)
+        self._begin_flights(context.generator.hash, context)
+
+    def _begin_flights(self, hash_value: str, context: "GenerationContext"):
+        """Starts the flights of the generation slots reserved by the call.
+
+        Args:
+            hash_value: The hash of the model/function.
+            context: The context of the generation.
+        """
+        for sample in context.batch_placeholders or ([context.placeholder] if context.placeholder else []):
+            if sample.generation_id is not None:
+                key = self._get_flight_key(hash_value, context.conditioning, sample.generation_id)
+                self.single_flight.begin(key, sample)
+
+    def _get_joinable_flight_key(self, conditioning: Conditioning, hash_value: str) -> Optional[FlightKey]:
+        """Gets the key of the flight of the only generation slot of the conditioning.
+
+        The flight is found without querying the generation slots, so it is only joined if the conditioning has a
+        single generation slot. Otherwise, the slot is selected from the database first.
+
+        Args:
+            conditioning: The conditioning parsed from the call arguments.
+            hash_value: The hash of the model/function.
+
+        Returns:
+            The key of the flight, None if the calls of the conditioning cannot join a flight before the lookups.
+        """
+        if self.max_unique_instances != 1 or hash_value == UNKNOWN_MODEL_HASH:
+            return None
+        return self._get_flight_key(hash_value, conditioning, 0)
+
+    def _follow_joined_flight(
+        self, flight: Flight, conditioning: Conditioning, hash_value: str, name: str, allow_batch: bool
+    ) -> "GenerationContext":
+        """Follows the generation of the only slot of the conditioning running in this process.
+
+        Args:
+            flight: The flight of the generation.
+            conditioning: The conditioning parsed from the call arguments.
+            hash_value: The hash of the model/function.
+            name: The name of the model class/function.
+            allow_batch: Whether all missing generation slots can be reserved for a single batched call.
+
+        Returns:
+            The context holding the output of the flight, an uncached context without a placeholder if the flight
+            timed out, or the context prepared from the database if the flight failed.
+        """
+        try:
+            model_output = self._follow_flight(flight)
+        except TimeoutError as e:
+            logger.error(f"Could not return existing generation: {e}")
+            logger.info("Generating new sample without sample creation.")
+            return GenerationContext(conditioning=conditioning, generator=None)
+        except Exception as e:
+            logger.info(f"Could not follow the generation running in this process: {e}")
+            return self._prepare_generation(
+                conditioning=conditioning, hash_value=hash_value, name=name, allow_batch=allow_batch
+            )
+        return GenerationContext(conditioning=conditioning, generator=None, cached=True, model_output=model_output)
+
+    def _find_flight_of_slot(self, context: "GenerationContext") -> Optional[Flight]:
+        """Finds the flight of the selected existing generation if it is in progress in this process.
+
+        Args:
+            context: The context of the generation.
+
+        Returns:
+            The flight, None if the generation is not in progress or runs in another process.
+        """
+        if context.generator is None:
+            return None
+
+        slots = [slot for slot in context.existing_generations if slot.generation_id == context.generation_id]
+        if len(slots) != 1 or slots[0].status != SampleStatus.IN_PROGRESS.value:
+            return None
+        return self.single_flight.find(
+            self._get_flight_key(context.generator.hash, context.conditioning, context.generation_id)
+        )
+
+    def _follow_flight(self, flight: Flight) -> Any:
+        """Waits for a generation running in this process and returns a copy of its output.
 
-    Attributes:
-        db_manager: DBManager: The database manager.
-        persistency_manager: PersistencyManager: The persistency manager.
-        runtime_manager: RuntimeManager: The runtime manager.
-        output_parser: BaseModelOutputParser: The output parser.
-        conditioning_parser: BaseConditioningParser: The conditioning parser.
-        hashing_function: The hashing function.
-        func: The wrapped function or method.
-    """
+        The generated sample becomes the latest sample, and the pending artifacts are attached to it.
 
-    db_manager: DBManager
-    persistency_manager: PersistencyManager
-    runtime_manager: RuntimeManager
-    output_parser: BaseModelOutputParser
-    conditioning_parser: BaseConditioningParser
-    max_unique_instances: int
-    hashing_function: Callable[[Any], str]
-    func: Callable = field(init=False)
+        Args:
+            flight: The flight of the generation.
 
-    @abstractmethod
-    def wrap(self, func: Callable) -> Callable:
-        """Wraps the function or method.
+        Returns:
+            The copy of the output of the generation.
+
+        Raises:
+            TimeoutError: If the generation does not complete within the timeout of the completion notifier.
+            RuntimeError: If the generation fails.
+        """
+        logger.info("Waiting for the identical generation running in this process.")
+        if not flight.wait(timeout=self.completion_notifier.timeout):
+            raise TimeoutError(
+                f"The identical generation did not complete within {self.completion_notifier.timeout} seconds."
+            )
+        if flight.failed:
+            raise RuntimeError("The identical generation failed.")
+
+        self.runtime_manager.latest_sample = flight.sample
+        self.attach_artifacts_to_sample(flight.sample)
+        return self.output_parser.copy_model_output(flight.model_output)
+
+    def _get_flight_key(self, hash_value: str, conditioning: Conditioning, generation_id: int) -> FlightKey:
+        return hash_value, conditioning.hash, self._get_current_version(), generation_id
+
+    def _fail_generation(self, context: "GenerationContext"):
+        """Marks the sample placeholders of a failed generation.
+
+        The placeholders whose leases were taken over by another process are left to it.
 
         Args:
-            func: The function or method to wrap.
+            context: The context of the generation.
+        """
+        if context.placeholder is None:
+            return
 
-        Returns:
-            Callable: The wrapped function or method.
+        for sample in context.batch_placeholders or [context.placeholder]:
+            self.lease_keeper.release(sample.id)
+            self.db_manager.update_where(
+                model=SampleTable,
+                filters={"id": sample.id, "lease_owner": self.lease_keeper.owner},
+                values={"status": SampleStatus.FAILED.value},
+            )
+            self.completion_notifier.notify(sample.id)
+            self.single_flight.fail(sample.id)
+
+    def _fail_rows(self, context: "BatchedCallContext"):
+        """Marks the sample placeholders of the generated rows of a failed call.
+
+        Args:
+            context: The context of the call.
         """
+        for row in context.generated_rows:
+            self._fail_generation(row)
 
     def _save_sample(
         self,
@@ -86,7 +1343,7 @@ class Wrapper(ABC):
         sample.model_id = generator.id
         sample.version = self._get_current_version()
 
-        existing_conditioning = self.db_manager.search(ConditioningTable, {"id": conditioning.id})
+        existing_conditioning = self.db_manager.search(ConditioningTable, {"id": conditioning.id}, load="none")
         if existing_conditioning:
             sample.conditioning_id = conditioning.id
         else:
@@ -111,21 +1368,33 @@ class Wrapper(ABC):
         conditioning: Conditioning,
         generator: Model,
         generation_id: Optional[int] = None,
+        *,
+        artifacts: Optional[List[Artifact]] = None,
+        update_latest_sample: bool = True,
+        generation_latency: Optional[float] = None,
     ):
         """Updates sample placeholder with the model output and saves it to the database.
 
+        The generation latency is stored in the metadata of the sample, under the `generation_latency` key. If the
+        lease of the placeholder was taken over by another process, the placeholder is left to it, and neither the
+        output nor the artifacts are recorded.
+
         Args:
             sample: The sample placeholder.
             model_output: The output of the model.
             conditioning: The conditioning.
             generator: The generator.
             generation_id: The generation id (from 0 to `max_unique_instances` - 1).
+            artifacts: The artifacts to attach to the sample, the pending artifacts of the runtime manager if None.
+            update_latest_sample: Whether the updated sample becomes the latest sample of the runtime manager.
+            generation_latency: The time in seconds the model took to generate the output.
         """
-        updates = {
-            "hash": self.output_parser.get_model_output_hash(model_output),
-        }
+        with self.latency_recorder.measure("output_hashing"):
+            updates = {
+                "hash": self.output_parser.get_model_output_hash(model_output),
+            }
 
-        existing_conditioning = self.db_manager.search(ConditioningTable, {"id": conditioning.id})
+        existing_conditioning = self.db_manager.search(ConditioningTable, {"id": conditioning.id}, load="none")
         if existing_conditioning:
             updates["conditioning_id"] = conditioning.id
         else:
@@ -140,27 +1409,59 @@ class Wrapper(ABC):
         if generation_id is not None:
             updates["generation_id"] = generation_id
 
+        if generation_latency is not None:
+            updates["meta"] = {"generation_latency": generation_latency}
+
         updates["version"] = self._get_current_version()
         updates["status"] = SampleStatus.COMPLETE.value
-        sample = Sample.from_orm(
-            self.db_manager.update(model=SampleTable, filters={"id": sample.id}, values=updates)[0]
+        updated_samples = self.db_manager.update(
+            model=SampleTable,
+            filters={"id": sample.id, "lease_owner": self.lease_keeper.owner},
+            values=updates,
+            load="none",
         )
-        self.runtime_manager.latest_sample = sample
-        sample.data = self.output_parser.model_output_to_bytes(model_output)
-        self.persistency_manager.save_sample(sample)
+        if not updated_samples:
+            logger.warning(f"The lease of sample #{sample.id} was taken over by another process, output not recorded.")
+            return
+
+        sample = Sample.from_orm(updated_samples[0])
+        if update_latest_sample:
+            self.runtime_manager.latest_sample = sample
+        with self.latency_recorder.measure("output_serialization"):
+            sample.data = self.output_parser.model_output_to_bytes(model_output)
+        with self.latency_recorder.measure("save_to_disk"):
+            self.persistency_manager.save_sample(sample)
         logger.info(f"Saved sample #{sample.id} to database.")
-        self.attach_artifacts_to_sample(sample)
+        self.attach_artifacts_to_sample(sample, artifacts=artifacts)
 
-    def _get_generations(self, hash_value: str, conditioning: Conditioning, name: str) -> Tuple[Model, List[Sample]]:
+    def _get_generations(self, hash_value: str, conditioning: Conditioning, name: str) -> Tuple[Model, List[Row]]:
         """Get existing generations from the database.
 
+        Only the slot columns (id, conditioning_id, generation_id, status and lease) of the generations are selected,
+        in a single query.
+
         Args:
             hash_value: The hash of the model/function.
             conditioning: The conditioning.
             name: The name of the model class/function.
 
         Returns:
-            The generator and the existing generations.
+            The generator and the slots of the complete and in-progress generations.
+        """
+        generator = self._get_generator(hash_value, name)
+        return generator, self._get_slots(generator, [conditioning]).get(conditioning.id, [])
+
+    def _get_generator(self, hash_value: str, name: str) -> Optional[Model]:
+        """Finds the model in the database or registers it if it does not exist yet.
+
+        A missing model is upserted, so that concurrent callers registering the same model get the same record.
+
+        Args:
+            hash_value: The hash of the model/function.
+            name: The name of the model class/function.
+
+        Returns:
+            The generator, None if the model could not be hashed.
         """
         if hash_value == UNKNOWN_MODEL_HASH:
             logger.error(
@@ -168,156 +1469,346 @@ class Wrapper(ABC):
                 f"Without a proper hashing function, it will not be possible to find "
                 f"corresponding entries in the database."
             )
-            generator = None
-            generations_complete = self.db_manager.search(
-                SampleTable,
-                {
-                    "conditioning_id": conditioning.id,
-                    "model_id": None,
-                    "version": self._get_current_version(),
-                    "status": SampleStatus.COMPLETE.value,
-                },
-            )
-            generations_in_progress = self.db_manager.search(
-                SampleTable,
-                {
-                    "conditioning_id": conditioning.id,
-                    "model_id": None,
-                    "version": self._get_current_version(),
-                    "status": SampleStatus.IN_PROGRESS.value,
-                },
-            )
-            existing_generations = generations_complete + generations_in_progress
-            return generator, existing_generations
+            return None
 
-        existing_generators = self.db_manager.search(ModelTable, {"hash": hash_value, "model_class": name})
+        existing_generators = self.db_manager.search(ModelTable, {"hash": hash_value, "model_class": name}, load="none")
         if not existing_generators:
             logger.info(f"{name} with hash {hash_value} not found in the DB. Registering now.")
             generator = Model(model_class=name, hash=hash_value)
             generator.model_metadata = {"max_unique_instances": self.max_unique_instances}
-            generator = Model.from_orm(self.db_manager.save(generator.to_orm()))
-        else:
-            logger.info(f"Found existing generator with hash {hash_value}.")
-            generator = Model.from_orm(existing_generators[0])
+            return Model.from_row(self.db_manager.upsert(generator.to_orm(), keys=["hash", "model_class"]))
 
-        generations_complete = self.db_manager.search(
-            SampleTable,
-            {
-                "model_id": generator.id,
-                "conditioning_id": conditioning.id,
-                "version": self._get_current_version(),
-                "status": SampleStatus.COMPLETE.value,
-            },
-        )
-        generations_in_progress = self.db_manager.search(
+        logger.info(f"Found existing generator with hash {hash_value}.")
+        return Model.from_row(existing_generators[0])
+
+    def _get_slots(self, generator: Optional[Model], conditionings: List[Conditioning]) -> Dict[int, List[Row]]:
+        """Gets the slots of the complete and in-progress generations of the conditionings with a single query.
+
+        Args:
+            generator: The generator.
+            conditionings: The resolved conditionings.
+
+        Returns:
+            The slots of the generations, by conditioning id.
+        """
+        slots = self.db_manager.search_columns(
             SampleTable,
-            {
-                "model_id": generator.id,
-                "conditioning_id": conditioning.id,
+            columns=_SLOT_COLUMNS,
+            filters={
+                "model_id": generator.id if generator is not None else None,
+                "conditioning_id": [conditioning.id for conditioning in conditionings],
                 "version": self._get_current_version(),
-                "status": SampleStatus.IN_PROGRESS.value,
             },
         )
-        existing_generations = generations_complete + generations_in_progress
-        return generator, existing_generations
+
+        existing_generations: Dict[int, List[Row]] = {}
+        for slot in slots:
+            if slot.status != SampleStatus.FAILED.value:
+                existing_generations.setdefault(slot.conditioning_id, []).append(slot)
+        return existing_generations
 
     def _return_existing_generation(
         self,
-        existing_generations: List[Sample],
+        existing_generations: List[Row],
         generation_id: Optional[int] = None,
         generator: Model = None,
+        conditioning: Optional[Conditioning] = None,
     ) -> Any:
         """Handle existing generations.
 
+        The generation is awaited first, and its output is loaded in a single unit of work, which also updates the
+        latest instance of the conditioning.
+
         Args:
-            existing_generations: The existing generations.
-            hash_value: The hash of the model/function.
+            existing_generations: The slots (id, generation_id, status and lease) of the existing generations.
             generation_id: The generation id.
             generator: The generator.
+            conditioning: The conditioning whose latest instance becomes the generation id, left as is if None.
 
         Returns:
             Any: The output of the model.
 
         Raises:
             FileNotFoundError: If the data cannot be loaded from disk.
+            TimeoutError: If the generation does not complete within the timeout of the completion notifier.
+            RuntimeError: If the generation fails.
+            GenerationTakenOverError: If the call took over the expired lease of the generation.
         """
         logger.info("Found existing generations, loading data from disk.")
 
-        samples = [sample for sample in existing_generations if Sample.from_orm(sample).generation_id == generation_id]
-        if not samples:
+        slots = [slot for slot in existing_generations if slot.generation_id == generation_id]
+        if not slots:
             logger.error(f"Could not find generation with id {generation_id}")
             return None
-        if len(samples) > 1:
+        if len(slots) > 1:
             logger.error(f"Found multiple generations with id {generation_id}")
             return None
 
-        sample = samples[0]
-        while sample.status != SampleStatus.COMPLETE.value:
-            logger.info(f"Generation {sample.id} is not complete. Waiting for completion...")
-            time.sleep(1)
-            sample = self.db_manager.search(SampleTable, {"id": sample.id})[0]
+        self._wait_for_completion(slots[0])
+        with self.db_manager.unit_of_work():
+            sample = self.db_manager.get(SampleTable, slots[0].id, load="none")
+            if conditioning is not None:
+                self.update_generation_id(conditioning, generation_id)
 
-        try:
-            self.runtime_manager.latest_sample = sample
-            sample.data = self.persistency_manager.load_sample(sample)
-            model_output = self.output_parser.get_model_output_from_sample(sample)
-            self.attach_artifacts_to_sample(sample)
+            try:
+                self.runtime_manager.latest_sample = sample
+                model_output = self._load_model_output(sample)
+                self.attach_artifacts_to_sample(sample)
+                return model_output
+
+            except FileNotFoundError as e:
+                logger.error(f"Failed to load data from disk: {e}")
+
+    def _load_model_output(self, sample: SampleTable) -> Any:
+        """Loads the model output of a complete sample, from the output cache if possible.
+
+        Decoded outputs are kept in the output cache if the output parser allows it. Copies of the cached outputs are
+        returned, so that the callers cannot modify them.
+
+        Args:
+            sample: The complete sample.
+
+        Returns:
+            The model output of the sample.
+
+        Raises:
+            FileNotFoundError: If the data cannot be loaded from disk.
+        """
+        use_cache = self.output_cache is not None and self.output_parser.cache_decoded_outputs
+        if use_cache:
+            model_output = self.output_cache.get(sample.id)
+            if model_output is not None:
+                logger.debug(f"Found output of sample #{sample.id} in the output cache.")
+                return self.output_parser.copy_model_output(model_output)
+
+        sample.data = self.persistency_manager.load_sample(sample)
+        model_output = self.output_parser.get_model_output_from_sample(sample)
+        if not use_cache:
             return model_output
 
-        except FileNotFoundError as e:
-            logger.error(f"Failed to load data from disk: {e}")
+        size = self.output_parser.get_model_output_size(model_output, sample.data)
+        self.output_cache.put(sample.id, model_output, size=size)
+        return self.output_parser.copy_model_output(model_output)
+
+    def _wait_for_completion(self, slot: Row) -> Row:
+        """Waits until the generation in the slot is complete.
+
+        The call is woken up by the completion notifier if the generation is finished in this process, otherwise the
+        status of the slot is polled with exponential backoff. If the lease of the generation expires, e.g. because the
+        process generating it crashed, the call tries to take it over.
+
+        Args:
+            slot: The slot (id, generation_id, status and lease) of the generation to wait for.
+
+        Returns:
+            The slot of the completed generation.
+
+        Raises:
+            TimeoutError: If the sample does not complete within the timeout of the completion notifier.
+            RuntimeError: If the generation of the sample fails.
+            GenerationTakenOverError: If the call took over the expired lease of the generation.
+        """
+        timeout = self.completion_notifier.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        poll_intervals = self.completion_notifier.poll_intervals()
+
+        while slot.status != SampleStatus.COMPLETE.value:
+            if slot.status == SampleStatus.FAILED.value:
+                raise RuntimeError(f"Generation {slot.id} failed.")
+            if self.lease_keeper.is_expired(slot) and self.lease_keeper.take_over(self.db_manager, slot):
+                raise GenerationTakenOverError(slot.id)
+
+            wait_time = next(poll_intervals)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Generation {slot.id} did not complete within {timeout} seconds.")
+                wait_time = min(wait_time, remaining)
+
+            logger.info(f"Generation {slot.id} is not complete. Waiting for completion...")
+            self.completion_notifier.wait(slot.id, timeout=wait_time)
+            slot = self.db_manager.search_columns(SampleTable, columns=_SLOT_COLUMNS, filters={"id": slot.id})[0]
+
+        return slot
 
     def _resolve_conditioning(self, conditioning: Conditioning) -> Conditioning:
-        existing_conditioning = self.db_manager.search(ConditioningTable, {"hash": conditioning.hash})
+        """Finds the conditioning in the database or saves it if it does not exist yet.
 
-        if existing_conditioning:
-            conditioning_text = textwrap.shorten(json.dumps(conditioning.value), width=200, placeholder="...")
-            logger.info(f"Found existing conditioning with value {conditioning_text}.")
-            conditioning = Conditioning.from_orm(existing_conditioning[0])
+        The value of the conditioning is identified by its hash, so the value computed by the caller is kept and
+        never reloaded from disk. Resolved conditionings are kept in the conditioning cache.
 
-            if self.persistency_manager.enabled:
-                conditioning.value = self.persistency_manager.load_conditioning(conditioning)
-        else:  # noqa: PLR5501
-            if self.persistency_manager.enabled:
+        Args:
+            conditioning: The conditioning parsed from the call arguments.
+
+        Returns:
+            The conditioning with the database id and metadata.
+        """
+        return self._resolve_conditionings([conditioning])[0]
+
+    def _resolve_conditionings(self, conditionings: List[Conditioning]) -> List[Conditioning]:
+        """Finds the conditionings in the database with a single query, saving the ones that do not exist yet.
+
+        The missing conditionings are upserted, so that concurrent callers saving the same conditioning get the same
+        record.
+
+        Args:
+            conditionings: The conditionings parsed from the call arguments, with distinct hashes.
+
+        Returns:
+            The conditionings with the database ids and metadata, in the same order.
+        """
+        resolved_conditionings: Dict[str, Conditioning] = {}
+        for conditioning in conditionings:
+            cached_conditioning = self._get_cached_conditioning(conditioning)
+            if cached_conditioning is not None:
+                logger.debug(f"Found conditioning #{cached_conditioning.id} in the conditioning cache.")
+                resolved_conditionings[conditioning.hash] = cached_conditioning
+
+        uncached_conditionings = [
+            conditioning for conditioning in conditionings if conditioning.hash not in resolved_conditionings
+        ]
+        if uncached_conditionings:
+            existing_conditionings = {
+                existing_conditioning.hash: existing_conditioning
+                for existing_conditioning in self.db_manager.search(
+                    ConditioningTable,
+                    {"hash": [conditioning.hash for conditioning in uncached_conditionings]},
+                    load="none",
+                )
+            }
+
+        for conditioning in uncached_conditionings:
+            existing_conditioning = existing_conditionings.get(conditioning.hash)
+
+            if existing_conditioning is not None:
+                conditioning_text = textwrap.shorten(json.dumps(conditioning.value), width=200, placeholder="...")
+                logger.info(f"Found existing conditioning with value {conditioning_text}.")
                 value = conditioning.value
-                conditioning.value = None
-                conditioning = Conditioning.from_orm(self.db_manager.save(conditioning.to_orm()))
-                conditioning.value = value
-                self.persistency_manager.save_conditioning(conditioning)
-            else:
-                conditioning = Conditioning.from_orm(self.db_manager.save(conditioning.to_orm()))
+                resolved_conditioning = Conditioning.from_row(existing_conditioning)
+                resolved_conditioning.value = value
+            else:  # noqa: PLR5501
+                if self.persistency_manager.enabled:
+                    value = conditioning.value
+                    conditioning.value = None
+                    resolved_conditioning = Conditioning.from_row(
+                        self.db_manager.upsert(conditioning.to_orm(), keys=["hash"])
+                    )
+                    conditioning.value = value
+                    resolved_conditioning.value = value
+                    self.persistency_manager.save_conditioning(resolved_conditioning)
+                else:
+                    resolved_conditioning = Conditioning.from_row(
+                        self.db_manager.upsert(conditioning.to_orm(), keys=["hash"])
+                    )
+
+            self._cache_conditioning(resolved_conditioning)
+            resolved_conditionings[conditioning.hash] = resolved_conditioning
 
-        return conditioning
+        return [resolved_conditionings[conditioning.hash] for conditioning in conditionings]
 
-    def attach_artifacts_to_sample(self, sample: Sample) -> None:
+    def _get_cached_conditioning(self, conditioning: Conditioning) -> Optional[Conditioning]:
+        """Gets the resolved conditioning from the conditioning cache.
+
+        Args:
+            conditioning: The conditioning parsed from the call arguments.
+
+        Returns:
+            The resolved conditioning with the value of the parsed conditioning or None on cache miss.
+        """
+        if self.conditioning_cache is None:
+            return None
+
+        cached_conditioning = self.conditioning_cache.get(conditioning.hash)
+        if cached_conditioning is None:
+            return None
+
+        return Conditioning(
+            id=cached_conditioning.id,
+            type_id=cached_conditioning.type_id,
+            value=conditioning.value,
+            hash=cached_conditioning.hash,
+            value_metadata=deepcopy(cached_conditioning.value_metadata),
+        )
+
+    def _cache_conditioning(self, conditioning: Conditioning):
+        """Stores the identity and metadata of the resolved conditioning in the conditioning cache.
+
+        Args:
+            conditioning: The resolved conditioning.
+        """
+        if self.conditioning_cache is None:
+            return
+
+        self.conditioning_cache.put(
+            conditioning.hash,
+            Conditioning(
+                id=conditioning.id,
+                type_id=conditioning.type_id,
+                hash=conditioning.hash,
+                value_metadata=deepcopy(conditioning.value_metadata),
+            ),
+        )
+
+    def attach_artifacts_to_sample(self, sample: Sample, artifacts: Optional[List[Artifact]] = None) -> None:
         """Attach artifacts to a sample.
 
         Args:
             sample: The sample to attach artifacts to.
+            artifacts: The artifacts to attach, the pending artifacts of the runtime manager if None.
         """
-        while self.runtime_manager.artifacts_for_next_sample:
-            artifact = self.runtime_manager.artifacts_for_next_sample.popleft()
+        if artifacts is None:
+            artifacts = self._take_pending_artifacts()
+        if not artifacts:
+            return
 
-            existing_artifacts = self.db_manager.search(
-                ArtifactTable, {"name": artifact.name, "hash": artifact.hash, "sample_id": sample.id}
-            )
+        existing_artifacts = self.db_manager.search_columns(
+            ArtifactTable,
+            ["name", "hash"],
+            {"sample_id": sample.id, "name": list({artifact.name for artifact in artifacts})},
+        )
+        attached_keys = {(existing.name, existing.hash) for existing in existing_artifacts}
 
-            if existing_artifacts:
+        new_artifacts = []
+        for artifact in artifacts:
+            if (artifact.name, artifact.hash) in attached_keys:
                 logger.info(f"Artifact {artifact.name} already exists in the database.")
+                continue
+            attached_keys.add((artifact.name, artifact.hash))
+            new_artifacts.append(artifact)
 
-            else:  # noqa: PLR5501
-                if self.persistency_manager.enabled:
-                    value = artifact.value
-                    artifact.value = None
-                    artifact.sample_id = sample.id
-                    artifact.hash = get_hash_from_jsonable(value)
-                    artifact = Artifact.from_orm(self.db_manager.save(artifact.to_orm()))
-                    artifact.value = value
-                    self.persistency_manager.save_artifact(artifact)
-                    logger.info(f"Saved artifact #{artifact.id} (sample #{sample.id}) to database and disk.")
-                else:
-                    artifact = Artifact.from_orm(self.db_manager.save(artifact.to_orm()))
-                    logger.info(f"Saved artifact #{artifact.id} (sample #{sample.id}) to database.")
+        if not new_artifacts:
+            return
+
+        # The artifacts are not modified, so that they can be saved again if the unit of work is retried
+        if self.persistency_manager.enabled:
+            rows = [
+                evolve(artifact, value=None, sample_id=sample.id, hash=get_hash_from_jsonable(artifact.value))
+                for artifact in new_artifacts
+            ]
+        else:
+            rows = [evolve(artifact, sample_id=sample.id) for artifact in new_artifacts]
+
+        # All the artifacts of the sample are inserted with a single statement
+        saved_ids = self.db_manager.bulk_save(ArtifactTable, [row.to_orm() for row in rows], returning=["id"])
+        for artifact, row, (saved_id,) in zip(new_artifacts, rows, saved_ids, strict=True):
+            saved_artifact = evolve(row, id=saved_id)
+            if self.persistency_manager.enabled:
+                saved_artifact.value = artifact.value
+                self.persistency_manager.save_artifact(saved_artifact)
+                logger.info(f"Saved artifact #{saved_artifact.id} (sample #{sample.id}) to database and disk.")
+            else:
+                logger.info(f"Saved artifact #{saved_artifact.id} (sample #{sample.id}) to database.")
+
+    def _take_pending_artifacts(self) -> List[Artifact]:
+        """Removes the artifacts waiting for the next sample from the runtime manager.
+
+        Returns:
+            The pending artifacts, in the order of their creation.
+        """
+        artifacts = []
+        while self.runtime_manager.artifacts_for_next_sample:
+            artifacts.append(self.runtime_manager.artifacts_for_next_sample.popleft())
+        return artifacts
 
     def update_generation_id(self, conditioning: Conditioning, generation_id: int):
         """Update the generation_id of the most recently used generation.
@@ -329,23 +1820,13 @@ class Wrapper(ABC):
         conditioning_metadata = conditioning.value_metadata
         conditioning_metadata["latest_instance"] = generation_id
 
-        self.db_manager.update(
+        self.db_manager.update_where(
             model=ConditioningTable, filters={"id": conditioning.id}, values={"value_metadata": conditioning_metadata}
         )
+        self._cache_conditioning(conditioning)
 
     def _get_current_version(self) -> str:
-        if self.runtime_manager.version is not None:
-            return self.runtime_manager.version
-
-        version = self.db_manager.search(ConfigurationTable, {"key": "version"})
-
-        if not version:
-            raise ValueError("Database version not found.")
-
-        if len(version) > 1:
-            raise ValueError("Multiple database versions found.")
-
-        return version[0].to_dict().get("value")
+        return self.runtime_manager.get_current_version(self.db_manager)
 
     def _create_sample_placeholder(
         self, conditioning: Conditioning, generator: Model, generation_id: Optional[int] = None
@@ -358,7 +1839,7 @@ class Wrapper(ABC):
             generation_id: The generation id.
 
         Returns:
-            The placeholder sample with status: "In progress".
+            The placeholder sample with status: "In progress", leased by this process.
         """
         sample = Sample(
             conditioning_id=conditioning.id,
@@ -367,6 +1848,7 @@ class Wrapper(ABC):
             status=SampleStatus.IN_PROGRESS.value,
             hash=EMPTY_MODEL_HASH,
             version=self._get_current_version(),
+            **self.lease_keeper.lease_values(),
         )
         sample = Sample.from_orm(self.db_manager.save(sample.to_orm()))
         return sample
@@ -389,76 +1871,7 @@ class FunctionWrapper(Wrapper):
 
         @wraps(func)
         def wrapped(*args, **kwargs) -> Any:
-            function_hash = self.hashing_function(func)
-            function_name = func.__name__
-
-            conditioning = self.conditioning_parser.parse_conditioning(func, *args, **kwargs)
-            kwargs.pop(CONDITIONING_METADATA_FIELDNAME, None)
-
-            conditioning = self._resolve_conditioning(conditioning)
-            generator, existing_generations = self._get_generations(function_hash, conditioning, function_name)
-
-            max_unique_instances = generator.model_metadata.get("max_unique_instances", 1)
-            next_instance = (conditioning.value_metadata.get("latest_instance", -1) + 1) % max_unique_instances
-
-            if not self.persistency_manager.enabled:
-                logger.info("PersistencyManager is disabled. Output will be generated.")
-                model_output = func(*args, **kwargs)
-
-                if not existing_generations:
-                    sample = self._create_sample_placeholder(conditioning=conditioning, generator=generator)
-                    self._finish_sample_generation(
-                        sample=sample,
-                        model_output=model_output,
-                        conditioning=conditioning,
-                        generator=generator,
-                    )
-
-                return model_output
-
-            if len(existing_generations) >= max_unique_instances:
-                logger.info(f"Max instances ({max_unique_instances}) reached. Returning existing generation.")
-                try:
-                    model_output = self._return_existing_generation(
-                        existing_generations=existing_generations,
-                        generator=generator,
-                        generation_id=next_instance,
-                    )
-
-                    self.update_generation_id(conditioning, next_instance)
-
-                    return model_output
-
-                except Exception as e:
-                    logger.error(f"Could not return existing generation: {e}")
-                    logger.info("Generating new sample without sample creation.")
-                    return func(*args, **kwargs)
-
-            sample_placeholder = self._create_sample_placeholder(
-                conditioning=conditioning, generator=generator, generation_id=next_instance
-            )
-
-            try:
-                model_output = func(*args, **kwargs)
-
-            except Exception as e:
-                self.db_manager.update(
-                    model=SampleTable,
-                    filters={"id": sample_placeholder.id},
-                    values={"status": SampleStatus.FAILED.value},
-                )
-                logger.error(f"Could not generate sample: {e}")
-                raise e
-
-            self._finish_sample_generation(
-                sample=sample_placeholder,
-                model_output=model_output,
-                conditioning=conditioning,
-                generator=generator,
-                generation_id=next_instance,
-            )
-            self.update_generation_id(conditioning, next_instance)
-            return model_output
+            return self._call_tracked(func=func, call=func, model=func, name=func.__name__, args=args, kwargs=kwargs)
 
         return wrapped
 
@@ -472,79 +1885,99 @@ class MethodWrapper(Wrapper):
 
         @wraps(func)
         def wrapped(obj_self, *args, **kwargs) -> Any:
-            model_hash = self.hashing_function(obj_self)
-            model_cls_name = obj_self.__class__.__name__
-            conditioning = self.conditioning_parser.parse_conditioning(func, *args, **kwargs)
-            kwargs.pop(CONDITIONING_METADATA_FIELDNAME, None)
+            return self._call_tracked(
+                func=func,
+                call=partial(func, obj_self),
+                model=obj_self,
+                name=obj_self.__class__.__name__,
+                args=args,
+                kwargs=kwargs,
+            )
 
-            conditioning = self._resolve_conditioning(conditioning)
-            generator, existing_generations = self._get_generations(model_hash, conditioning, model_cls_name)
+        return wrapped
 
-            max_unique_instances = generator.model_metadata.get("max_unique_instances", 1)
-            next_instance = (conditioning.value_metadata.get("latest_instance", -1) + 1) % max_unique_instances
 
-            if not self.persistency_manager.enabled:
-                logger.info("PersistencyManager is disabled. Output will be generated.")
-                model_output = func(obj_self, *args, **kwargs)
+@define
+class AsyncFunctionWrapper(Wrapper):
+    """Wrapper for coroutine functions."""
 
-                if not existing_generations:
-                    sample = self._create_sample_placeholder(conditioning=conditioning, generator=generator)
-                    self._finish_sample_generation(
-                        sample=sample,
-                        model_output=model_output,
-                        conditioning=conditioning,
-                        generator=generator,
-                    )
+    def wrap(self, func: Callable) -> Callable:
+        """Wraps the coroutine function.
 
-                return model_output
+        Args:
+            func: The coroutine function to wrap.
 
-            if len(existing_generations) >= max_unique_instances:
-                logger.info(f"Max instances ({max_unique_instances}) reached. Returning existing generation")
+        Returns:
+            Callable: The wrapped coroutine function.
+        """
+        self.func = deepcopy(func)
 
-                model_output = self._return_existing_generation(
-                    existing_generations=existing_generations,
-                    generator=generator,
-                    generation_id=next_instance,
-                )
+        @wraps(func)
+        async def wrapped(*args, **kwargs) -> Any:
+            return await self._call_tracked_async(
+                func=func, call=func, model=func, name=func.__name__, args=args, kwargs=kwargs
+            )
 
-                self.update_generation_id(conditioning, next_instance)
+        return wrapped
 
-                return model_output
 
-            sample_placeholder = self._create_sample_placeholder(
-                conditioning=conditioning, generator=generator, generation_id=next_instance
-            )
+@define
+class AsyncMethodWrapper(Wrapper):
+    """Wrapper for coroutine class methods."""
 
-            try:
-                model_output = func(obj_self, *args, **kwargs)
+    def wrap(self, func: Callable) -> Callable:
+        """Wraps the coroutine method.
 
-            except Exception as e:
-                self.db_manager.update(
-                    model=SampleTable,
-                    filters={"id": sample_placeholder.id},
-                    values={"status": SampleStatus.FAILED.value},
-                )
-                logger.error(f"Could not generate sample: {e}")
-                raise e
+        Args:
+            func: The coroutine method to wrap.
 
-            self._finish_sample_generation(
-                sample=sample_placeholder,
-                model_output=model_output,
-                conditioning=conditioning,
-                generator=generator,
-                generation_id=next_instance,
+        Returns:
+            Callable: The wrapped coroutine method.
+        """
+        self.func = deepcopy(func)
+
+        @wraps(func)
+        async def wrapped(obj_self, *args, **kwargs) -> Any:
+            return await self._call_tracked_async(
+                func=func,
+                call=partial(func, obj_self),
+                model=obj_self,
+                name=obj_self.__class__.__name__,
+                args=args,
+                kwargs=kwargs,
             )
-            self.update_generation_id(conditioning, next_instance)
-            return model_output
 
         return wrapped
 
 
+@define
 class WrapperFactory:
-    """Factory for creating wrappers for functions and methods."""
+    """Factory for creating wrappers for functions and methods.
+
+    Attributes:
+        conditioning_cache: The cache of resolved conditionings shared by all created wrappers.
+        write_behind_queue: The queue recording the outputs in the background, shared by all created wrappers.
+        completion_notifier: The notifier of finished samples shared by all created wrappers.
+        output_cache: The cache of decoded model outputs shared by all created wrappers.
+        stream_replayer: The replayer of cached outputs of streamed calls shared by all created wrappers.
+        sampling_settings: The global sampling settings shared by all created wrappers.
+        latency_recorder: The recorder of the latencies of tracked calls shared by all created wrappers.
+        single_flight: The table of the generations running in this process shared by all created wrappers.
+        lease_keeper: The keeper of the generation leases of this process shared by all created wrappers.
+    """
+
+    conditioning_cache: Optional[LRUCache[str, Conditioning]] = None
+    write_behind_queue: Optional[WriteBehindQueue] = None
+    completion_notifier: CompletionNotifier = Factory(CompletionNotifier)
+    output_cache: Optional[ByteBoundedLRUCache[int, Any]] = None
+    stream_replayer: StreamReplayer = Factory(StreamReplayer)
+    sampling_settings: SamplingSettings = Factory(SamplingSettings)
+    latency_recorder: LatencyRecorder = Factory(LatencyRecorder)
+    single_flight: SingleFlight = Factory(SingleFlight)
+    lease_keeper: LeaseKeeper = Factory(LeaseKeeper)
 
-    @staticmethod
     def create(
+        self,
         func: Callable,
         db_manager: DBManager,
         persistency_manager: PersistencyManager,
@@ -553,9 +1986,13 @@ class WrapperFactory:
         conditioning_parser: BaseConditioningParser,
         hashing_function: Callable[[Any], str],
         max_unique_instances: int = 1,
-    ) -> Union[FunctionWrapper, MethodWrapper]:
+        batch_generation: bool = False,
+        sampling_policy: Optional[SamplingPolicy] = None,
+    ) -> Union[FunctionWrapper, MethodWrapper, AsyncFunctionWrapper, AsyncMethodWrapper]:
         """Creates a wrapper for a function or method.
 
+        Coroutine functions and methods get asynchronous wrappers.
+
         Args:
             func: The function or method to wrap.
             db_manager: The database manager.
@@ -565,22 +2002,18 @@ class WrapperFactory:
             conditioning_parser: The conditioning parser.
             hashing_function: The hashing function.
             max_unique_instances: The maximum number of unique sample instances for each conditioning.
+            batch_generation: Whether the missing sample instances are generated by a single batched call.
+            sampling_policy: The policy deciding which calls are recorded, the global policy applies if None.
 
         Returns:
             The wrapper for the function or method.
         """
-        if is_class_func(func=func):
-            return MethodWrapper(
-                db_manager=db_manager,
-                persistency_manager=persistency_manager,
-                runtime_manager=runtime_manager,
-                output_parser=output_parser,
-                conditioning_parser=conditioning_parser,
-                hashing_function=hashing_function,
-                max_unique_instances=max_unique_instances,
-            )
+        if is_coroutine_func(func=func):
+            wrapper_cls = AsyncMethodWrapper if is_class_func(func=func) else AsyncFunctionWrapper
+        else:
+            wrapper_cls = MethodWrapper if is_class_func(func=func) else FunctionWrapper
 
-        return FunctionWrapper(
+        return wrapper_cls(
             db_manager=db_manager,
             persistency_manager=persistency_manager,
             runtime_manager=runtime_manager,
@@ -588,6 +2021,17 @@ class WrapperFactory:
             conditioning_parser=conditioning_parser,
             hashing_function=hashing_function,
             max_unique_instances=max_unique_instances,
+            conditioning_cache=self.conditioning_cache,
+            write_behind_queue=self.write_behind_queue,
+            completion_notifier=self.completion_notifier,
+            output_cache=self.output_cache,
+            batch_generation=batch_generation,
+            stream_replayer=self.stream_replayer,
+            sampling_policy=sampling_policy,
+            sampling_settings=self.sampling_settings,
+            latency_recorder=self.latency_recorder,
+            single_flight=self.single_flight,
+            lease_keeper=self.lease_keeper,
         )
 
 
@@ -603,6 +2047,18 @@ def is_class_func(func: Callable) -> bool:
     return get_defining_class(func=func) is not None
 
 
+def is_coroutine_func(func: Callable) -> bool:
+    """Check if a function is a coroutine function, including coroutine functions wrapped by decorators.
+
+    Args:
+        func: The function to check.
+
+    Returns:
+        bool: True if the function is a coroutine function, False otherwise.
+    """
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(inspect.unwrap(func))
+
+
 def get_defining_class(func: Callable) -> Optional[Type]:
     """Get the class that defines a method.
 
@@ -667,7 +2123,7 @@ class ArtifactWrapper(ABC):
         value = json.dumps(output)
         hashvalue = get_hash_from_jsonable(output)
         existing_artifacts = self.db_manager.search(
-            ArtifactTable, {"name": name, "hash": hashvalue, "sample_id": sample_id}
+            ArtifactTable, {"name": name, "hash": hashvalue, "sample_id": sample_id}, load="none"
         )
 
         if existing_artifacts:
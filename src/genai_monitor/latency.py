@@ -0,0 +1,61 @@
+from typing import Callable, Optional
+
+from dependency_injector.wiring import Provide, inject
+
+from genai_monitor.injectors.containers import DependencyContainer
+from genai_monitor.static.constants import DEFAULT_LATENCY_DUMP_INTERVAL
+from genai_monitor.structures.latency import LatencyRecorder, LatencySnapshot
+
+
+@inject
+def get_latency_snapshot(
+    latency_recorder: LatencyRecorder = Provide[DependencyContainer.latency_recorder],
+) -> LatencySnapshot:
+    """Summarize the latencies of the stages of the tracked calls recorded so far.
+
+    The stages are `model_hashing`, `parse_conditioning`, `resolve_conditioning`, `get_generations`,
+    `model_execution`, `output_hashing`, `output_serialization`, `save_to_disk` and `db_commit`.
+
+    Args:
+        latency_recorder: The latency recorder.
+
+    Returns:
+        The count, and the mean, minimum, maximum, p50, p95 and p99 of the latencies in seconds, by stage.
+    """
+    return latency_recorder.snapshot()
+
+
+@inject
+def reset_latency_stats(latency_recorder: LatencyRecorder = Provide[DependencyContainer.latency_recorder]):
+    """Discard the latencies recorded so far.
+
+    Args:
+        latency_recorder: The latency recorder.
+    """
+    latency_recorder.reset()
+
+
+@inject
+def start_latency_dump(
+    interval: float = DEFAULT_LATENCY_DUMP_INTERVAL,
+    sink: Optional[Callable[[LatencySnapshot], None]] = None,
+    latency_recorder: LatencyRecorder = Provide[DependencyContainer.latency_recorder],
+):
+    """Pass a snapshot of the latencies to the sink periodically, from a background thread.
+
+    Args:
+        interval: The time in seconds between the dumps.
+        sink: The function receiving the snapshots, the snapshots are logged if None.
+        latency_recorder: The latency recorder.
+    """
+    latency_recorder.start_periodic_dump(interval=interval, sink=sink)
+
+
+@inject
+def stop_latency_dump(latency_recorder: LatencyRecorder = Provide[DependencyContainer.latency_recorder]):
+    """Stop the periodic dump of the latencies.
+
+    Args:
+        latency_recorder: The latency recorder.
+    """
+    latency_recorder.stop_periodic_dump()
@@ -0,0 +1,75 @@
+from typing import Optional
+
+from dependency_injector.wiring import Provide, inject
+
+from genai_monitor.db.manager import DBManager
+from genai_monitor.injectors.containers import DependencyContainer
+from genai_monitor.static.constants import DEFAULT_LEASE_SWEEP_INTERVAL
+from genai_monitor.structures.leases import LeaseKeeper
+
+
+@inject
+def configure_generation_leases(
+    duration: Optional[float] = None,
+    heartbeat_interval: Optional[float] = None,
+    lease_keeper: LeaseKeeper = Provide[DependencyContainer.lease_keeper],
+):
+    """Configure the leases of the in-progress generations of this process.
+
+    A generation abandoned by a crashed process is taken over by a waiting call once its lease expires, so the
+    duration bounds the time the waiting calls are blocked by it. The duration must exceed the longest pause of
+    the heartbeat, e.g. while the process is suspended.
+
+    Args:
+        duration: The time in seconds a lease lasts without being renewed, unchanged if None.
+        heartbeat_interval: The time in seconds between the renewals, a third of the duration if None.
+        lease_keeper: The lease keeper.
+    """
+    lease_keeper.configure(duration=duration, heartbeat_interval=heartbeat_interval)
+
+
+@inject
+def sweep_abandoned_generations(
+    grace_period: float = 0.0,
+    lease_keeper: LeaseKeeper = Provide[DependencyContainer.lease_keeper],
+    db_manager: DBManager = Provide[DependencyContainer.db_manager],
+) -> int:
+    """Mark the in-progress generations whose leases expired as failed.
+
+    Args:
+        grace_period: The time in seconds an expired lease is left for the waiting calls to take over.
+        lease_keeper: The lease keeper.
+        db_manager: The database manager.
+
+    Returns:
+        The number of generations marked as failed.
+    """
+    return lease_keeper.sweep(db_manager, grace_period=grace_period)
+
+
+@inject
+def start_lease_sweeper(
+    interval: float = DEFAULT_LEASE_SWEEP_INTERVAL,
+    grace_period: float = 0.0,
+    lease_keeper: LeaseKeeper = Provide[DependencyContainer.lease_keeper],
+    db_manager: DBManager = Provide[DependencyContainer.db_manager],
+):
+    """Sweep the abandoned generations periodically, from a background thread.
+
+    Args:
+        interval: The time in seconds between the sweeps.
+        grace_period: The time in seconds an expired lease is left for the waiting calls to take over.
+        lease_keeper: The lease keeper.
+        db_manager: The database manager.
+    """
+    lease_keeper.start_sweeper(db_manager, interval=interval, grace_period=grace_period)
+
+
+@inject
+def stop_lease_sweeper(lease_keeper: LeaseKeeper = Provide[DependencyContainer.lease_keeper]):
+    """Stop the periodic sweep of the abandoned generations.
+
+    Args:
+        lease_keeper: The lease keeper.
+    """
+    lease_keeper.stop_sweeper()
@@ -1,6 +1,18 @@
 """Query module for GenAI Eval framework."""
 
-from .api import ConditioningQuery, ModelQuery, SampleQuery, get_sample_by_hash, get_sample_by_id
+from .api import (
+    ConditioningQuery,
+    ModelQuery,
+    SampleQuery,
+    get_conditionings_page,
+    get_models_page,
+    get_sample_by_hash,
+    get_sample_by_id,
+    get_samples_page,
+    iter_conditionings,
+    iter_models,
+    iter_samples,
+)
 
 __all__ = [
     "get_sample_by_id",
@@ -8,4 +20,10 @@ __all__ = [
     "SampleQuery",
     "ModelQuery",
     "ConditioningQuery",
+    "iter_samples",
+    "iter_conditionings",
+    "iter_models",
+    "get_samples_page",
+    "get_conditionings_page",
+    "get_models_page",
 ]
@@ -1,45 +1,178 @@
 # mypy: ignore-errors
 """Core query API implementation."""
 
-from typing import List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from dependency_injector.wiring import Provide, inject
 
 from genai_monitor.common.structures.data import Conditioning, Model, Sample
 from genai_monitor.db.manager import DBManager
 from genai_monitor.db.schemas.tables import ConditioningTable, ModelTable, SampleTable
+from genai_monitor.injectors.containers import DependencyContainer
+from genai_monitor.static.constants import DEFAULT_QUERY_BATCH_SIZE, DEFAULT_QUERY_PAGE_SIZE
 
 
-def get_conditionings() -> List[Conditioning]:
-    results = DBManager.search(ConditioningTable)
+@inject
+def get_conditionings(db_manager: DBManager = Provide[DependencyContainer.db_manager]) -> List[Conditioning]:
+    results = db_manager.search(ConditioningTable)
     return [Conditioning.from_orm(result) for result in results]
 
 
-def get_models() -> List[Model]:
-    results = DBManager.search(ModelTable)
+@inject
+def get_models(db_manager: DBManager = Provide[DependencyContainer.db_manager]) -> List[Model]:
+    results = db_manager.search(ModelTable)
     return [Model.from_orm(result) for result in results]
 
 
-def get_samples() -> List[Sample]:
-    results = DBManager.search(SampleTable)
+@inject
+def get_samples(db_manager: DBManager = Provide[DependencyContainer.db_manager]) -> List[Sample]:
+    results = db_manager.search(SampleTable)
     return [Sample.from_orm(result) for result in results]
 
 
-def get_sample_by_hash(hash_value: str) -> Optional[Sample]:
-    results = DBManager.search(SampleTable, filters={"hash": hash_value})
+@inject
+def iter_conditionings(
+    batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+    after_id: Optional[int] = None,
+    db_manager: DBManager = Provide[DependencyContainer.db_manager],
+) -> Iterator[Conditioning]:
+    """Iterate over the conditionings in batches, without loading them all into memory.
+
+    The samples of the conditionings are not loaded, since a conditioning can have any number of them, use
+    `conditioning.query().get_samples()` for them.
+
+    Args:
+        batch_size: The number of conditionings read from the database at a time.
+        after_id: The id after which the iteration starts.
+        db_manager: The database manager.
+
+    Yields:
+        The conditionings, in ascending order of their ids.
+    """
+    for result in db_manager.iter_search(ConditioningTable, batch_size=batch_size, after=after_id, load="none"):
+        yield Conditioning.from_row(result)
+
+
+@inject
+def iter_models(
+    batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+    after_id: Optional[int] = None,
+    db_manager: DBManager = Provide[DependencyContainer.db_manager],
+) -> Iterator[Model]:
+    """Iterate over the models in batches, without loading them all into memory.
+
+    Args:
+        batch_size: The number of models read from the database at a time.
+        after_id: The id after which the iteration starts.
+        db_manager: The database manager.
+
+    Yields:
+        The models, in ascending order of their ids.
+    """
+    for result in db_manager.iter_search(ModelTable, batch_size=batch_size, after=after_id):
+        yield Model.from_orm(result)
+
+
+@inject
+def iter_samples(
+    filters: Optional[Dict[str, Any]] = None,
+    batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+    after_id: Optional[int] = None,
+    db_manager: DBManager = Provide[DependencyContainer.db_manager],
+) -> Iterator[Sample]:
+    """Iterate over the samples in batches, without loading them all into memory.
+
+    The conditioning, user and artifacts of the samples of each batch are loaded together with the batch.
+
+    Args:
+        filters: The values of the columns of the samples to iterate over, e.g. `{"model_id": 1}`.
+        batch_size: The number of samples read from the database at a time.
+        after_id: The id after which the iteration starts.
+        db_manager: The database manager.
+
+    Yields:
+        The samples, in ascending order of their ids.
+    """
+    for result in db_manager.iter_search(SampleTable, filters=filters, batch_size=batch_size, after=after_id):
+        yield Sample.from_orm(result)
+
+
+def get_conditionings_page(limit: int = DEFAULT_QUERY_PAGE_SIZE, after_id: Optional[int] = None) -> List[Conditioning]:
+    """Get a page of conditionings.
+
+    Pass the id of the last conditioning of a page as `after_id` to get the next page.
+
+    Args:
+        limit: The maximum number of conditionings in the page.
+        after_id: The id after which the page starts, the page starts with the first conditioning if None.
+
+    Returns:
+        The conditionings of the page, in ascending order of their ids.
+    """
+    return list(islice(iter_conditionings(batch_size=limit, after_id=after_id), limit))
+
+
+def get_models_page(limit: int = DEFAULT_QUERY_PAGE_SIZE, after_id: Optional[int] = None) -> List[Model]:
+    """Get a page of models.
+
+    Pass the id of the last model of a page as `after_id` to get the next page.
+
+    Args:
+        limit: The maximum number of models in the page.
+        after_id: The id after which the page starts, the page starts with the first model if None.
+
+    Returns:
+        The models of the page, in ascending order of their ids.
+    """
+    return list(islice(iter_models(batch_size=limit, after_id=after_id), limit))
+
+
+def get_samples_page(
+    limit: int = DEFAULT_QUERY_PAGE_SIZE, after_id: Optional[int] = None, filters: Optional[Dict[str, Any]] = None
+) -> List[Sample]:
+    """Get a page of samples.
+
+    Pass the id of the last sample of a page as `after_id` to get the next page.
+
+    Args:
+        limit: The maximum number of samples in the page.
+        after_id: The id after which the page starts, the page starts with the first sample if None.
+        filters: The values of the columns of the samples to get, e.g. `{"model_id": 1}`.
+
+    Returns:
+        The samples of the page, in ascending order of their ids.
+    """
+    return list(islice(iter_samples(filters=filters, batch_size=limit, after_id=after_id), limit))
+
+
+@inject
+def get_sample_by_hash(
+    hash_value: str, db_manager: DBManager = Provide[DependencyContainer.db_manager]
+) -> Optional[Sample]:
+    results = db_manager.search(SampleTable, filters={"hash": hash_value})
     return Sample.from_orm(results[0]) if results else None
 
 
-def get_sample_by_id(sample_id: int) -> Optional[Sample]:
-    results = DBManager.search(SampleTable, filters={"id": sample_id})
+@inject
+def get_sample_by_id(
+    sample_id: int, db_manager: DBManager = Provide[DependencyContainer.db_manager]
+) -> Optional[Sample]:
+    results = db_manager.search(SampleTable, filters={"id": sample_id})
     return Sample.from_orm(results[0]) if results else None
 
 
-def get_conditioning_by_id(conditioning_id: int) -> Optional[Conditioning]:
-    results = DBManager.search(ConditioningTable, filters={"id": conditioning_id})
+@inject
+def get_conditioning_by_id(
+    conditioning_id: int, db_manager: DBManager = Provide[DependencyContainer.db_manager]
+) -> Optional[Conditioning]:
+    results = db_manager.search(ConditioningTable, filters={"id": conditioning_id})
     return Conditioning.from_orm(results[0]) if results else None
 
 
-def get_model_by_id(model_id: int) -> Optional[Model]:
-    results = DBManager.search(ModelTable, filters={"id": model_id})
+@inject
+def get_model_by_id(model_id: int, db_manager: DBManager = Provide[DependencyContainer.db_manager]) -> Optional[Model]:
+    results = db_manager.search(ModelTable, filters={"id": model_id})
     return Model.from_orm(results[0]) if results else None
 
 
@@ -49,28 +182,38 @@ class SampleQuery:
     def __init__(self, sample: Sample):
         self._sample = sample
 
-    def get_conditioning(self) -> Optional[Conditioning]:
+    @inject
+    def get_conditioning(
+        self, db_manager: DBManager = Provide[DependencyContainer.db_manager]
+    ) -> Optional[Conditioning]:
         """Get the conditioning used to generate this sample.
 
+        Args:
+            db_manager: The database manager.
+
         Returns:
             Optional[Conditioning]: The conditioning if it exists, None otherwise.
         """
         if not self._sample.conditioning_id:
             return None
 
-        results = DBManager.search(ConditioningTable, filters={"id": self._sample.conditioning_id})
+        results = db_manager.search(ConditioningTable, filters={"id": self._sample.conditioning_id})
         return Conditioning.from_orm(results[0]) if results else None
 
-    def get_model(self) -> Optional[Model]:
+    @inject
+    def get_model(self, db_manager: DBManager = Provide[DependencyContainer.db_manager]) -> Optional[Model]:
         """Get the generator that created this sample.
 
+        Args:
+            db_manager: The database manager.
+
         Returns:
             Optional[Model]: The generator if it exists, None otherwise.
         """
         if not self._sample.model_id:
             return None
 
-        results = DBManager.search(ModelTable, filters={"id": self._sample.model_id})
+        results = db_manager.search(ModelTable, filters={"id": self._sample.model_id})
         return Model.from_orm(results[0]) if results else None
 
 
@@ -80,21 +223,43 @@ class ModelQuery:
     def __init__(self, model: Model):
         self._model = model
 
-    def get_samples(self, conditioning: Optional[Conditioning] = None) -> List[Sample]:
+    @inject
+    def get_samples(
+        self,
+        conditioning: Optional[Conditioning] = None,
+        db_manager: DBManager = Provide[DependencyContainer.db_manager],
+    ) -> List[Sample]:
         """Get all samples generated by this generator.
 
         Args:
             conditioning: Optional conditioning to filter samples
+            db_manager: The database manager.
 
         Returns:
             List of samples
         """
+        results = db_manager.search(SampleTable, filters=self._sample_filters(conditioning))
+        return [Sample.from_orm(result) for result in results]
+
+    def iter_samples(
+        self, conditioning: Optional[Conditioning] = None, batch_size: int = DEFAULT_QUERY_BATCH_SIZE
+    ) -> Iterator[Sample]:
+        """Iterate over the samples generated by this generator in batches, without loading them all into memory.
+
+        Args:
+            conditioning: Optional conditioning to filter samples
+            batch_size: The number of samples read from the database at a time.
+
+        Returns:
+            An iterator over the samples, in ascending order of their ids.
+        """
+        return iter_samples(filters=self._sample_filters(conditioning), batch_size=batch_size)
+
+    def _sample_filters(self, conditioning: Optional[Conditioning]) -> Dict[str, Any]:
         filters = {"model_id": self._model.id}
         if conditioning:
             filters["conditioning_id"] = conditioning.id
-
-        results = DBManager.search(SampleTable, filters=filters)
-        return [Sample.from_orm(result) for result in results]
+        return filters
 
 
 class ConditioningQuery:
@@ -103,11 +268,26 @@ class ConditioningQuery:
     def __init__(self, conditioning: Conditioning):
         self._conditioning = conditioning
 
-    def get_samples(self) -> List[Sample]:
+    @inject
+    def get_samples(self, db_manager: DBManager = Provide[DependencyContainer.db_manager]) -> List[Sample]:
         """Get all samples generated with this conditioning.
 
+        Args:
+            db_manager: The database manager.
+
         Returns:
             List[Sample]: List of samples generated with this conditioning.
         """
-        results = DBManager.search(SampleTable, filters={"conditioning_id": self._conditioning.id})
+        results = db_manager.search(SampleTable, filters={"conditioning_id": self._conditioning.id})
         return [Sample.from_orm(result) for result in results]
+
+    def iter_samples(self, batch_size: int = DEFAULT_QUERY_BATCH_SIZE) -> Iterator[Sample]:
+        """Iterate over the samples generated with this conditioning in batches, without loading them all into memory.
+
+        Args:
+            batch_size: The number of samples read from the database at a time.
+
+        Returns:
+            An iterator over the samples, in ascending order of their ids.
+        """
+        return iter_samples(filters={"conditioning_id": self._conditioning.id}, batch_size=batch_size)
@@ -14,6 +14,7 @@ from genai_monitor.structures.conditioning_parsers.base import (
 from genai_monitor.structures.output_parsers.base import BaseModelOutputParser
 from genai_monitor.structures.persistency_manager import PersistencyManager
 from genai_monitor.structures.runtime_manager import RuntimeManager
+from genai_monitor.structures.sampling import SamplingPolicy
 from genai_monitor.utils.data_hashing import BaseType
 from genai_monitor.utils.model_hashing import default_model_hashing_function
 
@@ -35,6 +36,15 @@ def register_class(
     parse_inference_method_arguments: Optional[Callable[[Dict[str, Any]], Jsonable]] = None,
     model_hashing_function: Optional[Callable[[object], str]] = None,
     max_unique_instances: int = 1,
+    batch_generation: bool = False,
+    split_model_output: Optional[Callable[[Any], List[Any]]] = None,
+    batch_size_argument: Optional[str] = None,
+    row_arguments: Optional[List[str]] = None,
+    merge_model_outputs: Optional[Callable[[List[Any]], Any]] = None,
+    stream_argument: Optional[str] = None,
+    assemble_stream: Optional[Callable[[List[Any]], Any]] = None,
+    stream_model_output: Optional[Callable[[Any, int], List[Any]]] = None,
+    sampling_policy: Optional[SamplingPolicy] = None,
 ):
     """Registers a class with inference methods.
 
@@ -47,6 +57,20 @@ def register_class(
         parse_inference_method_arguments: The function to parse the inference method arguments.
         model_hashing_function: The function to hash the model.
         max_unique_instances: The maximum number of unique sample instances for each conditioning.
+        batch_generation: Whether the missing sample instances are generated by a single call, with the batch size
+            argument of the output parser set to their number. Requires an output parser that splits batched outputs.
+        split_model_output: The function splitting the output of a batched call into the outputs of single calls.
+        batch_size_argument: The keyword argument setting the number of outputs generated by a single call.
+        row_arguments: The arguments holding one value per row of a batched call. Calls passing lists as their values
+            are decomposed into rows, running the model only on the rows without existing generations. Requires the
+            functions splitting and merging the model outputs.
+        merge_model_outputs: The function merging the outputs of single-row calls into the output of a batched call.
+        stream_argument: The keyword argument requesting the output as a stream of chunks. Streamed calls are
+            recorded once the stream is exhausted, and replayed as streams of synthetic chunks. Requires the functions
+            assembling and streaming the model outputs.
+        assemble_stream: The function assembling the chunks of a streamed call into the output of a single call.
+        stream_model_output: The function converting an output into chunks holding the given number of characters.
+        sampling_policy: The policy deciding which calls are recorded, the global sampling policy applies if None.
     """
     cls_name = cls.__name__
     methods_to_wrap = [getattr(cls, method_name) for method_name in inference_methods]
@@ -67,11 +91,28 @@ def register_class(
     if model_output_to_base_type is not None:
         output_parser_method_mapper["model_output_to_base_type"] = model_output_to_base_type
 
+    if split_model_output is not None:
+        output_parser_method_mapper["split_model_output"] = split_model_output
+
+    if merge_model_outputs is not None:
+        output_parser_method_mapper["merge_model_outputs"] = merge_model_outputs
+
+    if assemble_stream is not None:
+        output_parser_method_mapper["assemble_stream"] = assemble_stream
+
+    if stream_model_output is not None:
+        output_parser_method_mapper["stream_model_output"] = stream_model_output
+
     output_parser = _make_cls(
         cls_name=_make_output_parser_name(cls_name),
         base=BaseModelOutputParser,
         method_mapper=output_parser_method_mapper,
     )()
+    output_parser.batch_size_argument = batch_size_argument
+    output_parser.stream_argument = stream_argument
+
+    if row_arguments is not None:
+        conditioning_parser.row_arguments = tuple(row_arguments)
 
     if not model_hashing_function:
         model_hashing_function = default_model_hashing_function
@@ -83,6 +124,8 @@ def register_class(
             conditioning_parser=conditioning_parser,
             hashing_function=model_hashing_function,
             max_unique_instances=max_unique_instances,
+            batch_generation=batch_generation,
+            sampling_policy=sampling_policy,
         )
 
 
@@ -94,6 +137,15 @@ def register_function(
     parse_inference_method_arguments: Optional[Callable[[Dict[str, Any]], Jsonable]] = None,
     model_hashing_function: Optional[Callable[[object], str]] = None,
     max_unique_instances: int = 1,
+    batch_generation: bool = False,
+    split_model_output: Optional[Callable[[Any], List[Any]]] = None,
+    batch_size_argument: Optional[str] = None,
+    row_arguments: Optional[List[str]] = None,
+    merge_model_outputs: Optional[Callable[[List[Any]], Any]] = None,
+    stream_argument: Optional[str] = None,
+    assemble_stream: Optional[Callable[[List[Any]], Any]] = None,
+    stream_model_output: Optional[Callable[[Any, int], List[Any]]] = None,
+    sampling_policy: Optional[SamplingPolicy] = None,
 ):
     """Registers a function.
 
@@ -105,6 +157,20 @@ def register_function(
         parse_inference_method_arguments: The function to parse the inference method arguments.
         model_hashing_function: The function to hash the model.
         max_unique_instances: The maximum number of unique sample instances for each conditioning.
+        batch_generation: Whether the missing sample instances are generated by a single call, with the batch size
+            argument of the output parser set to their number. Requires an output parser that splits batched outputs.
+        split_model_output: The function splitting the output of a batched call into the outputs of single calls.
+        batch_size_argument: The keyword argument setting the number of outputs generated by a single call.
+        row_arguments: The arguments holding one value per row of a batched call. Calls passing lists as their values
+            are decomposed into rows, running the model only on the rows without existing generations. Requires the
+            functions splitting and merging the model outputs.
+        merge_model_outputs: The function merging the outputs of single-row calls into the output of a batched call.
+        stream_argument: The keyword argument requesting the output as a stream of chunks. Streamed calls are
+            recorded once the stream is exhausted, and replayed as streams of synthetic chunks. Requires the functions
+            assembling and streaming the model outputs.
+        assemble_stream: The function assembling the chunks of a streamed call into the output of a single call.
+        stream_model_output: The function converting an output into chunks holding the given number of characters.
+        sampling_policy: The policy deciding which calls are recorded, the global sampling policy applies if None.
     """
     func_name = f"{func.__module__}.{func.__name__}"
 
@@ -127,11 +193,28 @@ def register_function(
     if model_output_to_base_type is not None:
         output_parser_method_mapper["model_output_to_base_type"] = model_output_to_base_type
 
+    if split_model_output is not None:
+        output_parser_method_mapper["split_model_output"] = split_model_output
+
+    if merge_model_outputs is not None:
+        output_parser_method_mapper["merge_model_outputs"] = merge_model_outputs
+
+    if assemble_stream is not None:
+        output_parser_method_mapper["assemble_stream"] = assemble_stream
+
+    if stream_model_output is not None:
+        output_parser_method_mapper["stream_model_output"] = stream_model_output
+
     output_parser = _make_cls(
         cls_name=_make_output_parser_name(func.__name__),
         base=BaseModelOutputParser,
         method_mapper=output_parser_method_mapper,
     )()
+    output_parser.batch_size_argument = batch_size_argument
+    output_parser.stream_argument = stream_argument
+
+    if row_arguments is not None:
+        conditioning_parser.row_arguments = tuple(row_arguments)
 
     if not model_hashing_function:
         model_hashing_function = default_model_hashing_function
@@ -142,6 +225,8 @@ def register_function(
         conditioning_parser=conditioning_parser,
         hashing_function=model_hashing_function,
         max_unique_instances=max_unique_instances,
+        batch_generation=batch_generation,
+        sampling_policy=sampling_policy,
     )
 
 
@@ -152,6 +237,8 @@ def register_inference_method(
     output_parser: BaseModelOutputParser,
     hashing_function: Callable,
     max_unique_instances: int = 1,
+    batch_generation: bool = False,
+    sampling_policy: Optional[SamplingPolicy] = None,
     wrapper_registry: WrapperRegistry = Provide[DependencyContainer.wrapper_registry],
     db_manager: DBManager = Provide[DependencyContainer.db_manager],
     persistency_manager: PersistencyManager = Provide[DependencyContainer.persistency_manager],
@@ -165,6 +252,9 @@ def register_inference_method(
         output_parser: The output parser.
         hashing_function: The hashing function.
         max_unique_instances: The maximum number of unique sample instances for each conditioning.
+        batch_generation: Whether the missing sample instances are generated by a single call, with the batch size
+            argument of the output parser set to their number. Requires an output parser that splits batched outputs.
+        sampling_policy: The policy deciding which calls are recorded, the global sampling policy applies if None.
         wrapper_registry: The wrapper registry.
         db_manager: The DB manager.
         persistency_manager: The persistency manager.
@@ -183,6 +273,8 @@ def register_inference_method(
         conditioning_parser=conditioning_parser,
         hashing_function=hashing_function,
         max_unique_instances=max_unique_instances,
+        batch_generation=batch_generation,
+        sampling_policy=sampling_policy,
     )
 
 
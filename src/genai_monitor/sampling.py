@@ -0,0 +1,53 @@
+from typing import Callable, Optional
+
+from dependency_injector.wiring import Provide, inject
+
+from genai_monitor.injectors.containers import DependencyContainer
+from genai_monitor.injectors.registry import WrapperRegistry
+from genai_monitor.structures.sampling import (
+    EveryNthSampling,
+    ProbabilisticSampling,
+    RateLimitedSampling,
+    SamplingPolicy,
+    SamplingSettings,
+)
+
+__all__ = [
+    "EveryNthSampling",
+    "ProbabilisticSampling",
+    "RateLimitedSampling",
+    "SamplingPolicy",
+    "set_sampling_policy",
+]
+
+
+@inject
+def set_sampling_policy(
+    policy: Optional[SamplingPolicy],
+    func: Optional[Callable] = None,
+    sampling_settings: SamplingSettings = Provide[DependencyContainer.sampling_settings],
+    wrapper_registry: WrapperRegistry = Provide[DependencyContainer.wrapper_registry],
+):
+    """Set the policy deciding which tracked calls are recorded.
+
+    Calls that are not sampled run the model directly, and return the output of an existing generation instead only if
+    the policy allows cache lookups.
+
+    Args:
+        policy: The sampling policy, None to record all calls.
+        func: The registered function or method the policy applies to. If None, the policy applies to all
+            registrations without a sampling policy of their own.
+        sampling_settings: The global sampling settings.
+        wrapper_registry: The wrapper registry.
+
+    Raises:
+        ValueError: If the function is not registered.
+    """
+    if func is None:
+        sampling_settings.policy = policy
+        return
+
+    wrapper = wrapper_registry.get_wrapper(func)
+    if wrapper is None:
+        raise ValueError(f"Function {func.__qualname__} is not registered.")
+    wrapper.sampling_policy = policy
@@ -11,3 +11,20 @@ DEFAULT_GENAI_MONITOR_CONFIG_PATH = get_absolute_path(
 )
 DEFAULT_PERSISTENCY_PATH: str = ".binaries/"
 DEFAULT_DB_VERSION: str = "1.0.0"
+DEFAULT_CONDITIONING_CACHE_SIZE: int = 4096
+DEFAULT_WRITE_BEHIND_BATCH_SIZE: int = 64
+DEFAULT_WRITE_BEHIND_MAX_DELAY_MS: float = 50.0
+DEFAULT_WRITE_BEHIND_QUEUE_SIZE: int = 1024
+DEFAULT_GENERATION_WAIT_TIMEOUT: float = 300.0
+DEFAULT_GENERATION_WAIT_MIN_POLL_INTERVAL: float = 0.05
+DEFAULT_GENERATION_WAIT_MAX_POLL_INTERVAL: float = 2.0
+VERSION_GENERATION_KEY: str = "version.generation"
+DEFAULT_VERSION_CHECK_INTERVAL: float = 5.0
+DEFAULT_OUTPUT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+DEFAULT_STREAM_REPLAY_CHUNK_SIZE: int = 16
+DEFAULT_STREAM_REPLAY_INTERVAL: float = 0.0
+DEFAULT_LATENCY_DUMP_INTERVAL: float = 60.0
+DEFAULT_GENERATION_LEASE_DURATION: float = 60.0
+DEFAULT_LEASE_SWEEP_INTERVAL: float = 60.0
+DEFAULT_QUERY_BATCH_SIZE: int = 1000
+DEFAULT_QUERY_PAGE_SIZE: int = 100
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from dependency_injector.wiring import Provide, inject
+
+from genai_monitor.injectors.containers import DependencyContainer
+from genai_monitor.structures.stream import StreamReplayer
+
+
+@inject
+def configure_stream_replay(
+    chunk_size: Optional[int] = None,
+    chunk_interval: Optional[float] = None,
+    stream_replayer: StreamReplayer = Provide[DependencyContainer.stream_replayer],
+):
+    """Configure how the outputs of streamed calls loaded from existing generations are replayed.
+
+    Args:
+        chunk_size: The number of characters of the generated text in a single replayed chunk.
+        chunk_interval: The time in seconds between the replayed chunks, 0 to replay without pacing.
+        stream_replayer: The stream replayer.
+    """
+    if chunk_size is not None:
+        stream_replayer.chunk_size = chunk_size
+    if chunk_interval is not None:
+        stream_replayer.chunk_interval = chunk_interval
@@ -0,0 +1,204 @@
+from collections import OrderedDict
+from threading import RLock
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe, in-process cache evicting the least recently used entries above the maximal number of entries.
+
+    Attributes:
+        maxsize: The maximal number of entries kept in the cache.
+        hits: The number of lookups that found an entry.
+        misses: The number of lookups that did not find an entry.
+    """
+
+    def __init__(self, maxsize: int):  # noqa: D107, ANN204
+        if maxsize < 0:
+            raise ValueError(f"Cache size must be non-negative, got {maxsize}.")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, key: K) -> Optional[V]:
+        """Gets the value stored under the key and marks it as the most recently used.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The cached value or None if the key is not in the cache.
+        """
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key: K, value: V):
+        """Stores the value under the key, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key: The key to store the value under.
+            value: The value to store.
+        """
+        with self._lock:
+            if self.maxsize == 0:
+                return
+
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K) -> Optional[V]:
+        """Removes the key from the cache.
+
+        Args:
+            key: The key to remove.
+
+        Returns:
+            The removed value or None if the key was not in the cache.
+        """
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self):
+        """Removes all entries from the cache and resets the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Gets the usage statistics of the cache.
+
+        Returns:
+            A dictionary with the number of hits, misses and entries of the cache.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+    def __contains__(self, key: object) -> bool:  # noqa: D105
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:  # noqa: D105
+        with self._lock:
+            return len(self._data)
+
+
+class ByteBoundedLRUCache(Generic[K, V]):
+    """Thread-safe, in-process cache evicting the least recently used entries above the maximal total size in bytes.
+
+    The size of each entry is given by the caller, entries larger than the maximal total size are not cached.
+
+    Attributes:
+        maxbytes: The maximal total size of the entries in bytes.
+        hits: The number of lookups that found an entry.
+        misses: The number of lookups that did not find an entry.
+    """
+
+    def __init__(self, maxbytes: int):  # noqa: D107, ANN204
+        if maxbytes < 0:
+            raise ValueError(f"Cache size must be non-negative, got {maxbytes}.")
+
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, Tuple[V, int]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = RLock()
+
+    def get(self, key: K) -> Optional[V]:
+        """Gets the value stored under the key and marks it as the most recently used.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The cached value or None if the key is not in the cache.
+        """
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][0]
+
+    def put(self, key: K, value: V, size: int):
+        """Stores the value under the key, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key: The key to store the value under.
+            value: The value to store.
+            size: The size of the value in bytes.
+        """
+        with self._lock:
+            self.pop(key)
+            if size > self.maxbytes:
+                return
+
+            self._data[key] = (value, size)
+            self._nbytes += size
+            while self._nbytes > self.maxbytes:
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._nbytes -= evicted_size
+
+    def pop(self, key: K) -> Optional[V]:
+        """Removes the key from the cache.
+
+        Args:
+            key: The key to remove.
+
+        Returns:
+            The removed value or None if the key was not in the cache.
+        """
+        with self._lock:
+            if key not in self._data:
+                return None
+
+            value, size = self._data.pop(key)
+            self._nbytes -= size
+            return value
+
+    def clear(self):
+        """Removes all entries from the cache and resets the counters."""
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Gets the usage statistics of the cache.
+
+        Returns:
+            A dictionary with the number of hits, misses and entries of the cache, and their total size in bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "bytes": self._nbytes,
+                "maxbytes": self.maxbytes,
+            }
+
+    def __contains__(self, key: object) -> bool:  # noqa: D105
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:  # noqa: D105
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from threading import Condition
+from typing import Iterator, Optional
+
+from genai_monitor.static.constants import (
+    DEFAULT_GENERATION_WAIT_MAX_POLL_INTERVAL,
+    DEFAULT_GENERATION_WAIT_MIN_POLL_INTERVAL,
+    DEFAULT_GENERATION_WAIT_TIMEOUT,
+)
+
+_FINISHED_HISTORY_SIZE = 1024
+
+
+class CompletionNotifier:
+    """Wakes up the threads waiting for in-progress samples as soon as the samples are finished in this process.
+
+    Samples finished by other processes are not notified, so the waiting threads also poll the database, doubling the
+    interval between polls from `min_poll_interval` up to `max_poll_interval`.
+
+    Attributes:
+        timeout: The maximal time in seconds to wait for an in-progress sample, waits indefinitely if None.
+        min_poll_interval: The initial interval in seconds between the database polls.
+        max_poll_interval: The maximal interval in seconds between the database polls.
+    """
+
+    def __init__(  # noqa: D107, ANN204
+        self,
+        timeout: Optional[float] = DEFAULT_GENERATION_WAIT_TIMEOUT,
+        min_poll_interval: float = DEFAULT_GENERATION_WAIT_MIN_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_GENERATION_WAIT_MAX_POLL_INTERVAL,
+    ):
+        self.timeout = timeout
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._finished: OrderedDict[int, None] = OrderedDict()
+        self._condition = Condition()
+
+    def notify(self, sample_id: int):
+        """Marks the sample as finished (completed or failed) and wakes up the threads waiting for it.
+
+        Must be called after the final status of the sample is committed.
+
+        Args:
+            sample_id: The id of the finished sample.
+        """
+        with self._condition:
+            self._finished[sample_id] = None
+            self._finished.move_to_end(sample_id)
+            while len(self._finished) > _FINISHED_HISTORY_SIZE:
+                self._finished.popitem(last=False)
+            self._condition.notify_all()
+
+    def wait(self, sample_id: int, timeout: float) -> bool:
+        """Blocks until the sample is finished in this process or the timeout expires.
+
+        Args:
+            sample_id: The id of the awaited sample.
+            timeout: The maximal time in seconds to wait.
+
+        Returns:
+            True if the sample was finished in this process, False if the timeout expired first.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: sample_id in self._finished, timeout=timeout)
+
+    def poll_intervals(self) -> Iterator[float]:
+        """Generates the exponentially growing intervals between the database polls.
+
+        Yields:
+            The time in seconds to wait before the next poll.
+        """
+        interval = self.min_poll_interval
+        while True:
+            yield interval
+            interval = min(interval * 2, self.max_poll_interval)
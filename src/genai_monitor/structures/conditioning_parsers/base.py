@@ -1,7 +1,9 @@
 import inspect
 from abc import ABC, abstractmethod
 from copy import deepcopy
-from typing import Any, Callable, Dict, Optional, OrderedDict, Set
+from typing import Any, Callable, Dict, List, Optional, OrderedDict, Set, Tuple
+
+from loguru import logger
 
 from genai_monitor.common.errors import NotJsonableError
 from genai_monitor.common.structures.data import Conditioning
@@ -21,9 +23,14 @@ class BaseConditioningParser(ABC):
     Use it to create custom conditioning parsers, not available natively in the library.
 
     'parse_func_arguments' is the core method that needs to be overwritten by the subclasses.
+
+    Attributes:
+        row_arguments: The arguments holding one value per row of a batched call. Calls passing batched values of
+            these arguments are decomposed into rows, each with its own conditioning.
     """
 
     _tracked_seed_types: Set[SeedType] = set()  # Override in subclasses to specify which seeds to track
+    row_arguments: Tuple[str, ...] = ()
     db_manager: DBManager
     persistency_manager: PersistencyManager
 
@@ -119,6 +126,124 @@ class BaseConditioningParser(ABC):
             Parsed parameters that can be serialized to json.
         """
 
+    def split_rows(self, method: Callable, *args, **kwargs) -> Optional[List[Dict[str, Any]]]:
+        """Splits the row arguments of a batched call into the argument values of single-row calls.
+
+        Args:
+            method: The method.
+            *args: Arguments of the method.
+            **kwargs: Keyword arguments of the method.
+
+        Returns:
+            For each row, the values of the row arguments in a single-row call, or None if the call is not batched.
+        """
+        call_params = self._get_call_params(method, *args, **kwargs)
+        rows: Optional[List[Dict[str, Any]]] = None
+
+        for name in self.row_arguments:
+            if name not in call_params:
+                continue
+
+            values = self.split_row_argument(name, call_params[name])
+            if values is None:
+                continue
+
+            if rows is None:
+                rows = [{} for _ in values]
+            if len(values) != len(rows):
+                logger.warning("Row arguments of the call differ in the number of rows, the call is not decomposed.")
+                return None
+
+            for row, value in zip(rows, values, strict=True):
+                row[name] = value
+
+        return rows or None
+
+    def split_row_argument(self, name: str, value: Any) -> Optional[List[Any]]:
+        """Splits the value of a row argument into the values of single-row calls.
+
+        The default implementation splits lists into their items. Override it for other batched types.
+
+        Args:
+            name: The name of the row argument.
+            value: The value of the row argument.
+
+        Returns:
+            The values of the argument in single-row calls, or None if the value is not batched.
+        """
+        if isinstance(value, list):
+            return list(value)
+        return None
+
+    def merge_row_argument(self, name: str, values: List[Any]) -> Any:
+        """Merges the values of a row argument in single-row calls into the value of a batched call.
+
+        Args:
+            name: The name of the row argument.
+            values: The values of the argument in single-row calls.
+
+        Returns:
+            The value of the argument in the batched call.
+        """
+        return list(values)
+
+    def merge_rows(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merges the row arguments of single-row calls into the argument values of a batched call.
+
+        Args:
+            rows: For each row, the values of the row arguments, as returned by `split_rows`.
+
+        Returns:
+            The values of the row arguments in the batched call.
+        """
+        return {name: self.merge_row_argument(name, [row[name] for row in rows]) for name in rows[0]}
+
+    @staticmethod
+    def replace_call_arguments(
+        method: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any], values: Dict[str, Any]
+    ) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+        """Replaces the values of arguments of a call, keeping the way they are passed.
+
+        Args:
+            method: The method.
+            args: Arguments of the method.
+            kwargs: Keyword arguments of the method.
+            values: The new values of the arguments, by name.
+
+        Returns:
+            The arguments and keyword arguments of the call with the replaced values.
+        """
+        sig = inspect.signature(method)
+        has_self = "self" in sig.parameters
+        bound_args = sig.bind_partial(*((None, *args) if has_self else args), **kwargs)
+        var_keyword = next((param.name for param in sig.parameters.values() if param.kind == param.VAR_KEYWORD), None)
+
+        for name, value in values.items():
+            if name in sig.parameters and name != var_keyword:
+                bound_args.arguments[name] = value
+            else:
+                bound_args.arguments[var_keyword] = {**bound_args.arguments.get(var_keyword, {}), name: value}
+
+        call_args = bound_args.args[1:] if has_self else bound_args.args
+        return call_args, bound_args.kwargs
+
+    @staticmethod
+    def _get_call_params(func: Callable, *args, **kwargs) -> Dict[str, Any]:
+        """Gets the arguments passed to a call by name, including the ones passed through variadic keyword arguments."""
+        sig = inspect.signature(func)
+        if "self" in sig.parameters:
+            bound_args = sig.bind_partial(*(None, *args), **kwargs)
+        else:
+            bound_args = sig.bind_partial(*args, **kwargs)
+
+        call_params = {}
+        for name, value in bound_args.arguments.items():
+            if sig.parameters[name].kind == inspect.Parameter.VAR_KEYWORD:
+                call_params.update(value)
+            elif name != "self":
+                call_params[name] = value
+        return call_params
+
     @staticmethod
     def _get_call_params_with_defaults(func: Callable, *args, **kwargs) -> OrderedDict[str, Any]:
         sig = inspect.signature(func)
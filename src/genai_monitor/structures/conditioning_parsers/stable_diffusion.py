@@ -15,6 +15,7 @@ class StableDiffusionConditioningParser(BaseConditioningParser):
     """
 
     _tracked_seed_types = {SeedType.TORCH, SeedType.DIFFUSERS}
+    row_arguments = ("prompt", "negative_prompt")
 
     def __init__(self):  # noqa: D107, ANN204
         require_extra("diffusers", EXTRAS_REQUIRE)
@@ -1,5 +1,5 @@
 from copy import deepcopy
-from typing import Any, Iterable
+from typing import Any, Dict, Iterable, List, Optional
 
 from genai_monitor.dependencies import EXTRAS_REQUIRE, require_extra
 from genai_monitor.structures.conditioning_parsers.base import BaseConditioningParser, Jsonable, is_jsonable
@@ -14,6 +14,7 @@ class TransformersTextGenerationConditioningParser(BaseConditioningParser):
     """
 
     _tracked_seed_types = {SeedType.TORCH}  # Transformers uses PyTorch's random state
+    row_arguments = ("inputs", "input_ids", "attention_mask")
 
     def __init__(self):  # noqa: D107, ANN204
         require_extra("transformers", EXTRAS_REQUIRE)
@@ -47,10 +48,62 @@ class TransformersTextGenerationConditioningParser(BaseConditioningParser):
         if isinstance(inner_kwargs, dict):
             parsed_arguments.update(inner_kwargs)
 
+        parsed_arguments = self._strip_padding(parsed_arguments)
         serialized = {param: self._serialize_object(val) for param, val in parsed_arguments.items()}
 
         return {k: v for k, v in serialized.items() if v is not None}  # type: ignore
 
+    def split_row_argument(self, name: str, value: Any) -> Optional[List[Any]]:
+        """Splits a batch of tokenized inputs into single-row batches.
+
+        Args:
+            name: The name of the row argument.
+            value: The value of the row argument.
+
+        Returns:
+            The single-row tensors, or None if the value is not a two-dimensional tensor.
+        """
+        import torch
+
+        if isinstance(value, torch.Tensor) and value.dim() == 2:  # noqa: PLR2004
+            return [value[i : i + 1] for i in range(value.size(0))]
+        return None
+
+    def merge_row_argument(self, name: str, values: List[Any]) -> Any:
+        """Concatenates single-row batches of tokenized inputs.
+
+        Args:
+            name: The name of the row argument.
+            values: The single-row tensors.
+
+        Returns:
+            The batch of tokenized inputs.
+        """
+        import torch
+
+        return torch.cat(values)
+
+    @staticmethod
+    def _strip_padding(arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Removes the padded positions from the tokenized inputs, along with the attention mask marking them.
+
+        The conditioning of a prompt then does not depend on the padding of the batch it was tokenized in.
+        """
+        import torch
+
+        attention_mask = arguments.get("attention_mask")
+        if not isinstance(attention_mask, torch.Tensor) or attention_mask.dim() != 2:  # noqa: PLR2004
+            return arguments
+
+        stripped = dict(arguments)
+        mask = attention_mask.bool()
+        for name in ("inputs", "input_ids"):
+            value = arguments.get(name)
+            if isinstance(value, torch.Tensor) and value.shape == attention_mask.shape:
+                stripped[name] = [row[row_mask].tolist() for row, row_mask in zip(value, mask, strict=True)]
+                stripped.pop("attention_mask", None)
+        return stripped
+
     @staticmethod
     def _serialize_object(obj: Any) -> Jsonable:
         """Transforms an object into a jsonable object."""
@@ -0,0 +1,199 @@
+import math
+import time
+from contextlib import contextmanager
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Generator, List, Optional
+
+from loguru import logger
+
+from genai_monitor.static.constants import DEFAULT_LATENCY_DUMP_INTERVAL
+
+# Latencies are counted in geometrically growing buckets, so that quantiles have a relative error of at most 5%
+_MIN_LATENCY = 1e-6
+_BUCKET_GROWTH = 1.05
+_LOG_BUCKET_GROWTH = math.log(_BUCKET_GROWTH)
+_NUM_BUCKETS = int(math.log(3600 / _MIN_LATENCY) / _LOG_BUCKET_GROWTH) + 2
+
+LatencySnapshot = Dict[str, Dict[str, float]]
+
+
+class LatencyHistogram:
+    """Histogram of latencies with constant memory, estimating quantiles from logarithmic buckets.
+
+    Attributes:
+        count: The number of recorded latencies.
+        total: The sum of the recorded latencies in seconds.
+        min: The minimal recorded latency in seconds.
+        max: The maximal recorded latency in seconds.
+    """
+
+    def __init__(self):  # noqa: D107, ANN204
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets: List[int] = [0] * _NUM_BUCKETS
+
+    def record(self, seconds: float):
+        """Records a latency.
+
+        Args:
+            seconds: The latency in seconds.
+        """
+        if seconds <= _MIN_LATENCY:
+            index = 0
+        else:
+            index = min(int(math.log(seconds / _MIN_LATENCY) / _LOG_BUCKET_GROWTH) + 1, _NUM_BUCKETS - 1)
+        self._buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile of the recorded latencies.
+
+        Args:
+            q: The quantile, from 0 to 1.
+
+        Returns:
+            The upper bound of the bucket holding the quantile, clamped to the recorded range, 0 if no latencies were
+            recorded.
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = max(1, math.ceil(q * self.count))
+        cumulative = 0
+        for index, bucket_count in enumerate(self._buckets):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                upper_bound = _MIN_LATENCY * _BUCKET_GROWTH**index
+                return min(max(upper_bound, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Summarizes the recorded latencies.
+
+        Returns:
+            The count, and the mean, minimum, maximum, p50, p95 and p99 of the latencies in seconds.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class LatencyRecorder:
+    """Collects the latencies of the stages of tracked calls in in-process histograms.
+
+    Attributes:
+        enabled: Whether the latencies are recorded.
+    """
+
+    def __init__(self, enabled: bool = True):  # noqa: D107, ANN204
+        self.enabled = enabled
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = Lock()
+        self._dump_thread: Optional[Thread] = None
+        self._dump_stopped = Event()
+
+    @contextmanager
+    def measure(self, stage: str) -> Generator[None, None, None]:
+        """Measures the time spent in the block as a latency of the stage.
+
+        Latencies of blocks raising an exception are recorded as well.
+
+        Args:
+            stage: The name of the stage.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage: str, seconds: float):
+        """Records a latency of the stage.
+
+        Args:
+            stage: The name of the stage.
+            seconds: The latency in seconds.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def snapshot(self) -> LatencySnapshot:
+        """Summarizes the latencies recorded so far.
+
+        Returns:
+            The summaries of the latencies, by stage.
+        """
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self._histograms.items()}
+
+    def reset(self):
+        """Discards the latencies recorded so far."""
+        with self._lock:
+            self._histograms.clear()
+
+    def start_periodic_dump(
+        self,
+        interval: float = DEFAULT_LATENCY_DUMP_INTERVAL,
+        sink: Optional[Callable[[LatencySnapshot], None]] = None,
+    ):
+        """Starts a background thread passing a snapshot of the latencies to the sink periodically.
+
+        Args:
+            interval: The time in seconds between the dumps.
+            sink: The function receiving the snapshots, the snapshots are logged if None.
+        """
+        self.stop_periodic_dump()
+        sink = sink or _log_snapshot
+        self._dump_stopped = Event()
+        self._dump_thread = Thread(
+            target=self._dump_periodically,
+            args=(interval, sink, self._dump_stopped),
+            name="genai-monitor-latency-dump",
+            daemon=True,
+        )
+        self._dump_thread.start()
+
+    def stop_periodic_dump(self):
+        """Stops the background thread started by `start_periodic_dump`, if it is running."""
+        if self._dump_thread is None:
+            return
+
+        self._dump_stopped.set()
+        self._dump_thread.join()
+        self._dump_thread = None
+
+    def _dump_periodically(self, interval: float, sink: Callable[[LatencySnapshot], None], stopped: Event):
+        while not stopped.wait(interval):
+            try:
+                sink(self.snapshot())
+            except Exception as e:
+                logger.error(f"Could not dump the latencies: {e}")
+
+
+def _log_snapshot(snapshot: LatencySnapshot):
+    for stage, summary in sorted(snapshot.items()):
+        logger.info(
+            f"{stage}: count={summary['count']}, p50={summary['p50'] * 1000:.2f}ms, "
+            f"p95={summary['p95'] * 1000:.2f}ms, p99={summary['p99'] * 1000:.2f}ms"
+        )
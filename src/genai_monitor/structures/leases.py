@@ -0,0 +1,255 @@
+import os
+import socket
+import time
+import uuid
+from threading import Event, Lock, Thread
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import Row
+
+from genai_monitor.common.types import SampleStatus
+from genai_monitor.db.manager import DBManager
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.static.constants import DEFAULT_GENERATION_LEASE_DURATION, DEFAULT_LEASE_SWEEP_INTERVAL
+
+
+class LeaseKeeper:
+    """Holds the leases of the sample placeholders generated in this process and renews them from a heartbeat thread.
+
+    A placeholder is leased by the process generating it until `lease_expires_at`, and the heartbeat renews the leases
+    held by this process every `heartbeat_interval` seconds. The leases of a process that crashed or was killed stop
+    being renewed, so the calls waiting for its generations can take them over once they expire, and the sweeper can
+    mark them as failed.
+
+    The lease times are Unix times, so the clocks of the processes sharing a database must agree to well within the
+    lease duration.
+
+    Attributes:
+        duration: The time in seconds a lease lasts without being renewed.
+        heartbeat_interval: The time in seconds between the renewals of the leases.
+    """
+
+    def __init__(  # noqa: D107, ANN204
+        self, duration: float = DEFAULT_GENERATION_LEASE_DURATION, heartbeat_interval: Optional[float] = None
+    ):
+        self.duration = duration
+        self.heartbeat_interval = heartbeat_interval if heartbeat_interval is not None else duration / 3
+        self._token = uuid.uuid4().hex[:8]
+        self._leases: Dict[int, DBManager] = {}
+        self._lock = Lock()
+        self._heartbeat_thread: Optional[Thread] = None
+        self._sweeper_thread: Optional[Thread] = None
+        self._sweeper_stopped = Event()
+
+    @property
+    def owner(self) -> str:
+        """The identifier of this process written to the leased placeholders, distinct in forked processes."""
+        return f"{socket.gethostname()}:{os.getpid()}:{self._token}"
+
+    def configure(self, duration: Optional[float] = None, heartbeat_interval: Optional[float] = None):
+        """Changes the duration of the leases and the interval of the heartbeat.
+
+        Args:
+            duration: The time in seconds a lease lasts without being renewed, unchanged if None.
+            heartbeat_interval: The time in seconds between the renewals, a third of the duration if None.
+        """
+        if duration is not None:
+            self.duration = duration
+        self.heartbeat_interval = heartbeat_interval if heartbeat_interval is not None else self.duration / 3
+
+    def lease_values(self) -> Dict[str, Any]:
+        """Gets the values of the lease columns of a placeholder leased by this process from now on.
+
+        Returns:
+            The values of the `lease_owner`, `lease_expires_at` and `heartbeat_at` columns.
+        """
+        now = time.time()
+        return {"lease_owner": self.owner, "lease_expires_at": now + self.duration, "heartbeat_at": now}
+
+    def hold(self, db_manager: DBManager, sample_id: int):
+        """Renews the lease of a placeholder with the heartbeat until it is released.
+
+        Args:
+            db_manager: The database manager of the placeholder.
+            sample_id: The id of the placeholder.
+        """
+        with self._lock:
+            self._leases[sample_id] = db_manager
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = Thread(
+                    target=self._heartbeat, name="genai-monitor-lease-heartbeat", daemon=True
+                )
+                self._heartbeat_thread.start()
+
+    def release(self, sample_id: int):
+        """Stops renewing the lease of a placeholder that is complete or failed.
+
+        Args:
+            sample_id: The id of the placeholder.
+        """
+        with self._lock:
+            self._leases.pop(sample_id, None)
+
+    def held(self) -> List[int]:
+        """Gets the ids of the placeholders whose leases are held by this process.
+
+        Returns:
+            The ids of the placeholders.
+        """
+        with self._lock:
+            return list(self._leases)
+
+    @staticmethod
+    def is_expired(slot: Row) -> bool:
+        """Checks whether the lease of an in-progress generation has expired.
+
+        Placeholders without a lease, e.g. created by earlier versions, never expire.
+
+        Args:
+            slot: The slot of the generation, with the lease columns.
+
+        Returns:
+            Whether the lease has expired.
+        """
+        return (
+            slot.status == SampleStatus.IN_PROGRESS.value
+            and slot.lease_expires_at is not None
+            and slot.lease_expires_at < time.time()
+        )
+
+    def take_over(self, db_manager: DBManager, slot: Row) -> bool:
+        """Atomically takes over the expired lease of an in-progress generation.
+
+        The lease is taken over only if it is still the one that was read, so that a single waiter takes it over.
+
+        Args:
+            db_manager: The database manager of the placeholder.
+            slot: The slot of the generation, with the lease columns read when the lease was found expired.
+
+        Returns:
+            Whether this process holds the lease now.
+        """
+        taken_over = db_manager.update_where(
+            SampleTable,
+            filters={
+                "id": slot.id,
+                "status": SampleStatus.IN_PROGRESS.value,
+                "lease_owner": slot.lease_owner,
+                "lease_expires_at": slot.lease_expires_at,
+            },
+            values=self.lease_values(),
+        )
+        if not taken_over:
+            return False
+
+        logger.warning(f"Took over the expired lease of generation {slot.id} held by {slot.lease_owner}.")
+        self.hold(db_manager, slot.id)
+        return True
+
+    def renew(self) -> int:
+        """Renews the leases held by this process.
+
+        The leases taken over by other processes are no longer renewed.
+
+        Returns:
+            The number of renewed leases.
+        """
+        groups: Dict[int, Dict[str, Any]] = {}
+        with self._lock:
+            for sample_id, db_manager in self._leases.items():
+                group = groups.setdefault(id(db_manager.session_manager), {"db_manager": db_manager, "ids": []})
+                group["ids"].append(sample_id)
+
+        owner = self.owner
+        renewed = 0
+        for group in groups.values():
+            db_manager, sample_ids = group["db_manager"], group["ids"]
+            values = self.lease_values()
+            count = db_manager.update_where(
+                SampleTable,
+                filters={"id": sample_ids, "lease_owner": owner, "status": SampleStatus.IN_PROGRESS.value},
+                values=values,
+            )
+            renewed += count
+            if count < len(sample_ids):
+                self._drop_lost_leases(db_manager, sample_ids)
+        return renewed
+
+    def sweep(self, db_manager: DBManager, grace_period: float = 0.0) -> int:
+        """Marks the in-progress generations whose leases expired more than `grace_period` seconds ago as failed.
+
+        Args:
+            db_manager: The database manager.
+            grace_period: The time in seconds an expired lease is left for the waiters to take over.
+
+        Returns:
+            The number of generations marked as failed.
+        """
+        swept = db_manager.update_where(
+            SampleTable,
+            filters={"status": SampleStatus.IN_PROGRESS.value},
+            values={"status": SampleStatus.FAILED.value},
+            conditions=[SampleTable.lease_expires_at < time.time() - grace_period],
+        )
+        if swept:
+            logger.warning(f"Marked {swept} abandoned generations as failed.")
+        return swept
+
+    def start_sweeper(
+        self, db_manager: DBManager, interval: float = DEFAULT_LEASE_SWEEP_INTERVAL, grace_period: float = 0.0
+    ):
+        """Starts a background thread sweeping the abandoned generations periodically.
+
+        Args:
+            db_manager: The database manager.
+            interval: The time in seconds between the sweeps.
+            grace_period: The time in seconds an expired lease is left for the waiters to take over.
+        """
+        self.stop_sweeper()
+        self._sweeper_stopped = Event()
+        self._sweeper_thread = Thread(
+            target=self._sweep_periodically,
+            args=(db_manager, interval, grace_period, self._sweeper_stopped),
+            name="genai-monitor-lease-sweeper",
+            daemon=True,
+        )
+        self._sweeper_thread.start()
+
+    def stop_sweeper(self):
+        """Stops the background thread started by `start_sweeper`, if it is running."""
+        if self._sweeper_thread is None:
+            return
+
+        self._sweeper_stopped.set()
+        self._sweeper_thread.join()
+        self._sweeper_thread = None
+
+    def _drop_lost_leases(self, db_manager: DBManager, sample_ids: List[int]):
+        held_ids = {
+            row.id
+            for row in db_manager.search_columns(
+                SampleTable,
+                columns=["id"],
+                filters={"id": sample_ids, "lease_owner": self.owner, "status": SampleStatus.IN_PROGRESS.value},
+            )
+        }
+        with self._lock:
+            for sample_id in sample_ids:
+                if sample_id not in held_ids and self._leases.pop(sample_id, None) is not None:
+                    logger.warning(f"Lost the lease of generation {sample_id}, it was taken over or swept.")
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                self.renew()
+            except Exception as e:
+                logger.error(f"Could not renew the generation leases: {e}")
+
+    def _sweep_periodically(self, db_manager: DBManager, interval: float, grace_period: float, stopped: Event):
+        while not stopped.wait(interval):
+            try:
+                self.sweep(db_manager, grace_period=grace_period)
+            except Exception as e:
+                logger.error(f"Could not sweep the abandoned generations: {e}")
@@ -1,6 +1,7 @@
 import hashlib
 from abc import ABC, abstractmethod
-from typing import Generic, List, TypeVar
+from copy import deepcopy
+from typing import Any, Dict, Generic, List, Optional, TypeVar
 
 from loguru import logger
 
@@ -11,9 +12,20 @@ T = TypeVar("T")
 
 
 class BaseModelOutputParser(ABC, Generic[T]):
-    """Abstract class for converting between sample and model output types."""
+    """Abstract class for converting between sample and model output types.
+
+    Attributes:
+        cache_decoded_outputs: Whether the outputs decoded by the parser can be kept in the in-memory output cache.
+        batch_size_argument: The keyword argument setting the number of outputs generated by a single call, None if
+            the parser cannot split batched outputs.
+        stream_argument: The keyword argument requesting the output as a stream of chunks, None if the parser cannot
+            assemble streamed outputs.
+    """
 
     _known_classes: List[str] = []
+    cache_decoded_outputs: bool = True
+    batch_size_argument: Optional[str] = None
+    stream_argument: Optional[str] = None
 
     @abstractmethod
     def model_output_to_bytes(self, model_output: T) -> bytes:
@@ -108,3 +120,107 @@ class BaseModelOutputParser(ABC, Generic[T]):
             raise ValueError("Sample data is empty.")
 
         return self.bytes_to_model_output(sample.data)
+
+    def copy_model_output(self, model_output: T) -> T:
+        """Copies the model output, so that modifications of the returned output do not affect the cached one.
+
+        Parameters:
+            model_output: The model output to copy.
+
+        Returns:
+            The copy of the model output.
+        """
+        return deepcopy(model_output)
+
+    def get_model_output_size(self, model_output: T, databytes: bytes) -> int:
+        """Estimates the size in bytes of the decoded model output kept in memory.
+
+        Parameters:
+            model_output: The decoded model output.
+            databytes: The byte representation the model output was decoded from.
+
+        Returns:
+            The estimated size of the model output in bytes, the size of its byte representation by default.
+        """
+        return len(databytes)
+
+    def split_model_output(self, model_output: T) -> List[T]:
+        """Splits the output of a batched call into the outputs of single calls.
+
+        Parameters:
+            model_output: The output of a call generating `batch_size_argument` outputs.
+
+        Returns:
+            The outputs of single calls, in the order of generation.
+
+        Raises:
+            NotImplementedError: If the parser cannot split batched outputs.
+        """
+        raise NotImplementedError("Splitting of batched model outputs not specified.")
+
+    def get_row_merge_options(self, model: Any, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Checks whether the output of a call decomposed into rows can be split into rows and merged back.
+
+        The check runs before any row of the call is reserved. The default implementation only checks that the parser
+        implements both `split_model_output` and `merge_model_outputs`.
+
+        Parameters:
+            model: The object identifying the model.
+            kwargs: The keyword arguments of the call.
+
+        Returns:
+            The keyword arguments passed to `merge_model_outputs` for the rows of the call, None if the call must not
+            be decomposed into rows.
+        """
+        parser_cls = type(self)
+        if (
+            parser_cls.split_model_output is BaseModelOutputParser.split_model_output
+            or parser_cls.merge_model_outputs is BaseModelOutputParser.merge_model_outputs
+        ):
+            return None
+        return {}
+
+    def merge_model_outputs(self, model_outputs: List[T]) -> T:
+        """Merges the outputs of single-row calls into the output of a call batching the rows.
+
+        Parsers taking merge options from `get_row_merge_options` accept them as additional keyword arguments.
+
+        Parameters:
+            model_outputs: The outputs of single-row calls, in the order of the rows.
+
+        Returns:
+            The output of the batched call.
+
+        Raises:
+            NotImplementedError: If the parser cannot merge model outputs.
+        """
+        raise NotImplementedError("Merging of model outputs not specified.")
+
+    def assemble_stream(self, chunks: List[Any]) -> T:
+        """Assembles the chunks of a streamed call into the output of the same call without streaming.
+
+        Parameters:
+            chunks: The chunks of the stream, in the order of their arrival.
+
+        Returns:
+            The complete model output.
+
+        Raises:
+            NotImplementedError: If the parser cannot assemble streamed outputs.
+        """
+        raise NotImplementedError("Assembling of streamed model outputs not specified.")
+
+    def stream_model_output(self, model_output: T, chunk_size: int) -> List[Any]:
+        """Converts a complete model output into synthetic chunks of a stream.
+
+        Parameters:
+            model_output: The complete model output.
+            chunk_size: The number of characters of the generated text in a single chunk.
+
+        Returns:
+            The chunks of the stream.
+
+        Raises:
+            NotImplementedError: If the parser cannot stream model outputs.
+        """
+        raise NotImplementedError("Streaming of model outputs not specified.")
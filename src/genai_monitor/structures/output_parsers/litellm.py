@@ -2,7 +2,10 @@ from genai_monitor.dependencies import EXTRAS_REQUIRE, LITELLM_AVAILABLE, requir
 
 if LITELLM_AVAILABLE:
     import json
+    from copy import deepcopy
+    from typing import Any, Dict, List
 
+    import litellm
     from litellm.types.utils import ModelResponse
 
     from genai_monitor.structures.output_parsers.base import BaseModelOutputParser
@@ -10,6 +13,9 @@ if LITELLM_AVAILABLE:
     class LiteLLMCompletionOutputParser(BaseModelOutputParser):
         """Output parser for the Lite LLM completion calls."""
 
+        batch_size_argument = "n"
+        stream_argument = "stream"
+
         def __init__(self):  # noqa: D107, ANN204
             require_extra("litellm", EXTRAS_REQUIRE)
             super().__init__()
@@ -43,3 +49,82 @@ if LITELLM_AVAILABLE:
                     "hidden_params": model_output._hidden_params,
                 }
             ).encode("utf-8")
+
+        def split_model_output(self, model_output: ModelResponse) -> List[ModelResponse]:
+            """Splits a response with multiple choices into responses with a single choice each.
+
+            Args:
+                model_output: The response with `n` choices.
+
+            Returns:
+                The responses with a single choice each, the usage of the batched response is kept in all of them.
+            """
+            responses = []
+            for choice in model_output.choices:
+                single_choice = deepcopy(choice)
+                single_choice.index = 0
+                response = deepcopy(model_output)
+                response.choices = [single_choice]
+                responses.append(response)
+            return responses
+
+        def assemble_stream(self, chunks: List[Any]) -> ModelResponse:
+            """Assembles the chunks of a streamed response into the complete response.
+
+            Args:
+                chunks: The chunks of the stream.
+
+            Returns:
+                The complete response.
+
+            Raises:
+                ValueError: If the stream is empty or cannot be assembled.
+            """
+            if not chunks:
+                raise ValueError("Cannot assemble an empty stream.")
+
+            model_response = litellm.stream_chunk_builder(chunks)
+            if model_response is None:
+                raise ValueError("Could not assemble the chunks of the stream.")
+            return model_response
+
+        def stream_model_output(self, model_output: ModelResponse, chunk_size: int) -> List[ModelResponse]:
+            """Converts a complete response into the chunks of a stream.
+
+            Args:
+                model_output: The complete response.
+                chunk_size: The number of characters of the generated text in a single chunk.
+
+            Returns:
+                The streaming responses, the last one carries the usage of the complete response.
+            """
+
+            def make_chunk(choice: Dict[str, Any]) -> ModelResponse:
+                return ModelResponse(
+                    id=model_output.id,
+                    created=model_output.created,
+                    model=model_output.model,
+                    system_fingerprint=model_output.system_fingerprint,
+                    choices=[choice],
+                    stream=True,
+                )
+
+            chunks = []
+            for choice in model_output.choices:
+                message = choice.message
+                content = message.content or ""
+                texts = [content[i : i + chunk_size] for i in range(0, len(content), chunk_size)] or [""]
+                for i, text in enumerate(texts):
+                    delta = {"content": text, "role": message.role} if i == 0 else {"content": text}
+                    chunks.append(make_chunk({"index": choice.index, "delta": delta}))
+                if message.tool_calls:
+                    delta_tool_calls = [
+                        {"index": i, **tool_call.model_dump()} for i, tool_call in enumerate(message.tool_calls)
+                    ]
+                    chunks.append(make_chunk({"index": choice.index, "delta": {"tool_calls": delta_tool_calls}}))
+                chunks.append(make_chunk({"index": choice.index, "delta": {}, "finish_reason": choice.finish_reason}))
+
+            usage = getattr(model_output, "usage", None)
+            if usage is not None:
+                chunks[-1].usage = deepcopy(usage)  # type: ignore
+            return chunks
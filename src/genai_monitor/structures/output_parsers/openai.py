@@ -2,10 +2,12 @@ from genai_monitor.dependencies import EXTRAS_REQUIRE, OPENAI_AVAILABLE, require
 
 if OPENAI_AVAILABLE:
     import json
-    from typing import List, Type, Union
+    from typing import Any, Dict, List, Type, Union
 
     from openai.types import Completion
-    from openai.types.chat import ChatCompletion
+    from openai.types.chat import ChatCompletion, ChatCompletionChunk
+    from openai.types.chat.chat_completion_chunk import Choice as ChunkChoice
+    from openai.types.chat.chat_completion_chunk import ChoiceDeltaToolCall
     from pydantic import ValidationError
 
     from genai_monitor.structures.output_parsers.base import BaseModelOutputParser, T
@@ -15,6 +17,8 @@ if OPENAI_AVAILABLE:
         """An output parser that converts the responses of OpenAI API obtained by the client into samples."""
 
         _supported_output_types: List[Type] = [ChatCompletion, Completion]
+        batch_size_argument = "n"
+        stream_argument = "stream"
 
         def __init__(self):  # noqa: D107, ANN204
             require_extra("openai", EXTRAS_REQUIRE)
@@ -51,6 +55,210 @@ if OPENAI_AVAILABLE:
                     continue
             raise TypeError(f"No supported pydantic schema for data {data} of type {type(data)}")
 
+        def split_model_output(
+            self, model_output: Union[Completion, ChatCompletion]
+        ) -> List[Union[Completion, ChatCompletion]]:
+            """Splits a response with multiple choices into responses with a single choice each.
+
+            Args:
+                model_output: The response with `n` choices.
+
+            Returns:
+                The responses with a single choice each, the usage of the batched response is kept in all of them.
+            """
+            return [
+                model_output.model_copy(update={"choices": [choice.model_copy(update={"index": 0})]})
+                for choice in model_output.choices
+            ]
+
+        def assemble_stream(
+            self, chunks: List[Union[Completion, ChatCompletionChunk]]
+        ) -> Union[Completion, ChatCompletion]:
+            """Assembles the chunks of a streamed response into the complete response.
+
+            Args:
+                chunks: The chunks of the stream, chat completion chunks or partial completions.
+
+            Returns:
+                The complete response, with the usage if it was streamed.
+
+            Raises:
+                ValueError: If the stream is empty.
+            """
+            if not chunks:
+                raise ValueError("Cannot assemble an empty stream.")
+
+            if isinstance(chunks[0], Completion):
+                return self._assemble_completion_stream(chunks)  # type: ignore
+            return self._assemble_chat_completion_stream(chunks)  # type: ignore
+
+        def stream_model_output(
+            self, model_output: Union[Completion, ChatCompletion], chunk_size: int
+        ) -> List[Union[Completion, ChatCompletionChunk]]:
+            """Converts a complete response into the chunks of a stream.
+
+            Args:
+                model_output: The complete response.
+                chunk_size: The number of characters of the generated text in a single chunk.
+
+            Returns:
+                Chat completion chunks for chat completions, partial completions for completions.
+            """
+            if isinstance(model_output, Completion):
+                return self._stream_completion(model_output, chunk_size)  # type: ignore
+            return self._stream_chat_completion(model_output, chunk_size)  # type: ignore
+
+        @staticmethod
+        def _assemble_chat_completion_stream(chunks: List[ChatCompletionChunk]) -> ChatCompletion:
+            choices: Dict[int, Dict[str, Any]] = {}
+            tool_calls: Dict[int, Dict[int, Dict[str, Any]]] = {}
+            usage = None
+
+            for chunk in chunks:
+                if chunk.usage is not None:
+                    usage = chunk.usage.to_dict()
+
+                for choice in chunk.choices:
+                    assembled_choice = choices.setdefault(
+                        choice.index,
+                        {
+                            "index": choice.index,
+                            "finish_reason": None,
+                            "logprobs": None,
+                            "message": {"role": "assistant", "content": None},
+                        },
+                    )
+                    OpenAIChatOutputParser._add_chat_delta(assembled_choice, choice)
+                    for tool_call in choice.delta.tool_calls or []:
+                        OpenAIChatOutputParser._add_tool_call_delta(tool_calls.setdefault(choice.index, {}), tool_call)
+
+            for index, choice_tool_calls in tool_calls.items():
+                choices[index]["message"]["tool_calls"] = [choice_tool_calls[i] for i in sorted(choice_tool_calls)]
+
+            first_chunk = chunks[0]
+            return ChatCompletion.construct(
+                id=first_chunk.id,
+                created=first_chunk.created,
+                model=first_chunk.model,
+                object="chat.completion",
+                system_fingerprint=first_chunk.system_fingerprint,
+                choices=[choices[index] for index in sorted(choices)],
+                usage=usage,
+            )
+
+        @staticmethod
+        def _add_chat_delta(assembled_choice: Dict[str, Any], choice: ChunkChoice) -> None:
+            message, delta = assembled_choice["message"], choice.delta
+            if delta.role:
+                message["role"] = delta.role
+            if delta.content:
+                message["content"] = (message["content"] or "") + delta.content
+            if delta.refusal:
+                message["refusal"] = (message.get("refusal") or "") + delta.refusal
+            if choice.finish_reason:
+                assembled_choice["finish_reason"] = choice.finish_reason
+
+        @staticmethod
+        def _add_tool_call_delta(assembled_calls: Dict[int, Dict[str, Any]], tool_call: ChoiceDeltaToolCall) -> None:
+            assembled_call = assembled_calls.setdefault(
+                tool_call.index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}}
+            )
+            if tool_call.id:
+                assembled_call["id"] = tool_call.id
+            if tool_call.type:
+                assembled_call["type"] = tool_call.type
+            if tool_call.function is not None:
+                assembled_call["function"]["name"] += tool_call.function.name or ""
+                assembled_call["function"]["arguments"] += tool_call.function.arguments or ""
+
+        @staticmethod
+        def _assemble_completion_stream(chunks: List[Completion]) -> Completion:
+            choices: Dict[int, Dict[str, Any]] = {}
+            usage = None
+
+            for chunk in chunks:
+                if chunk.usage is not None:
+                    usage = chunk.usage.to_dict()
+
+                for choice in chunk.choices:
+                    assembled_choice = choices.setdefault(
+                        choice.index, {"index": choice.index, "text": "", "finish_reason": None, "logprobs": None}
+                    )
+                    assembled_choice["text"] += choice.text or ""
+                    if choice.finish_reason:
+                        assembled_choice["finish_reason"] = choice.finish_reason
+
+            first_chunk = chunks[0]
+            return Completion.construct(
+                id=first_chunk.id,
+                created=first_chunk.created,
+                model=first_chunk.model,
+                object="text_completion",
+                system_fingerprint=first_chunk.system_fingerprint,
+                choices=[choices[index] for index in sorted(choices)],
+                usage=usage,
+            )
+
+        @staticmethod
+        def _stream_chat_completion(model_output: ChatCompletion, chunk_size: int) -> List[ChatCompletionChunk]:
+            def make_chunk(choices: List[Dict[str, Any]], usage: Any = None) -> ChatCompletionChunk:
+                return ChatCompletionChunk.construct(
+                    id=model_output.id,
+                    created=model_output.created,
+                    model=model_output.model,
+                    object="chat.completion.chunk",
+                    system_fingerprint=model_output.system_fingerprint,
+                    choices=choices,
+                    usage=usage,
+                )
+
+            chunks = []
+            for choice in model_output.choices:
+                message = choice.message
+                chunks.append(make_chunk([{"index": choice.index, "delta": {"role": message.role, "content": ""}}]))
+                for text in _split_text(message.content or "", chunk_size):
+                    chunks.append(make_chunk([{"index": choice.index, "delta": {"content": text}}]))
+                if message.tool_calls:
+                    delta_tool_calls = [
+                        {"index": i, **tool_call.to_dict()} for i, tool_call in enumerate(message.tool_calls)
+                    ]
+                    chunks.append(make_chunk([{"index": choice.index, "delta": {"tool_calls": delta_tool_calls}}]))
+                chunks.append(make_chunk([{"index": choice.index, "delta": {}, "finish_reason": choice.finish_reason}]))
+
+            if model_output.usage is not None:
+                chunks.append(make_chunk([], usage=model_output.usage.to_dict()))
+            return chunks
+
+        @staticmethod
+        def _stream_completion(model_output: Completion, chunk_size: int) -> List[Completion]:
+            def make_chunk(choice: Dict[str, Any], usage: Any = None) -> Completion:
+                return Completion.construct(
+                    id=model_output.id,
+                    created=model_output.created,
+                    model=model_output.model,
+                    object="text_completion",
+                    system_fingerprint=model_output.system_fingerprint,
+                    choices=[{"logprobs": None, "finish_reason": None, **choice}],
+                    usage=usage,
+                )
+
+            chunks = []
+            for choice in model_output.choices:
+                for text in _split_text(choice.text, chunk_size):
+                    chunks.append(make_chunk({"index": choice.index, "text": text}))
+                chunks.append(make_chunk({"index": choice.index, "text": "", "finish_reason": choice.finish_reason}))
+
+            if model_output.usage is not None:
+                chunks[-1] = make_chunk(
+                    {
+                        "index": model_output.choices[-1].index,
+                        "text": "",
+                        "finish_reason": model_output.choices[-1].finish_reason,
+                    },
+                    usage=model_output.usage.to_dict(),
+                )
+            return chunks
+
         def model_output_to_base_type(self, model_output: T) -> BaseType:  # type: ignore
             """Converts a model output to base supported type.
 
@@ -69,3 +277,6 @@ if OPENAI_AVAILABLE:
                 return model_output.choices[0].message.content  # type: ignore
 
             raise TypeError(f"Unsupported model output type: {type(model_output).__name__}")
+
+    def _split_text(text: str, chunk_size: int) -> List[str]:
+        return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
@@ -16,6 +16,8 @@ if DIFFUSERS_AVAILABLE:
     class StableDiffusionOutputParser(BaseModelOutputParser[StableDiffusionOutputType]):
         """Output parser for the Stable Diffusion class models."""
 
+        batch_size_argument = "num_images_per_prompt"
+
         def __init__(self):  # noqa: D107,ANN204
             require_extra("diffusers", EXTRAS_REQUIRE)
             super().__init__()
@@ -46,6 +48,88 @@ if DIFFUSERS_AVAILABLE:
             image = Image.open(io.BytesIO(databytes))
             return StableDiffusionPipelineOutput(images=[image], nsfw_content_detected=[])  # type: ignore
 
+        def split_model_output(self, model_output: StableDiffusionOutputType) -> List[StableDiffusionOutputType]:  # type: ignore
+            """Splits the output of a call generating multiple images per prompt into single image outputs.
+
+            Args:
+                model_output: The model output with multiple images.
+
+            Returns:
+                The model outputs with a single image each, of the same type as the batched output.
+
+            Raises:
+                ValueError: If the model output is of an unsupported type.
+            """
+            if isinstance(model_output, tuple):
+                images, nsfw_content_detected = model_output
+                return [
+                    (images[i : i + 1], nsfw_content_detected[i : i + 1] if nsfw_content_detected else None)
+                    for i in range(len(images))
+                ]
+
+            if isinstance(model_output, StableDiffusionPipelineOutput):
+                images, nsfw_content_detected = model_output.images, model_output.nsfw_content_detected
+                return [
+                    StableDiffusionPipelineOutput(
+                        images=images[i : i + 1],
+                        nsfw_content_detected=nsfw_content_detected[i : i + 1] if nsfw_content_detected else None,
+                    )
+                    for i in range(len(images))
+                ]
+
+            raise ValueError(
+                f"Model output can be either Tuple or StableDiffusionPipelineOutput, but got {type(model_output)}."
+            )
+
+        def merge_model_outputs(self, model_outputs: List[StableDiffusionOutputType]) -> StableDiffusionOutputType:  # type: ignore
+            """Merges the outputs of single prompts into the output of a call with a list of prompts.
+
+            Args:
+                model_outputs: The model outputs of single prompts, in the order of the prompts.
+
+            Returns:
+                The model output with the images of all prompts, a tuple if any of the outputs is a tuple.
+
+            Raises:
+                ValueError: If any of the model outputs is of an unsupported type.
+            """
+            images, nsfw_content_detected = [], []
+            for model_output in model_outputs:
+                if isinstance(model_output, tuple):
+                    output_images, output_nsfw_content_detected = model_output
+                elif isinstance(model_output, StableDiffusionPipelineOutput):
+                    output_images = model_output.images
+                    output_nsfw_content_detected = model_output.nsfw_content_detected
+                else:
+                    raise ValueError(
+                        "Model output can be either Tuple or StableDiffusionPipelineOutput, "
+                        f"but got {type(model_output)}."
+                    )
+
+                images.extend(output_images)
+                # The safety checker results are not stored, so they are dropped unless known for all images
+                if nsfw_content_detected is not None and output_nsfw_content_detected:
+                    nsfw_content_detected.extend(output_nsfw_content_detected)
+                else:
+                    nsfw_content_detected = None
+
+            if any(isinstance(model_output, tuple) for model_output in model_outputs):
+                return images, nsfw_content_detected  # type: ignore
+            return StableDiffusionPipelineOutput(images=images, nsfw_content_detected=nsfw_content_detected)  # type: ignore
+
+        def get_model_output_size(self, model_output: StableDiffusionOutputType, databytes: bytes) -> int:  # type: ignore
+            """Estimates the size in bytes of the decoded image kept in memory.
+
+            Args:
+                model_output: The decoded model output.
+                databytes: The PNG representation the model output was decoded from.
+
+            Returns:
+                The size of the uncompressed image in bytes.
+            """
+            image = self._get_image_from_model_output(model_output)
+            return image.width * image.height * len(image.getbands())
+
         def _get_image_from_model_output(self, model_output: StableDiffusionOutputType) -> Image.Image:  # type: ignore
             """Extracts a single image from the model output.
 
@@ -1,7 +1,7 @@
 import io
 import json
 import pickle
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from genai_monitor.dependencies import EXTRAS_REQUIRE, TRANSFORMERS_AVAILABLE, require_extra
 from genai_monitor.structures.output_parsers.base import BaseModelOutputParser
@@ -18,8 +18,14 @@ class TransformersTextGenerationParser(BaseModelOutputParser[_TextGenerationRetu
     Parser for serialization of outputs of the following transformers classes:
     - AutoModelForCausalLM
     - TextGenerationPipeline
+
+    Attributes:
+        pad_token_id: The token padding the shorter generations when the generations of separate calls are merged, if
+            the call sets no padding token, neither through its generation config nor through its tokenizer.
     """
 
+    pad_token_id: Optional[int] = None
+
     def __init__(self):  # noqa: D107, ANN204
         require_extra("transformers", EXTRAS_REQUIRE)
         super().__init__()
@@ -66,6 +72,107 @@ class TransformersTextGenerationParser(BaseModelOutputParser[_TextGenerationRetu
         except (RuntimeError, ValueError, pickle.UnpicklingError):
             return json.loads(databytes.decode("utf-8"))
 
+    def split_model_output(self, model_output: "_TextGenerationReturnType") -> List["_TextGenerationReturnType"]:
+        """Splits the generated sequences into single-sequence batches.
+
+        Args:
+            model_output: The batch of generated sequences.
+
+        Returns:
+            The single-sequence batches, in the order of the sequences.
+
+        Raises:
+            ValueError: for unsupported model output type
+        """
+        from torch import Tensor
+
+        if not isinstance(model_output, Tensor):
+            raise ValueError(f"Unsupported model output type: {type(model_output).__name__}.")
+
+        return [model_output[i : i + 1] for i in range(model_output.size(0))]
+
+    def get_row_merge_options(self, model: Any, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Checks whether the sequences generated by a call can be split into rows and merged back.
+
+        Only calls of `generate` returning a tensor with a single sequence per row can be decomposed. The padding token
+        is resolved the way `generate` resolves it, from the call, its generation config, its tokenizer or the
+        generation config of the model, falling back to the end-of-sequence token.
+
+        Args:
+            model: The model generating the sequences.
+            kwargs: The keyword arguments of the call.
+
+        Returns:
+            The padding token passed to `merge_model_outputs`, None if the call must not be decomposed into rows.
+        """
+        if not callable(getattr(model, "generate", None)):
+            return None
+
+        generation_configs = [kwargs.get("generation_config"), getattr(model, "generation_config", None)]
+
+        def get_setting(name: str) -> Any:
+            if kwargs.get(name) is not None:
+                return kwargs[name]
+            return next(
+                (getattr(config, name) for config in generation_configs if getattr(config, name, None) is not None),
+                None,
+            )
+
+        if get_setting("return_dict_in_generate") or (get_setting("num_return_sequences") or 1) > 1:
+            return None
+
+        pad_token_id = get_setting("pad_token_id")
+        if pad_token_id is None:
+            pad_token_id = getattr(kwargs.get("tokenizer"), "pad_token_id", None)
+        if pad_token_id is None:
+            eos_token_id = get_setting("eos_token_id")
+            pad_token_id = eos_token_id[0] if isinstance(eos_token_id, (list, tuple)) else eos_token_id
+        if pad_token_id is None:
+            pad_token_id = self.pad_token_id
+        if pad_token_id is None:
+            return None
+        return {"pad_token_id": int(pad_token_id)}
+
+    def merge_model_outputs(
+        self, model_outputs: List["_TextGenerationReturnType"], pad_token_id: Optional[int] = None
+    ) -> "_TextGenerationReturnType":
+        """Concatenates the generated sequences of separate calls into a single batch.
+
+        Sequences of different lengths are padded on the right.
+
+        Args:
+            model_outputs: The batches of generated sequences.
+            pad_token_id: The token padding the shorter sequences, `pad_token_id` of the parser if None.
+
+        Returns:
+            The batch of all generated sequences, on the device of the first output not stored on the CPU.
+
+        Raises:
+            ValueError: for unsupported model output type or sequences of different lengths without a padding token
+        """
+        from torch import Tensor, cat
+        from torch.nn.functional import pad
+
+        if not all(isinstance(model_output, Tensor) for model_output in model_outputs):
+            raise ValueError("Only tensors of generated sequences can be merged.")
+
+        device = next(
+            (model_output.device for model_output in model_outputs if model_output.device.type != "cpu"),
+            model_outputs[0].device,
+        )
+        length = max(model_output.size(-1) for model_output in model_outputs)
+        if any(model_output.size(-1) != length for model_output in model_outputs):
+            if pad_token_id is None:
+                pad_token_id = self.pad_token_id
+            if pad_token_id is None:
+                raise ValueError("Generated sequences of different lengths cannot be merged without `pad_token_id`.")
+            model_outputs = [
+                pad(model_output, (0, length - model_output.size(-1)), value=pad_token_id)
+                for model_output in model_outputs
+            ]
+
+        return cat([model_output.to(device) for model_output in model_outputs])
+
     @staticmethod
     def _validate_single_generation(  # noqa: ANN205
         model_output: Union[Dict[str, Any], torch.Tensor, List[Any]],
@@ -1,26 +1,118 @@
+import asyncio
+import time
+import weakref
 from collections import deque
-from typing import Deque, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Generator, Optional
 
 from attrs import define, field
 
 from genai_monitor.common.structures.data import Artifact, Sample
+from genai_monitor.db.manager import DBManager
+from genai_monitor.db.schemas.tables import ConfigurationTable
+from genai_monitor.static.constants import DEFAULT_VERSION_CHECK_INTERVAL, VERSION_GENERATION_KEY
+
+
+@define
+class TrackingState:
+    """Runtime data of the tracked calls of a single thread, task or tracking context.
+
+    Attributes:
+        latest_sample: The most recently created sample.
+        artifacts_for_next_sample: Collection of artifacts to be associated with the next sample.
+        task: A weak reference to the asyncio task the state belongs to, None for the state of a thread.
+    """
+
+    latest_sample: Optional[Sample] = None
+    artifacts_for_next_sample: Deque[Artifact] = field(factory=deque)
+    task: Optional[weakref.ref] = field(default=None, repr=False)
+
+    def belongs_to(self, task: Optional[asyncio.Task]) -> bool:
+        """Checks whether the state belongs to the task.
+
+        Args:
+            task: The asyncio task, None outside of a task.
+
+        Returns:
+            Whether the state belongs to the task, always True outside of a task.
+        """
+        return task is None or (self.task is not None and self.task() is task)
 
 
 @define
 class RuntimeManager:
     """Class for managing runtime data.
 
+    The latest sample and the artifacts for the next sample are kept in a tracking state scoped with a context
+    variable. Each thread and each asyncio task gets its own state on first use. A task starts from the latest sample
+    of the context it was created in, but never shares the artifacts of that context, so that concurrent tasks do not
+    attach artifacts to each other's samples. Worker threads of `asyncio.to_thread` share the state of their caller.
+
     Attributes:
         user_id: The user ID.
         version: The runtime version identifier.
-        latest_sample: The most recently created sample.
-        artifacts_for_next_sample: Collection of artifacts to be associated with the next sample.
+        database_version: The cached database version.
+        database_version_generation: The version generation counter the cached database version was read at.
+        database_version_checked_at: The monotonic time of the last validation of the cached database version.
+        version_check_interval: The interval in seconds between validations of the cached database version.
     """
 
     user_id: Optional[int] = None
     version: Optional[str] = None
-    latest_sample: Optional[Sample] = None
-    artifacts_for_next_sample: Deque[Artifact] = field(factory=deque)
+    database_version: Optional[str] = None
+    database_version_generation: Optional[str] = None
+    database_version_checked_at: Optional[float] = None
+    version_check_interval: float = DEFAULT_VERSION_CHECK_INTERVAL
+    _tracking_state: ContextVar[Optional[TrackingState]] = field(
+        init=False, factory=lambda: ContextVar("genai_monitor_tracking_state", default=None)
+    )
+
+    @property
+    def latest_sample(self) -> Optional[Sample]:
+        """The most recently created sample of the current tracking state."""
+        return self.get_tracking_state().latest_sample
+
+    @latest_sample.setter
+    def latest_sample(self, sample: Optional[Sample]) -> None:
+        self.get_tracking_state().latest_sample = sample
+
+    @property
+    def artifacts_for_next_sample(self) -> Deque[Artifact]:
+        """The artifacts to be associated with the next sample of the current tracking state."""
+        return self.get_tracking_state().artifacts_for_next_sample
+
+    def get_tracking_state(self) -> TrackingState:
+        """Get the tracking state of the current context, creating it on first use.
+
+        Returns:
+            The tracking state.
+        """
+        state = self._tracking_state.get()
+        task = _current_task()
+        if state is None:
+            state = TrackingState(task=weakref.ref(task) if task is not None else None)
+            self._tracking_state.set(state)
+        elif not state.belongs_to(task):
+            # The task runs in a copy of the context of its creator, so setting the state does not affect the creator
+            state = TrackingState(latest_sample=state.latest_sample, task=weakref.ref(task))
+            self._tracking_state.set(state)
+        return state
+
+    @contextmanager
+    def tracking_context(self) -> Generator[TrackingState, None, None]:
+        """Run the block with a fresh tracking state, restoring the previous one on exit.
+
+        Yields:
+            The tracking state of the block.
+        """
+        task = _current_task()
+        state = TrackingState(task=weakref.ref(task) if task is not None else None)
+        token = self._tracking_state.set(state)
+        try:
+            yield state
+        finally:
+            self._tracking_state.reset(token)
 
     def set_user_id(self, user_id: int) -> None:
         """Set the user ID.
@@ -37,3 +129,60 @@ class RuntimeManager:
             version: The version.
         """
         self.version = version
+
+    def get_current_version(self, db_manager: DBManager) -> str:
+        """Get the runtime version or, if it is not set, the database version.
+
+        The database version is cached. At most every `version_check_interval` seconds, the version generation
+        counter is read to detect changes of the database version made by other processes.
+
+        Args:
+            db_manager: The database manager.
+
+        Returns:
+            The current version.
+
+        Raises:
+            ValueError: If the database version is not found or multiple versions are found.
+        """
+        if self.version is not None:
+            return self.version
+
+        now = time.monotonic()
+        if (
+            self.database_version is not None
+            and self.database_version_checked_at is not None
+            and now - self.database_version_checked_at < self.version_check_interval
+        ):
+            return self.database_version
+
+        generation = db_manager.search(ConfigurationTable, {"key": VERSION_GENERATION_KEY})
+        generation = generation[0].value if generation else None
+        if self.database_version is None or generation != self.database_version_generation:
+            version = db_manager.search(ConfigurationTable, {"key": "version"})
+
+            if not version:
+                raise ValueError("Database version not found.")
+
+            if len(version) > 1:
+                raise ValueError("Multiple database versions found.")
+
+            self.database_version = version[0].value
+
+        self.database_version_generation = generation
+        self.database_version_checked_at = now
+        return self.database_version
+
+    def invalidate_database_version(self) -> None:
+        """Discard the cached database version, so that it is read from the database on the next use."""
+        self.database_version = None
+        self.database_version_generation = None
+        self.database_version_checked_at = None
+
+
+def _current_task() -> Optional[asyncio.Task]:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        # No event loop runs in the thread, e.g. in the worker threads of `asyncio.to_thread`
+        return None
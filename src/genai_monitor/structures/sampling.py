@@ -0,0 +1,123 @@
+import random
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Optional
+
+
+class SamplingPolicy(ABC):
+    """Decides which tracked calls are recorded.
+
+    Calls that are not sampled run the model directly, without parsing the conditioning or touching the database.
+    If `cache_lookup` is set, they still return the output of an existing generation when there is one.
+
+    Attributes:
+        cache_lookup: Whether the calls that are not sampled look up existing generations before running the model.
+    """
+
+    def __init__(self, cache_lookup: bool = False):  # noqa: D107, ANN204
+        self.cache_lookup = cache_lookup
+
+    @abstractmethod
+    def sample(self) -> bool:
+        """Decides whether the next call is recorded.
+
+        Returns:
+            Whether the call is sampled.
+        """
+
+
+class ProbabilisticSampling(SamplingPolicy):
+    """Records each call with a fixed probability.
+
+    Attributes:
+        rate: The probability of recording a call, from 0 to 1.
+    """
+
+    def __init__(self, rate: float, cache_lookup: bool = False):  # noqa: D107, ANN204
+        if not 0 <= rate <= 1:
+            raise ValueError(f"The sampling rate must be between 0 and 1, got {rate}.")
+        super().__init__(cache_lookup=cache_lookup)
+        self.rate = rate
+
+    def sample(self) -> bool:
+        """Decides whether the next call is recorded.
+
+        Returns:
+            Whether the call is sampled.
+        """
+        return random.random() < self.rate  # noqa: S311
+
+
+class EveryNthSampling(SamplingPolicy):
+    """Records every n-th call, starting with the first one.
+
+    Attributes:
+        n: The interval between the recorded calls.
+    """
+
+    def __init__(self, n: int, cache_lookup: bool = False):  # noqa: D107, ANN204
+        if n < 1:
+            raise ValueError(f"The sampling interval must be at least 1, got {n}.")
+        super().__init__(cache_lookup=cache_lookup)
+        self.n = n
+        self._count = 0
+        self._lock = Lock()
+
+    def sample(self) -> bool:
+        """Decides whether the next call is recorded.
+
+        Returns:
+            Whether the call is sampled.
+        """
+        with self._lock:
+            sampled = self._count % self.n == 0
+            self._count += 1
+        return sampled
+
+
+class RateLimitedSampling(SamplingPolicy):
+    """Records calls up to a maximal rate, with a token bucket refilled at `rate` tokens per second.
+
+    Attributes:
+        rate: The maximal sustained number of recorded calls per second.
+        burst: The maximal number of calls recorded at once after a quiet period.
+    """
+
+    def __init__(  # noqa: D107, ANN204
+        self, rate: float, burst: Optional[float] = None, cache_lookup: bool = False
+    ):
+        if rate <= 0:
+            raise ValueError(f"The sampling rate must be positive, got {rate}.")
+        super().__init__(cache_lookup=cache_lookup)
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._lock = Lock()
+
+    def sample(self) -> bool:
+        """Decides whether the next call is recorded, taking a token from the bucket if it is.
+
+        Returns:
+            Whether the call is sampled.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class SamplingSettings:
+    """The global sampling policy, applied to the registrations without a sampling policy of their own.
+
+    Attributes:
+        policy: The global sampling policy, all calls are recorded if None.
+    """
+
+    def __init__(self, policy: Optional[SamplingPolicy] = None):  # noqa: D107, ANN204
+        self.policy = policy
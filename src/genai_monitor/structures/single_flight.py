@@ -0,0 +1,146 @@
+from threading import Event, Lock
+from typing import Any, Dict, Optional, Tuple
+
+from genai_monitor.common.structures.data import Sample
+
+# The model hash, the conditioning hash, the version and the generation id of a generation slot
+FlightKey = Tuple[str, str, str, int]
+
+
+class Flight:
+    """A generation running in this process, awaited by the identical calls that arrive while it runs.
+
+    Attributes:
+        sample: The sample placeholder of the generation, None while the slot is claimed but not yet reserved.
+        model_output: The output of the generation, set once it completes.
+        failed: Whether the generation failed.
+    """
+
+    def __init__(self, sample: Optional[Sample]):  # noqa: D107, ANN204
+        self.sample = sample
+        self.model_output: Any = None
+        self.failed = False
+        self._finished = Event()
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Blocks until the generation is finished or the timeout expires.
+
+        Args:
+            timeout: The maximal time in seconds to wait, waits indefinitely if None.
+
+        Returns:
+            True if the generation finished, False if the timeout expired first.
+        """
+        return self._finished.wait(timeout=timeout)
+
+    def _finish(self, model_output: Any = None, failed: bool = False):
+        self.model_output = model_output
+        self.failed = failed
+        self._finished.set()
+
+
+class SingleFlight:
+    """Table of the generations running in this process, keyed by their generation slot.
+
+    The call reserving a generation slot leads its flight. Identical calls arriving while the flight runs follow it,
+    getting the output of the leader without running the model or polling the database. A call can claim the flight of
+    a slot before reserving it in the database, so that the identical calls arriving meanwhile follow it as well.
+    """
+
+    def __init__(self):  # noqa: D107, ANN204
+        self._flights: Dict[FlightKey, Flight] = {}
+        self._keys: Dict[int, FlightKey] = {}
+        self._lock = Lock()
+
+    def join(self, key: FlightKey) -> Tuple[Flight, bool]:
+        """Finds the flight of a generation slot, or claims it for the caller if the slot has no flight.
+
+        The caller claiming the flight must either start it with `begin` or give it up with `abandon`.
+
+        Args:
+            key: The key of the generation slot.
+
+        Returns:
+            The flight, and whether it was claimed by the caller.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight(None)
+            return flight, True
+
+    def begin(self, key: FlightKey, sample: Sample) -> Optional[Flight]:
+        """Starts the flight of a generation slot reserved by the caller.
+
+        Args:
+            key: The key of the generation slot.
+            sample: The sample placeholder reserved for the slot.
+
+        Returns:
+            The started flight, the claimed flight if the caller claimed the slot, None if the slot already has a
+            running flight.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Flight(sample)
+            elif flight.sample is None:
+                flight.sample = sample
+            else:
+                return None
+            self._keys[sample.id] = key
+            return flight
+
+    def abandon(self, flight: Flight, key: FlightKey):
+        """Gives up a claimed flight that was not started, waking up its followers as if it failed.
+
+        Args:
+            flight: The claimed flight.
+            key: The key of the generation slot.
+        """
+        with self._lock:
+            if flight.sample is not None or self._flights.get(key) is not flight:
+                return
+            del self._flights[key]
+        flight._finish(failed=True)
+
+    def find(self, key: FlightKey) -> Optional[Flight]:
+        """Finds the running flight of a generation slot.
+
+        Args:
+            key: The key of the generation slot.
+
+        Returns:
+            The flight, None if no generation of the slot runs in this process.
+        """
+        with self._lock:
+            return self._flights.get(key)
+
+    def complete(self, sample_id: int, model_output: Any):
+        """Finishes the flight of a completed sample, waking up its followers.
+
+        Args:
+            sample_id: The id of the completed sample.
+            model_output: The output recorded in the sample.
+        """
+        flight = self._pop(sample_id)
+        if flight is not None:
+            flight._finish(model_output=model_output)
+
+    def fail(self, sample_id: int):
+        """Finishes the flight of a failed sample, waking up its followers.
+
+        Args:
+            sample_id: The id of the failed sample.
+        """
+        flight = self._pop(sample_id)
+        if flight is not None:
+            flight._finish(failed=True)
+
+    def _pop(self, sample_id: int) -> Optional[Flight]:
+        with self._lock:
+            key = self._keys.pop(sample_id, None)
+            if key is None:
+                return None
+            return self._flights.pop(key, None)
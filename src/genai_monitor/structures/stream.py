@@ -0,0 +1,221 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, Set
+
+from loguru import logger
+
+from genai_monitor.static.constants import DEFAULT_STREAM_REPLAY_CHUNK_SIZE, DEFAULT_STREAM_REPLAY_INTERVAL
+
+# The aborts of the dropped asynchronous streams, referenced until they finish since the event loop does not keep them
+_pending_aborts: Set[asyncio.Task] = set()
+
+
+class ChunkStream:
+    """Stream passing the chunks of another stream through to the caller as soon as they arrive.
+
+    The chunks are collected on the way. Once the stream is exhausted, `on_complete` is called with all chunks; if the
+    stream raises, is closed or is dropped by the caller before the end, `on_abort` is called instead. Other attributes
+    are delegated to the wrapped stream.
+    """
+
+    def __init__(  # noqa: D107, ANN204
+        self,
+        stream: Iterable[Any],
+        on_complete: Optional[Callable[[List[Any]], None]] = None,
+        on_abort: Optional[Callable[[], None]] = None,
+    ):
+        self._stream = stream
+        self._iterator = iter(stream)
+        self._on_complete = on_complete
+        self._on_abort = on_abort
+        self._chunks: List[Any] = []
+        self._finished = False
+
+    def __iter__(self) -> Iterator[Any]:  # noqa: D105
+        return self
+
+    def __next__(self) -> Any:  # noqa: D105
+        try:
+            chunk = next(self._iterator)
+        except StopIteration:
+            self._finish(complete=True)
+            raise
+        except Exception:
+            self._finish(complete=False)
+            raise
+
+        self._chunks.append(chunk)
+        return chunk
+
+    def __enter__(self) -> "ChunkStream":  # noqa: D105
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:  # noqa: D105
+        self.close()
+
+    def __getattr__(self, name: str) -> Any:  # noqa: D105
+        return getattr(self._stream, name)
+
+    def __del__(self) -> None:  # noqa: D105
+        # The attributes are read from the instance dictionary, as `__getattr__` would recurse if `__init__` failed
+        if not self.__dict__.get("_finished", True):
+            self._finish(complete=False)
+
+    def close(self):
+        """Closes the wrapped stream, aborting the collection of chunks if the stream is not exhausted."""
+        self._finish(complete=False)
+        close = getattr(self._stream, "close", None)
+        if callable(close):
+            close()
+
+    def _finish(self, complete: bool):
+        if self._finished:
+            return
+        self._finished = True
+
+        try:
+            if complete and self._on_complete is not None:
+                self._on_complete(self._chunks)
+            elif not complete and self._on_abort is not None:
+                self._on_abort()
+        except Exception as e:
+            # The chunks have already been delivered, so a failed recording must not break the caller's stream
+            logger.error(f"Could not record the streamed output: {e}")
+
+
+class AsyncChunkStream:
+    """Asynchronous stream passing the chunks of another stream through to the caller as soon as they arrive.
+
+    The asynchronous counterpart of `ChunkStream`, with coroutine callbacks. The abort of a stream dropped by the
+    caller is scheduled on the event loop the stream was created in.
+    """
+
+    def __init__(  # noqa: D107, ANN204
+        self,
+        stream: Any,
+        on_complete: Optional[Callable[[List[Any]], Awaitable[None]]] = None,
+        on_abort: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        self._stream = stream
+        self._iterator = stream.__aiter__()
+        self._on_complete = on_complete
+        self._on_abort = on_abort
+        self._chunks: List[Any] = []
+        self._finished = False
+        try:
+            self._loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+    def __aiter__(self) -> AsyncIterator[Any]:  # noqa: D105
+        return self
+
+    async def __anext__(self) -> Any:  # noqa: D105
+        try:
+            chunk = await self._iterator.__anext__()
+        except StopAsyncIteration:
+            await self._finish(complete=True)
+            raise
+        except Exception:
+            await self._finish(complete=False)
+            raise
+
+        self._chunks.append(chunk)
+        return chunk
+
+    async def __aenter__(self) -> "AsyncChunkStream":  # noqa: D105
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:  # noqa: D105
+        await self.close()
+
+    def __getattr__(self, name: str) -> Any:  # noqa: D105
+        return getattr(self._stream, name)
+
+    def __del__(self) -> None:  # noqa: D105
+        if self.__dict__.get("_finished", True):
+            return
+
+        loop = self.__dict__.get("_loop")
+        if loop is None or loop.is_closed():
+            logger.warning("Could not abort the dropped stream, its event loop is closed.")
+            return
+        loop.call_soon_threadsafe(self._schedule_abort)
+
+    async def close(self):
+        """Closes the wrapped stream, aborting the collection of chunks if the stream is not exhausted."""
+        await self._finish(complete=False)
+        close = getattr(self._stream, "close", None) or getattr(self._stream, "aclose", None)
+        if callable(close):
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def _finish(self, complete: bool):
+        if self._finished:
+            return
+        self._finished = True
+
+        try:
+            if complete and self._on_complete is not None:
+                await self._on_complete(self._chunks)
+            elif not complete and self._on_abort is not None:
+                await self._on_abort()
+        except Exception as e:
+            logger.error(f"Could not record the streamed output: {e}")
+
+    def _schedule_abort(self):
+        task = asyncio.ensure_future(self._finish(complete=False), loop=self._loop)
+        _pending_aborts.add(task)
+        task.add_done_callback(_pending_aborts.discard)
+
+
+class StreamReplayer:
+    """Replays the outputs of streamed calls loaded from existing generations as synthetic chunk streams.
+
+    Attributes:
+        chunk_size: The number of characters of the generated text in a single replayed chunk.
+        chunk_interval: The time in seconds between the replayed chunks, 0 to replay without pacing.
+    """
+
+    def __init__(  # noqa: D107, ANN204
+        self,
+        chunk_size: int = DEFAULT_STREAM_REPLAY_CHUNK_SIZE,
+        chunk_interval: float = DEFAULT_STREAM_REPLAY_INTERVAL,
+    ):
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval
+
+    def replay(self, chunks: List[Any]) -> ChunkStream:
+        """Replays the chunks as a stream.
+
+        Args:
+            chunks: The synthetic chunks of the output.
+
+        Returns:
+            The stream of the chunks.
+        """
+        return ChunkStream(self._paced(chunks))
+
+    def replay_async(self, chunks: List[Any]) -> AsyncChunkStream:
+        """Replays the chunks as an asynchronous stream.
+
+        Args:
+            chunks: The synthetic chunks of the output.
+
+        Returns:
+            The asynchronous stream of the chunks.
+        """
+        return AsyncChunkStream(self._paced_async(chunks))
+
+    def _paced(self, chunks: List[Any]) -> Iterator[Any]:
+        for i, chunk in enumerate(chunks):
+            if i > 0 and self.chunk_interval > 0:
+                time.sleep(self.chunk_interval)
+            yield chunk
+
+    async def _paced_async(self, chunks: List[Any]) -> AsyncIterator[Any]:
+        for i, chunk in enumerate(chunks):
+            if i > 0 and self.chunk_interval > 0:
+                await asyncio.sleep(self.chunk_interval)
+            yield chunk
@@ -0,0 +1,216 @@
+import atexit
+import time
+from queue import Empty, Full, Queue
+from threading import Condition, Lock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from genai_monitor.db.manager import DBManager
+from genai_monitor.static.constants import (
+    DEFAULT_WRITE_BEHIND_BATCH_SIZE,
+    DEFAULT_WRITE_BEHIND_MAX_DELAY_MS,
+    DEFAULT_WRITE_BEHIND_QUEUE_SIZE,
+)
+
+WriteJob = Tuple[DBManager, Callable[[], None], Optional[Callable[[], None]], Optional[Callable[[], None]]]
+
+
+class WriteBehindQueue:
+    """Bounded queue of database writes drained by a background worker thread in group commits.
+
+    The worker collects up to `max_batch_size` jobs, or the jobs submitted within `max_delay_ms` of the first one,
+    and runs the jobs of each database in a single unit of work. If a group commit fails, its jobs are retried one by
+    one, so that a single failing job does not discard the others. The queue is disabled by default; while it is
+    disabled, the callers are expected to run their writes synchronously.
+
+    Attributes:
+        enabled: Whether the writes are submitted to the background worker.
+        max_batch_size: The maximal number of jobs committed together.
+        max_delay_ms: The maximal time in milliseconds the worker waits for further jobs before committing.
+        max_queue_size: The maximal number of pending jobs, submitting to a full queue blocks the caller.
+    """
+
+    def __init__(  # noqa: D107, ANN204
+        self,
+        max_batch_size: int = DEFAULT_WRITE_BEHIND_BATCH_SIZE,
+        max_delay_ms: float = DEFAULT_WRITE_BEHIND_MAX_DELAY_MS,
+        max_queue_size: int = DEFAULT_WRITE_BEHIND_QUEUE_SIZE,
+    ):
+        self.enabled = False
+        self.max_batch_size = max_batch_size
+        self.max_delay_ms = max_delay_ms
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[Queue[WriteJob]] = None
+        self._pending = 0
+        self._idle = Condition()
+        self._lock = Lock()
+        self._worker: Optional[Thread] = None
+        self._exit_hook_registered = False
+
+    def enable(
+        self,
+        max_batch_size: Optional[int] = None,
+        max_delay_ms: Optional[float] = None,
+        max_queue_size: Optional[int] = None,
+    ):
+        """Enables the queue and starts the background worker.
+
+        Args:
+            max_batch_size: The maximal number of jobs committed together.
+            max_delay_ms: The maximal time in milliseconds the worker waits for further jobs before committing.
+            max_queue_size: The maximal number of pending jobs, cannot be changed while the worker is running.
+        """
+        with self._lock:
+            if max_batch_size is not None:
+                self.max_batch_size = max_batch_size
+            if max_delay_ms is not None:
+                self.max_delay_ms = max_delay_ms
+            if max_queue_size is not None and max_queue_size != self.max_queue_size:
+                if self._is_running():
+                    logger.warning("The size of the write-behind queue cannot be changed while the worker is running.")
+                else:
+                    self.max_queue_size = max_queue_size
+
+            if not self._is_running():
+                self._queue = Queue(maxsize=self.max_queue_size)
+                self._worker = Thread(target=self._run, name="genai-monitor-write-behind", daemon=True)
+                self._worker.start()
+
+            if not self._exit_hook_registered:
+                atexit.register(self.flush)
+                self._exit_hook_registered = True
+
+            self.enabled = True
+            logger.info(
+                f"Write-behind enabled (batch size: {self.max_batch_size}, max delay: {self.max_delay_ms} ms, "
+                f"queue size: {self.max_queue_size})."
+            )
+
+    def disable(self):
+        """Writes all pending jobs and disables the queue."""
+        with self._lock:
+            self.enabled = False
+        self.flush()
+        logger.info("Write-behind disabled.")
+
+    def submit(
+        self,
+        db_manager: DBManager,
+        job: Callable[[], None],
+        on_commit: Optional[Callable[[], None]] = None,
+        on_error: Optional[Callable[[], None]] = None,
+    ):
+        """Submits a write to the background worker, blocking while the queue is full.
+
+        Args:
+            db_manager: The database manager the job writes with, jobs of the same database are committed together.
+            job: The write to run inside the unit of work of its batch.
+            on_commit: The callback to run once the write of the job is committed.
+            on_error: The callback to run if the write of the job fails.
+        """
+        with self._idle:
+            self._pending += 1
+
+        while self._is_running():
+            try:
+                self._queue.put((db_manager, job, on_commit, on_error), timeout=1)
+                return
+            except Full:
+                continue
+
+        logger.warning("Write-behind worker is not running, writing synchronously.")
+        try:
+            self._write_batch([(db_manager, job, on_commit, on_error)])
+        finally:
+            self._mark_done(1)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until all submitted jobs are written.
+
+        Args:
+            timeout: The maximal time in seconds to wait, waits indefinitely if None.
+
+        Returns:
+            True if all jobs were written, False if the timeout expired first.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    @property
+    def pending(self) -> int:
+        """The number of submitted jobs that are not written yet."""
+        with self._idle:
+            return self._pending
+
+    def _is_running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # The worker serves all later jobs, so it must survive any failure of a batch
+                logger.error(f"Write-behind batch failed: {e}")
+            finally:
+                self._mark_done(len(batch))
+
+    def _write_batch(self, batch: List[WriteJob]):
+        groups: Dict[int, Tuple[DBManager, List[WriteJob]]] = {}
+        for write_job in batch:
+            groups.setdefault(id(write_job[0].session_manager), (write_job[0], []))[1].append(write_job)
+
+        for db_manager, jobs in groups.values():
+            try:
+                with db_manager.unit_of_work():
+                    for _, job, _, _ in jobs:
+                        job()
+                logger.debug(f"Committed {len(jobs)} write-behind jobs.")
+                committed = jobs
+
+            except Exception as e:
+                if len(jobs) == 1:
+                    logger.error(f"Write-behind job failed: {e}")
+                    self._run_callback(jobs[0][3])
+                    continue
+
+                logger.warning(f"Group commit of {len(jobs)} write-behind jobs failed ({e}), retrying one by one.")
+                committed = []
+                for write_job in jobs:
+                    try:
+                        with db_manager.unit_of_work():
+                            write_job[1]()
+                        committed.append(write_job)
+                    except Exception as job_error:
+                        logger.error(f"Write-behind job failed: {job_error}")
+                        self._run_callback(write_job[3])
+
+            for _, _, on_commit, _ in committed:
+                self._run_callback(on_commit)
+
+    @staticmethod
+    def _run_callback(callback: Optional[Callable[[], None]]) -> None:
+        if callback is None:
+            return
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Write-behind callback failed: {e}")
+
+    def _mark_done(self, count: int):
+        with self._idle:
+            self._pending -= count
+            if self._pending == 0:
+                self._idle.notify_all()
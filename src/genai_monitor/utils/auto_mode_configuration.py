@@ -1,14 +1,17 @@
 import os
 from datetime import datetime
-from typing import Dict
+from typing import Any, Dict, Optional
 
 from loguru import logger
+from sqlalchemy import create_engine, inspect, make_url, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 
-from genai_monitor.config import Config
+from genai_monitor.config import Config, DBPoolConfig
 from genai_monitor.db import init_db
 from genai_monitor.db.schemas.tables import ConfigurationTable
+from genai_monitor.db.sqlite import DEFAULT_SQLITE_PRAGMAS
 from genai_monitor.static.constants import DEFAULT_DB_VERSION, DEFAULT_PERSISTENCY_PATH
 
 
@@ -39,6 +42,66 @@ def _get_database_version() -> str:
     return os.getenv("GENAI_MONITOR_DB_VERSION", DEFAULT_DB_VERSION)
 
 
+def _get_sqlite_pragma(name: str) -> str:
+    """Get the value of a SQLite pragma from environment variable or fallback to the default if not set.
+
+    Args:
+        name: The name of the pragma.
+
+    Returns:
+        str: The value of the pragma, empty to keep the SQLite default.
+    """
+    return os.getenv(f"GENAI_MONITOR_SQLITE_{name.upper()}", str(DEFAULT_SQLITE_PRAGMAS[name]))
+
+
+def _get_stored_sqlite_pragmas(db_url: str) -> Dict[str, Optional[str]]:
+    """Get the SQLite pragmas stored in the configuration of a database, without creating its shared engine.
+
+    Args:
+        db_url: The database URL.
+
+    Returns:
+        The stored values of the pragmas by name, None for the pragmas set empty to keep the SQLite default.
+    """
+    url = make_url(db_url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return {}
+
+    keys = {f"db.sqlite.{name}": name for name in DEFAULT_SQLITE_PRAGMAS}
+    engine = create_engine(db_url, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            if not inspect(connection).has_table(ConfigurationTable.__tablename__):
+                return {}
+            rows = connection.execute(
+                select(ConfigurationTable.key, ConfigurationTable.value).where(ConfigurationTable.key.in_(keys))
+            )
+            return {keys[key]: value or None for key, value in rows}
+    finally:
+        engine.dispose()
+
+
+def _resolve_sqlite_pragmas(db_url: str) -> Dict[str, Any]:
+    """Resolve the SQLite pragmas of a database.
+
+    The pragmas set by environment variables override the ones stored in the configuration of the database, which
+    override the defaults. The pragmas are resolved before the engine of the database is created, so that the engine
+    is created once, with the pragmas of the loaded configuration.
+
+    Args:
+        db_url: The database URL.
+
+    Returns:
+        The values of the pragmas by name, None for the pragmas keeping the SQLite default.
+    """
+    pragmas: Dict[str, Any] = {**DEFAULT_SQLITE_PRAGMAS, **_get_stored_sqlite_pragmas(db_url)}
+    for name in DEFAULT_SQLITE_PRAGMAS:
+        value = os.getenv(f"GENAI_MONITOR_SQLITE_{name.upper()}")
+        if value is not None:
+            pragmas[name] = value or None
+    return pragmas
+
+
 # pylint: disable=W0102
 DEFAULT_SETTINGS = {
     "persistency.enabled": {
@@ -57,6 +120,17 @@ DEFAULT_SETTINGS = {
         "value": _get_database_version(),
         "description": "Database version",
     },
+    "version.generation": {
+        "value": "0",
+        "description": "Counter of database version changes",
+    },
+    **{
+        f"db.sqlite.{name}": {
+            "value": _get_sqlite_pragma(name),
+            "description": f"SQLite pragma {name}, empty to keep the SQLite default",
+        }
+        for name in DEFAULT_SQLITE_PRAGMAS
+    },
 }
 
 
@@ -104,8 +178,10 @@ def load_config(db_url: str, default_settings: Dict[str, dict[str, str]] = DEFAU
     """
     logger.info(f"Using database at: {db_url}")
 
-    # Initialize database with the url
-    session_manager = init_db(database_url=db_url)
+    # Initialize database with the url, with the same engine settings as the returned configuration
+    sqlite_pragmas = _resolve_sqlite_pragmas(db_url)
+    pool_settings = DBPoolConfig().model_dump()
+    session_manager = init_db(database_url=db_url, sqlite_pragmas=sqlite_pragmas, pool_settings=pool_settings)
 
     try:
         with session_manager.session_scope() as session:
@@ -128,7 +204,11 @@ def load_config(db_url: str, default_settings: Dict[str, dict[str, str]] = DEFAU
                     "enabled": settings_dict["persistency.enabled"].lower() == "true",
                     "path": settings_dict["persistency.path"],
                 },
-                db={"url": settings_dict["db.url"]},  # type: ignore
+                db={  # type: ignore
+                    "url": settings_dict["db.url"],
+                    "sqlite": sqlite_pragmas,
+                    "pool": pool_settings,
+                },
                 version=settings_dict["version"],
             )
 
@@ -4,11 +4,13 @@ import hashlib
 import json
 from os import PathLike
 from pathlib import Path
-from typing import Any, Callable, Literal, Optional
+from threading import Lock
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+from weakref import WeakKeyDictionary
 
 from loguru import logger
 
-from genai_monitor.dependencies import DIFFUSERS_AVAILABLE, TRANSFORMERS_AVAILABLE
+from genai_monitor.dependencies import DIFFUSERS_AVAILABLE, TORCH_AVAILABLE, TRANSFORMERS_AVAILABLE
 from genai_monitor.static.constants import EMPTY_MODEL_HASH, UNKNOWN_MODEL_HASH
 
 if TRANSFORMERS_AVAILABLE:
@@ -198,3 +200,143 @@ def get_function_full_path(func: Callable):
     module_name = func.__module__
     func_name = func.__name__
     return f"{module_name}.{func_name}"
+
+
+_ADAPTER_STATE_ATTRIBUTES = ("active_adapters", "merged_adapters", "disable_adapters", "num_fused_loras")
+
+
+def get_weights_fingerprint(model: Any) -> Optional[Tuple]:
+    """Computes a cheap fingerprint of the weights of a model, without reading the weights themselves.
+
+    The fingerprint consists of the name, dtype, shape, storage address and version counter of every tensor in the
+    state dicts of the PyTorch modules of the model, and of the adapter state of its modules. It changes whenever the
+    weights are modified in place, replaced (e.g. by `load_state_dict` or `.to()`), or when adapters are loaded,
+    unloaded, fused or switched.
+
+    Args:
+        model: A PyTorch module, a pipeline with `components`, or a collection of them.
+
+    Returns:
+        The fingerprint, or None if the model holds no PyTorch weights or the fingerprint cannot be computed.
+    """
+    if not TORCH_AVAILABLE:
+        return None
+
+    entries: List[Tuple] = []
+    try:
+        _collect_weights_fingerprint(component=model, prefix="", entries=entries)
+    except RuntimeError as e:
+        # E.g. tensors created in inference mode do not track the version counter
+        logger.debug(f"Could not compute the weights fingerprint: {e}")
+        return None
+
+    return tuple(entries) if entries else None
+
+
+def _collect_weights_fingerprint(component: Any, prefix: str, entries: List[Tuple]):
+    from torch import nn
+
+    if isinstance(component, nn.Module):
+        for module_name, module in component.named_modules(prefix=prefix):
+            adapter_state = tuple(repr(getattr(module, name, None)) for name in _ADAPTER_STATE_ATTRIBUTES)
+            if any(state != "None" for state in adapter_state):
+                entries.append((module_name, adapter_state))
+
+        for name, tensor in component.state_dict(prefix=prefix, keep_vars=True).items():
+            entries.append((name, str(tensor.dtype), tuple(tensor.shape), tensor.data_ptr(), tensor._version))
+
+    elif isinstance(getattr(component, "components", None), dict):
+        adapter_state = tuple(repr(getattr(component, name, None)) for name in _ADAPTER_STATE_ATTRIBUTES)
+        entries.append((prefix, adapter_state))
+        _collect_weights_fingerprint(component=component.components, prefix=prefix, entries=entries)
+
+    elif isinstance(component, dict):
+        for key in sorted(component.keys()):
+            _collect_weights_fingerprint(component=component[key], prefix=f"{prefix}{key}.", entries=entries)
+
+    elif isinstance(component, (list, tuple)):
+        for index, subcomponent in enumerate(component):
+            _collect_weights_fingerprint(component=subcomponent, prefix=f"{prefix}{index}.", entries=entries)
+
+
+class MemoizedModelHash:
+    """Model hashing function caching the hash of every live model instance until its weights change.
+
+    The cache is keyed by weak references to the model instances, so it does not keep the models alive. Models whose
+    weights cannot be fingerprinted (see `get_weights_fingerprint`) are hashed on every call.
+
+    Attributes:
+        hashing_function: The underlying hashing function.
+    """
+
+    def __init__(self, hashing_function: Callable[[Any], str]):  # noqa: D107, ANN204
+        self.hashing_function = hashing_function
+        self._hashes: WeakKeyDictionary = WeakKeyDictionary()
+        self._lock = Lock()
+        self.__name__ = getattr(hashing_function, "__name__", type(self).__name__)
+
+    def __call__(self, model: Any) -> str:
+        """Gets the hash of the model, computing it only if the weights of the model changed since the last call.
+
+        Args:
+            model: The model to hash.
+
+        Returns:
+            The hash of the model.
+        """
+        fingerprint = get_weights_fingerprint(model)
+        if fingerprint is None:
+            return self.hashing_function(model)
+
+        try:
+            with self._lock:
+                cached = self._hashes.get(model)
+        except TypeError:
+            # The model cannot be weakly referenced
+            return self.hashing_function(model)
+
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        model_hash = self.hashing_function(model)
+        with self._lock:
+            self._hashes[model] = (fingerprint, model_hash)
+        return model_hash
+
+    def invalidate(self, model: Optional[Any] = None):
+        """Drops the cached hash of the model, or of all models if no model is given.
+
+        Args:
+            model: The model to drop the cached hash for.
+        """
+        with self._lock:
+            if model is None:
+                self._hashes.clear()
+            else:
+                self._hashes.pop(model, None)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Gets the number of models with a cached hash.
+
+        Returns:
+            A dictionary with the number of cached model hashes.
+        """
+        with self._lock:
+            return {"size": len(self._hashes)}
+
+
+def memoize_model_hash(hashing_function: Callable[[Any], str]) -> MemoizedModelHash:
+    """Wraps a weights-based hashing function to cache its results per live model instance.
+
+    Only hashing functions that depend solely on the PyTorch weights of the model should be memoized, as the cached
+    hash is invalidated only when the weights or adapters change.
+
+    Args:
+        hashing_function: The hashing function to memoize.
+
+    Returns:
+        The memoized hashing function.
+    """
+    if isinstance(hashing_function, MemoizedModelHash):
+        return hashing_function
+    return MemoizedModelHash(hashing_function)
@@ -29,10 +29,7 @@ def register_user(db_manager: DBManager, runtime_manager: RuntimeManager):
     """
     user_hash = generate_user_hash()
 
-    existing_user = db_manager.search(
-        UserTable,
-        {"hash": user_hash},
-    )
+    existing_user = db_manager.search(UserTable, {"hash": user_hash}, load="none")
 
     if existing_user:
         runtime_manager.set_user_id(existing_user[0].id)
@@ -42,6 +39,6 @@ def register_user(db_manager: DBManager, runtime_manager: RuntimeManager):
     logger.info("User not found in the database. Registering new user.")
     username = getpass.getuser()
     user = User(name=username, hash=user_hash)
-    user = db_manager.save(instance=user.to_orm())
+    user = db_manager.upsert(user.to_orm(), keys=["hash"])
     runtime_manager.set_user_id(user.id)
     logger.success(f"User {user.name} registered successfully.")
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from dependency_injector.wiring import Provide, inject
+
+from genai_monitor.injectors.containers import DependencyContainer
+from genai_monitor.structures.write_behind_queue import WriteBehindQueue
+
+
+@inject
+def enable_write_behind(
+    max_batch_size: Optional[int] = None,
+    max_delay_ms: Optional[float] = None,
+    max_queue_size: Optional[int] = None,
+    write_behind_queue: WriteBehindQueue = Provide[DependencyContainer.write_behind_queue],
+):
+    """Record the outputs of tracked calls in the background, committing them in batches.
+
+    The pending outputs are written on interpreter exit, or explicitly with `flush_write_behind()`.
+
+    Args:
+        max_batch_size: The maximal number of outputs committed together.
+        max_delay_ms: The maximal time in milliseconds an output waits for others before being committed.
+        max_queue_size: The maximal number of pending outputs, tracked calls block while the queue is full.
+        write_behind_queue: The write-behind queue.
+    """
+    write_behind_queue.enable(max_batch_size=max_batch_size, max_delay_ms=max_delay_ms, max_queue_size=max_queue_size)
+
+
+@inject
+def disable_write_behind(write_behind_queue: WriteBehindQueue = Provide[DependencyContainer.write_behind_queue]):
+    """Write the pending outputs and record the outputs of subsequent tracked calls synchronously.
+
+    Args:
+        write_behind_queue: The write-behind queue.
+    """
+    write_behind_queue.disable()
+
+
+@inject
+def flush_write_behind(
+    timeout: Optional[float] = None,
+    write_behind_queue: WriteBehindQueue = Provide[DependencyContainer.write_behind_queue],
+) -> bool:
+    """Wait until the pending outputs are written to the database and disk.
+
+    Args:
+        timeout: The maximal time in seconds to wait, waits indefinitely if None.
+        write_behind_queue: The write-behind queue.
+
+    Returns:
+        True if all pending outputs were written, False if the timeout expired first.
+    """
+    return write_behind_queue.flush(timeout=timeout)
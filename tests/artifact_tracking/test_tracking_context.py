@@ -0,0 +1,68 @@
+import asyncio
+from threading import Thread
+
+from genai_monitor.common.structures.data import Artifact, Sample
+from genai_monitor.structures.runtime_manager import RuntimeManager
+
+
+def test_tracking_state_is_scoped_to_threads():
+    runtime_manager = RuntimeManager()
+    runtime_manager.latest_sample = Sample(id=1)
+    runtime_manager.artifacts_for_next_sample.append(Artifact(name="main", value="{}", hash="main"))
+
+    seen_in_thread = {}
+
+    def run_in_thread():
+        seen_in_thread["latest_sample"] = runtime_manager.latest_sample
+        seen_in_thread["artifacts"] = len(runtime_manager.artifacts_for_next_sample)
+        runtime_manager.latest_sample = Sample(id=2)
+
+    thread = Thread(target=run_in_thread)
+    thread.start()
+    thread.join()
+
+    assert seen_in_thread == {"latest_sample": None, "artifacts": 0}
+    assert runtime_manager.latest_sample.id == 1
+    assert len(runtime_manager.artifacts_for_next_sample) == 1
+
+
+def test_tracking_context_isolates_concurrent_tasks():
+    runtime_manager = RuntimeManager()
+
+    async def handle_request(sample_id: int) -> int:
+        with runtime_manager.tracking_context():
+            runtime_manager.latest_sample = Sample(id=sample_id)
+            await asyncio.sleep(0)
+            await asyncio.to_thread(lambda: None)
+            return runtime_manager.latest_sample.id
+
+    async def run_requests():
+        return await asyncio.gather(*(handle_request(sample_id) for sample_id in range(5)))
+
+    assert asyncio.run(run_requests()) == list(range(5))
+    assert runtime_manager.latest_sample is None
+
+
+def test_tracking_state_is_scoped_to_tasks():
+    runtime_manager = RuntimeManager()
+
+    async def handle_request(sample_id: int) -> tuple:
+        inherited = runtime_manager.latest_sample.id
+        pending = len(runtime_manager.artifacts_for_next_sample)
+        runtime_manager.latest_sample = Sample(id=sample_id)
+        runtime_manager.artifacts_for_next_sample.append(Artifact(name="main", value="{}", hash=str(sample_id)))
+        await asyncio.sleep(0)
+        await asyncio.to_thread(lambda: None)
+        return inherited, pending, runtime_manager.latest_sample.id, len(runtime_manager.artifacts_for_next_sample)
+
+    async def run_requests():
+        runtime_manager.latest_sample = Sample(id=-1)
+        runtime_manager.artifacts_for_next_sample.append(Artifact(name="main", value="{}", hash="main"))
+        results = await asyncio.gather(*(handle_request(sample_id) for sample_id in range(5)))
+        return results, runtime_manager.latest_sample.id, len(runtime_manager.artifacts_for_next_sample)
+
+    results, latest_sample_id, pending = asyncio.run(run_requests())
+
+    assert results == [(-1, 0, sample_id, 1) for sample_id in range(5)]
+    assert latest_sample_id == -1
+    assert pending == 1
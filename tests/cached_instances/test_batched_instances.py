@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from genai_monitor.common.types import SampleStatus
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+calls = []
+
+
+def dummy_batched_func(x: float, y: float, n: int = 1):
+    calls.append(n)
+    return [x + y + random.random() for _ in range(n)]  # noqa: S311
+
+
+def test_batched_generation_fills_all_instances(
+    container, tmp_settings, get_registration_params_for_callable_cached_instances
+):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+
+    registration_params = get_registration_params_for_callable_cached_instances
+    cached_instances = registration_params["max_unique_instances"]
+    registration_params["func"] = dummy_batched_func
+    registration_params["model_output_to_bytes"] = lambda output: str(output[0]).encode()
+    registration_params["bytes_to_model_output"] = lambda databytes: [float(databytes.decode())]
+    registration_params["split_model_output"] = lambda output: [[value] for value in output]
+    registration_params["batch_size_argument"] = "n"
+    registration_params["batch_generation"] = True
+    register_function(**registration_params)
+
+    first_iteration = [dummy_batched_func(1, 2) for _ in range(cached_instances)]
+    second_iteration = [dummy_batched_func(1, 2) for _ in range(cached_instances)]
+
+    assert calls == [cached_instances]
+    assert first_iteration == second_iteration
+    assert len({output[0] for output in first_iteration}) == cached_instances
+    samples = container.db_manager().search(SampleTable)
+    assert sorted(sample.generation_id for sample in samples) == list(range(cached_instances))
+
+
+def test_batched_generation_fails_if_the_output_cannot_be_split(
+    container, tmp_settings, get_registration_params_for_callable_cached_instances
+):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+
+    registration_params = get_registration_params_for_callable_cached_instances
+    registration_params["func"] = dummy_batched_func
+    registration_params["model_output_to_bytes"] = lambda output: str(output[0]).encode()
+    registration_params["bytes_to_model_output"] = lambda databytes: [float(databytes.decode())]
+    registration_params["split_model_output"] = lambda output: [output]
+    registration_params["batch_size_argument"] = "n"
+    registration_params["batch_generation"] = True
+    register_function(**registration_params)
+
+    with pytest.raises(ValueError, match="Expected 3 outputs"):
+        dummy_batched_func(1, 2)
+
+    samples = container.db_manager().search(SampleTable)
+    assert {sample.status for sample in samples} == {SampleStatus.FAILED.value}
@@ -0,0 +1,125 @@
+import asyncio
+import random
+
+import pytest
+
+from genai_monitor.db.schemas.tables import ConditioningTable, SampleTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+calls = []
+
+
+def dummy_rows_func(prompts: list, scale: float = 1.0):
+    calls.append(list(prompts))
+    return [len(prompt) * scale + random.random() for prompt in prompts]  # noqa: S311
+
+
+async def dummy_async_rows_func(prompts: list):
+    calls.append(list(prompts))
+    return [len(prompt) + random.random() for prompt in prompts]  # noqa: S311
+
+
+def register_rows_func(func, registration_params):
+    registration_params["func"] = func
+    registration_params["model_output_to_bytes"] = lambda output: str(output[0]).encode()
+    registration_params["bytes_to_model_output"] = lambda databytes: [float(databytes.decode())]
+    registration_params.setdefault("split_model_output", lambda output: [[value] for value in output])
+    registration_params["merge_model_outputs"] = lambda outputs: [value for output in outputs for value in output]
+    registration_params["row_arguments"] = ["prompts"]
+    register_function(**registration_params)
+
+
+def test_batched_call_runs_only_missing_rows(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    register_rows_func(dummy_rows_func, get_registration_params_for_callable)
+
+    calls.clear()
+    first_output = dummy_rows_func(["a", "bb", "ccc"])
+    second_output = dummy_rows_func(["bb", "dddd", "a"])
+    single_row_output = dummy_rows_func(["ccc"])
+    repeated_rows_output = dummy_rows_func(["eeeee", "a", "eeeee"])
+
+    assert calls == [["a", "bb", "ccc"], ["dddd"], ["eeeee"]]
+    assert second_output[0] == first_output[1]
+    assert second_output[2] == first_output[0]
+    assert single_row_output == [first_output[2]]
+    assert repeated_rows_output[0] == repeated_rows_output[2]
+    assert repeated_rows_output[1] == first_output[0]
+
+    db_manager = container.db_manager()
+    assert len(db_manager.search(ConditioningTable)) == 5
+    assert len(db_manager.search(SampleTable)) == 5
+
+
+def test_batched_call_generates_repeated_rows_once(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    register_rows_func(dummy_rows_func, get_registration_params_for_callable)
+
+    calls.clear()
+    output = dummy_rows_func(["a", "bb", "a", "bb"])
+
+    assert calls == [["a", "bb"]]
+    assert output[0] == output[2]
+    assert output[1] == output[3]
+    assert len(container.db_manager().search(SampleTable)) == 2
+
+
+def test_batched_call_does_not_rerun_rows_that_cannot_be_split(
+    container, tmp_settings, get_registration_params_for_callable
+):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["split_model_output"] = lambda output: (
+        [[value] for value in output] if len(calls) < 2 else []
+    )
+    register_rows_func(dummy_rows_func, get_registration_params_for_callable)
+
+    calls.clear()
+    dummy_rows_func(["a"])
+    with pytest.raises(ValueError, match="Expected 1 outputs"):
+        dummy_rows_func(["a", "b"])
+
+    assert calls == [["a"], ["b"]]
+
+
+def test_batched_call_is_not_decomposed_for_other_arguments(
+    container, tmp_settings, get_registration_params_for_callable
+):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+
+    registration_params = get_registration_params_for_callable
+    registration_params["func"] = dummy_rows_func
+    registration_params["model_output_to_bytes"] = lambda output: str(output).encode()
+    registration_params["bytes_to_model_output"] = lambda databytes: [
+        float(value) for value in databytes.decode().strip("[]").split(", ")
+    ]
+    register_function(**registration_params)
+
+    calls.clear()
+    first_output = dummy_rows_func(["a", "bb"])
+    second_output = dummy_rows_func(["a", "bb"])
+
+    assert calls == [["a", "bb"]]
+    assert first_output == second_output
+
+
+def test_batched_coroutine_call_runs_only_missing_rows(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    register_rows_func(dummy_async_rows_func, get_registration_params_for_callable)
+
+    calls.clear()
+    first_output = asyncio.run(dummy_async_rows_func(["a", "bb"]))
+    second_output = asyncio.run(dummy_async_rows_func(["ccc", "a", "bb"]))
+
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert second_output[1:] == first_output
@@ -1,9 +1,13 @@
 from genai_monitor.database_versioning import (
+    _increment_version_generation,
     get_current_version,
     get_database_version,
     set_database_version,
     set_runtime_version,
 )
+from genai_monitor.db.schemas.tables import ConfigurationTable
+from genai_monitor.static.constants import VERSION_GENERATION_KEY
+from genai_monitor.structures.runtime_manager import RuntimeManager
 from genai_monitor.utils.auto_mode_configuration import load_config
 
 
@@ -32,3 +36,35 @@ def test_version_setting(container, tmp_settings):
     set_database_version(new_db_version, db_manager=db_manager)
     assert get_database_version(db_manager=db_manager) == new_db_version
     assert get_current_version(db_manager=db_manager, runtime_manager=runtime_manager) == new_runtime_version
+
+
+def test_database_version_changes_reach_other_processes(container, tmp_settings):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.database_versioning"])
+    db_manager, runtime_manager = container.db_manager(), container.runtime_manager()
+    other_process_runtime_manager = RuntimeManager(version_check_interval=3600)
+    assert other_process_runtime_manager.get_current_version(db_manager=db_manager) == "test_version"
+
+    set_database_version("changed_version", db_manager=db_manager)
+    assert get_current_version(db_manager=db_manager, runtime_manager=runtime_manager) == "changed_version"
+    assert other_process_runtime_manager.get_current_version(db_manager=db_manager) == "test_version"
+
+    other_process_runtime_manager.version_check_interval = 0
+    assert other_process_runtime_manager.get_current_version(db_manager=db_manager) == "changed_version"
+
+
+def test_version_generation_is_created_and_incremented(container, tmp_settings):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    db_manager = container.db_manager()
+
+    def generation():
+        return [row.value for row in db_manager.search(ConfigurationTable, {"key": VERSION_GENERATION_KEY})]
+
+    before = generation()
+    for _ in range(3):
+        _increment_version_generation(db_manager=db_manager)
+
+    expected_start = int(before[0]) if before else 0
+    assert generation() == [str(expected_start + 3)]
@@ -41,7 +41,7 @@ def setup_database_with_data(db_session):
     db_session.commit()
 
     conditioning1 = ConditioningTable(type_id=conditioning_type1.id, value={"key": "value1"}, hash="value1")
-    conditioning2 = ConditioningTable(type_id=conditioning_type2.id, value={"key": "value2"}, hash="value1")
+    conditioning2 = ConditioningTable(type_id=conditioning_type2.id, value={"key": "value2"}, hash="value2")
     db_session.add_all([conditioning1, conditioning2])
     db_session.commit()
 
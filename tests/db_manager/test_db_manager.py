@@ -1,5 +1,11 @@
+import threading
+
 import pytest
+from sqlalchemy import event
 
+from genai_monitor.common.structures.data import Conditioning, Sample
+from genai_monitor.db.config import SessionManager
+from genai_monitor.db.manager import DBManager
 from genai_monitor.db.schemas.tables import ConditioningTable, ConditioningTypeTable, ModelTable, SampleTable
 
 
@@ -21,6 +27,42 @@ def test_search_without_filters(db_manager, setup_database_with_data):
     assert len(result) == 2
 
 
+def test_get_by_primary_key(db_manager, setup_database_with_data):
+    sample = db_manager.search(SampleTable, {"name": "Sample 1"})[0]
+    assert db_manager.get(SampleTable, sample.id).name == "Sample 1"
+    assert db_manager.get(SampleTable, -1) is None
+
+
+def test_search_columns(db_manager, setup_database_with_data):
+    rows = db_manager.search_columns(SampleTable, columns=["id", "name"], filters={"name": "Sample 1"})
+    assert len(rows) == 1
+    assert rows[0].name == "Sample 1"
+    assert tuple(rows[0]._fields) == ("id", "name")
+
+
+def test_search_columns_as_tuples(db_manager, setup_database_with_data):
+    rows = db_manager.search_columns(SampleTable, columns=["name", "hash"], filters={"name": "Sample 1"}, named=False)
+    assert rows == [("Sample 1", "abc123")]
+
+
+def test_from_row_skips_relationships(db_manager, setup_database_with_data):
+    row = db_manager.search_columns(SampleTable, columns=["id", "name", "hash"], filters={"name": "Sample 1"})[0]
+    sample = Sample.from_row(row)
+    assert (sample.id, sample.name, sample.hash) == (row.id, "Sample 1", "abc123")
+    assert sample.conditioning is None
+
+    conditioning = Conditioning.from_row(db_manager.search(ConditioningTable, {"hash": "value1"})[0])
+    assert conditioning.value == {"key": "value1"}
+    assert conditioning.samples is None
+
+
+def test_from_orm_converts_only_loaded_relationships(db_manager, setup_database_with_data):
+    sample = Sample.from_orm(db_manager.search(SampleTable, {"name": "Sample 1"}, load=["conditioning"])[0])
+
+    assert sample.conditioning.hash == "value1"
+    assert sample.artifacts == []
+
+
 def test_update_with_instance(db_manager, db_session, setup_database_with_data):
     instance = db_session.query(SampleTable).filter_by(name="Sample 1").first()
     db_session.expunge(instance)
@@ -38,6 +80,17 @@ def test_update_with_model_and_filters(db_manager, db_session, setup_database_wi
     assert updated_instance is not None
 
 
+def test_update_without_loading_relationships(db_manager, session_manager, setup_database_with_data):
+    statements = []
+    event.listen(session_manager._engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    updated = db_manager.update(model=SampleTable, filters={"name": "Sample 1"}, values={"hash": "a"}, load="none")
+
+    assert [sample.hash for sample in updated] == ["a"]
+    assert updated[0].conditioning is None
+    assert len([statement for statement in statements if statement.startswith("SELECT")]) == 1
+
+
 def test_update_raises_value_error_without_instance_or_model(db_manager):
     with pytest.raises(ValueError):  # noqa: PT011
         db_manager.update(filters={"name": "Sample 1"}, values={"name": "Updated Sample"})
@@ -68,3 +121,190 @@ def test_join_search_without_filters(db_manager, setup_database_with_data):
         on_condition=on_condition,
     )
     assert len(results) == 2
+
+
+def test_unit_of_work_shares_session(db_manager, session_manager, setup_database_with_data):
+    with db_manager.unit_of_work() as session:
+        with session_manager.session_scope() as inner_session:
+            assert inner_session is session
+
+        db_manager.save(ConditioningTypeTable(type="Type C"))
+        assert len(db_manager.search(ConditioningTypeTable, {"type": "Type C"})) == 1
+
+    assert len(db_manager.search(ConditioningTypeTable, {"type": "Type C"})) == 1
+
+
+def test_unit_of_work_rolls_back_on_error(db_manager, setup_database_with_data):
+    def failing_unit_of_work():
+        with db_manager.unit_of_work():
+            db_manager.save(ConditioningTypeTable(type="Type D"))
+            db_manager.update(model=SampleTable, filters={"name": "Sample 1"}, values={"name": "Rolled back"})
+            raise RuntimeError("Failure within the unit of work")
+
+    with pytest.raises(RuntimeError):
+        failing_unit_of_work()
+
+    assert not db_manager.search(ConditioningTypeTable, {"type": "Type D"})
+    assert not db_manager.search(SampleTable, {"name": "Rolled back"})
+
+
+def test_update_where_is_compare_and_swap(db_manager, setup_database_with_data):
+    filters = {"name": "Sample 1", "hash": "abc123"}
+    assert db_manager.update_where(SampleTable, filters=filters, values={"hash": "a"}) == 1
+    assert db_manager.update_where(SampleTable, filters=filters, values={"hash": "b"}) == 0
+    assert db_manager.search(SampleTable, {"name": "Sample 1"})[0].hash == "a"
+
+
+def test_upsert_returns_existing_record(db_manager, setup_database_with_data):
+    existing = db_manager.search(ConditioningTable, {"hash": "value1"})[0]
+
+    upserted = db_manager.upsert(ConditioningTable(value={"key": "other"}, hash="value1"), keys=["hash"])
+
+    assert upserted.id == existing.id
+    assert upserted.value == {"key": "value1"}
+    assert len(db_manager.search(ConditioningTable, {"hash": "value1"})) == 1
+
+
+def test_upsert_inserts_missing_record(db_manager, setup_database_with_data):
+    upserted = db_manager.upsert(ModelTable(hash="new_hash", model_class="ModelClass"), keys=["hash", "model_class"])
+
+    assert upserted.id is not None
+    assert db_manager.search(ModelTable, {"hash": "new_hash"})[0].id == upserted.id
+
+
+def test_concurrent_upserts_create_a_single_record(tmp_path):
+    db_manager = DBManager(session_manager=SessionManager(database_url=f"sqlite:///{tmp_path / 'upsert.db'}"))
+    ids = []
+
+    def upsert():
+        ids.append(db_manager.upsert(ConditioningTable(value={}, hash="shared"), keys=["hash"]).id)
+
+    threads = [threading.Thread(target=upsert) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(ids)) == 1
+    assert len(db_manager.search(ConditioningTable, {"hash": "shared"})) == 1
+
+
+def test_bulk_save_returns_ids_in_order(db_manager, setup_database_with_data):
+    rows = [{"value": {"index": index}, "hash": f"bulk{index}"} for index in range(5)]
+
+    saved = db_manager.bulk_save(ConditioningTable, rows, returning=["id", "hash"])
+
+    assert [row.hash for row in saved] == [f"bulk{index}" for index in range(5)]
+    assert {row.id for row in saved} == {
+        conditioning.id for conditioning in db_manager.search(ConditioningTable, {"hash": [row.hash for row in saved]})
+    }
+
+
+def test_bulk_save_returns_ids_without_returning_support(db_manager, setup_database_with_data, monkeypatch):
+    with db_manager.session_manager.session_scope() as session:
+        dialect = session.get_bind().dialect
+    # A database without INSERT ... RETURNING
+    monkeypatch.setattr(dialect, "insert_returning", False)
+    monkeypatch.setattr(dialect, "insert_executemany_returning", False)
+    monkeypatch.setattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False)
+    rows = [{"value": {"index": index}, "hash": f"orm{index}"} for index in range(3)]
+
+    saved = db_manager.bulk_save(ConditioningTable, rows, returning=["id", "hash"])
+
+    assert [saved_hash for _, saved_hash in saved] == [f"orm{index}" for index in range(3)]
+    assert {saved_id for saved_id, _ in saved} == {
+        conditioning.id
+        for conditioning in db_manager.search(ConditioningTable, {"hash": [row["hash"] for row in rows]})
+    }
+
+
+def test_bulk_upsert_keeps_or_updates_existing_records(db_manager, setup_database_with_data):
+    existing = db_manager.search(ConditioningTable, {"hash": "value1"})[0]
+    rows = [ConditioningTable(value={"key": "other"}, hash="value1"), ConditioningTable(value={}, hash="new")]
+
+    kept = db_manager.bulk_upsert(ConditioningTable, rows, keys=["hash"], returning=["id"])
+    assert kept[0].id == existing.id
+    assert db_manager.search(ConditioningTable, {"hash": "value1"})[0].value == {"key": "value1"}
+
+    updated = db_manager.bulk_upsert(ConditioningTable, rows, keys=["hash"], update_columns=["value"], returning=["id"])
+    assert [row.id for row in updated] == [row.id for row in kept]
+    assert db_manager.search(ConditioningTable, {"hash": "value1"})[0].value == {"key": "other"}
+    assert len(db_manager.search(ConditioningTable, {"hash": "new"})) == 1
+
+
+def test_bulk_update_sets_values_by_key(db_manager, setup_database_with_data):
+    updated_count = db_manager.bulk_update(
+        SampleTable,
+        [{"hash": "abc123", "name": "Renamed 1"}, {"hash": "def456", "name": "Renamed 2"}, {"hash": "x", "name": "-"}],
+        key="hash",
+    )
+
+    assert updated_count == 2
+    assert sorted(sample.name for sample in db_manager.search(SampleTable)) == ["Renamed 1", "Renamed 2"]
+
+
+def test_search_avoids_a_query_per_record(db_manager, session_manager, setup_database_with_data):
+    statements = []
+    event.listen(session_manager._engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    samples = db_manager.search(SampleTable)
+    queries_for_two_records = len(statements)
+    conditioning_ids = [sample.conditioning_id for sample in samples]
+    db_manager.bulk_save(
+        SampleTable,
+        [
+            {"conditioning_id": conditioning_ids[index % 2], "hash": f"s{index}", "status": "complete", "version": "1"}
+            for index in range(10)
+        ],
+    )
+    statements.clear()
+
+    samples = db_manager.search(SampleTable)
+
+    assert len(samples) == 12
+    assert len(statements) == queries_for_two_records
+    assert {sample.conditioning.hash for sample in samples} == {"value1", "value2"}
+
+
+@pytest.mark.parametrize("load", ["selectin", "joined", ["conditioning"]])
+def test_search_loads_requested_relationships(db_manager, setup_database_with_data, load):
+    sample = db_manager.search(SampleTable, {"name": "Sample 1"}, load=load)[0]
+
+    assert sample.conditioning.hash == "value1"
+    assert sample.artifacts == []
+
+
+def test_search_without_loading_relationships(db_manager, setup_database_with_data):
+    sample = db_manager.search(SampleTable, {"name": "Sample 1"}, load="none")[0]
+
+    assert sample.conditioning is None
+    assert sample.conditioning_id is not None
+
+
+def test_search_rejects_unknown_loading(db_manager, setup_database_with_data):
+    with pytest.raises(ValueError, match="Unknown relationship loading"):
+        db_manager.search(SampleTable, load="lazy")
+
+
+def test_iter_search_pages_through_all_records(db_manager, setup_database_with_data):
+    db_manager.bulk_save(ConditioningTable, [{"value": {}, "hash": f"iter{index}"} for index in range(7)])
+    expected_ids = sorted(conditioning.id for conditioning in db_manager.search(ConditioningTable, load="none"))
+
+    ids = [conditioning.id for conditioning in db_manager.iter_search(ConditioningTable, batch_size=3, load="none")]
+
+    assert ids == expected_ids
+
+
+def test_iter_search_starts_after_the_given_key(db_manager, setup_database_with_data):
+    samples = db_manager.search(SampleTable, load="none")
+    first_id = min(sample.id for sample in samples)
+
+    remaining = list(db_manager.iter_search(SampleTable, {"version": "test"}, batch_size=1, after=first_id))
+
+    assert [sample.name for sample in remaining] == ["Sample 2"]
+    assert remaining[0].conditioning.hash == "value2"
+
+
+def test_iter_search_rejects_empty_batches(db_manager, setup_database_with_data):
+    with pytest.raises(ValueError, match="The batch size must be positive"):
+        next(db_manager.iter_search(SampleTable, batch_size=0))
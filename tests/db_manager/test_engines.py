@@ -0,0 +1,109 @@
+import multiprocessing
+
+import pytest
+from sqlalchemy import text
+
+from genai_monitor.db import dispose_engines, engines
+from genai_monitor.db.config import SessionManager
+from genai_monitor.db.manager import DBManager
+from genai_monitor.db.schemas.tables import ConfigurationTable
+from genai_monitor.utils.auto_mode_configuration import DEFAULT_SETTINGS, load_config
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    yield f"sqlite:///{tmp_path / 'shared.db'}"
+    dispose_engines()
+
+
+def _query_in_forked_process(session_manager, pooled_connections):
+    # The pool inherited from the parent is reset, so the connections of the parent are not reused
+    assert session_manager._engine.pool.checkedin() == 0 < pooled_connections
+    with session_manager.session_scope() as session:
+        assert session.execute(text("SELECT count(*) FROM sample")).scalar() == 0
+
+
+def test_session_managers_share_the_engine_of_a_database(database_url):
+    first = SessionManager(database_url=database_url)
+    second = SessionManager(database_url=database_url)
+
+    assert first._engine is second._engine
+
+
+def test_session_managers_with_different_settings_do_not_share_engines(database_url):
+    default = SessionManager(database_url=database_url)
+    pooled = SessionManager(database_url=database_url, pool_settings={"pool_size": 2, "pool_pre_ping": True})
+
+    assert default._engine is not pooled._engine
+    assert pooled._engine.pool.size() == 2
+    assert SessionManager(database_url=database_url, pool_settings={"pool_size": 2, "pool_pre_ping": True})._engine is (
+        pooled._engine
+    )
+
+
+def test_in_memory_databases_are_not_shared():
+    assert SessionManager(database_url="sqlite:///:memory:")._engine is not (
+        SessionManager(database_url="sqlite:///:memory:")._engine
+    )
+
+
+def test_unsupported_pool_setting_is_rejected(database_url):
+    with pytest.raises(ValueError, match="Unsupported connection pool settings: echo"):
+        SessionManager(database_url=database_url, pool_settings={"poolclass": None, "echo": True})
+
+
+def test_session_managers_sharing_an_engine_share_units_of_work(database_url):
+    first = SessionManager(database_url=database_url)
+    second = SessionManager(database_url=database_url)
+
+    with first.unit_of_work() as session, second.session_scope() as nested_session:
+        assert nested_session is session
+
+
+def test_dispose_engines_creates_new_engines(database_url):
+    engine = SessionManager(database_url=database_url)._engine
+
+    dispose_engines()
+
+    assert SessionManager(database_url=database_url)._engine is not engine
+
+
+@pytest.mark.parametrize(
+    ("environment", "busy_timeout"), [({"GENAI_MONITOR_SQLITE_BUSY_TIMEOUT": "1000"}, 1000), ({}, 2000)]
+)
+def test_loaded_configuration_uses_the_engine_of_the_database(
+    container, database_url, tmp_settings, monkeypatch, environment, busy_timeout
+):
+    sqlite_settings = {key: setting for key, setting in DEFAULT_SETTINGS.items() if key.startswith("db.sqlite.")}
+    settings = {**tmp_settings, **sqlite_settings, "db.url": {"value": database_url, "description": ""}}
+    load_config(database_url, settings)
+    DBManager(session_manager=SessionManager(database_url=database_url)).update_where(
+        ConfigurationTable, filters={"key": "db.sqlite.busy_timeout"}, values={"value": "2000"}
+    )
+    for name, value in environment.items():
+        monkeypatch.setenv(name, value)
+    dispose_engines()
+
+    config = load_config(database_url, settings)
+    engine_count = len(engines._engines)
+    container.config.from_dict(config.model_dump())
+
+    assert config.db.sqlite.busy_timeout == busy_timeout
+    with container.session_manager().session_scope() as session:
+        assert session.execute(text("PRAGMA busy_timeout")).scalar() == busy_timeout
+    assert len(engines._engines) == engine_count
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="Requires fork")
+def test_forked_process_does_not_reuse_pooled_connections(database_url):
+    session_manager = SessionManager(database_url=database_url)
+    with session_manager.session_scope() as session:
+        session.execute(text("SELECT 1"))
+
+    process = multiprocessing.get_context("fork").Process(
+        target=_query_in_forked_process, args=(session_manager, session_manager._engine.pool.checkedin())
+    )
+    process.start()
+    process.join(timeout=60)
+
+    assert process.exitcode == 0
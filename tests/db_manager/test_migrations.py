@@ -0,0 +1,100 @@
+from sqlalchemy import create_engine, inspect, text
+
+from genai_monitor.db.config import SessionManager
+from genai_monitor.db.manager import DBManager
+from genai_monitor.db.migrations import find_missing_indexes, migrate_db
+from genai_monitor.db.schemas.tables import ConditioningTable
+
+LEGACY_SAMPLE_TABLE = """
+CREATE TABLE sample (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model_id INTEGER,
+    conditioning_id INTEGER,
+    user_id INTEGER,
+    name VARCHAR,
+    hash VARCHAR NOT NULL,
+    meta JSON,
+    generation_id INTEGER,
+    status VARCHAR NOT NULL,
+    version VARCHAR NOT NULL
+)
+"""
+
+LEGACY_CONDITIONING_TABLE = """
+CREATE TABLE conditioning (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type_id VARCHAR,
+    value JSON NOT NULL,
+    hash VARCHAR NOT NULL,
+    value_metadata JSON
+)
+"""
+
+
+def _create_legacy_db(tmp_path, conditioning_hashes=()):
+    database_url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(text(LEGACY_SAMPLE_TABLE))
+        connection.execute(text("INSERT INTO sample (hash, status, version) VALUES ('abc123', 'complete', '1.0.0')"))
+        connection.execute(text(LEGACY_CONDITIONING_TABLE))
+        for conditioning_hash in conditioning_hashes:
+            connection.execute(
+                text("INSERT INTO conditioning (value, hash) VALUES ('{}', :hash)"), {"hash": conditioning_hash}
+            )
+    engine.dispose()
+    return database_url
+
+
+def test_new_database_has_all_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    SessionManager(database_url=str(engine.url))
+
+    assert find_missing_indexes(engine) == []
+
+
+def test_legacy_database_lacks_indexes(tmp_path):
+    database_url = _create_legacy_db(tmp_path)
+    engine = create_engine(database_url)
+    SessionManager(database_url=database_url)
+
+    assert {"ix_sample_slot", "ix_sample_hash", "ix_sample_status_lease"} <= set(find_missing_indexes(engine))
+    assert {"lease_owner", "lease_expires_at", "heartbeat_at"} <= {
+        column["name"] for column in inspect(engine).get_columns("sample")
+    }
+
+
+def test_migrate_db_creates_indexes_in_place(tmp_path):
+    database_url = _create_legacy_db(tmp_path)
+
+    migrated = migrate_db(database_url)
+
+    engine = create_engine(database_url)
+    assert "sample.lease_owner" in migrated
+    assert "ix_sample_slot" in migrated
+    assert find_missing_indexes(engine) == []
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT hash FROM sample")).scalars().all() == ["abc123"]
+    assert migrate_db(database_url) == []
+
+
+def test_legacy_database_gets_unique_indexes_on_startup(tmp_path):
+    database_url = _create_legacy_db(tmp_path)
+    db_manager = DBManager(session_manager=SessionManager(database_url=database_url))
+
+    assert "uq_conditioning_hash" not in find_missing_indexes(create_engine(database_url))
+    first = db_manager.upsert(ConditioningTable(value={}, hash="abc"), keys=["hash"])
+    second = db_manager.upsert(ConditioningTable(value={}, hash="abc"), keys=["hash"])
+    assert first.id == second.id
+
+
+def test_upsert_falls_back_without_unique_index(tmp_path):
+    # The duplicates recorded by an earlier version prevent the unique index from being created
+    database_url = _create_legacy_db(tmp_path, conditioning_hashes=["dup", "dup"])
+    db_manager = DBManager(session_manager=SessionManager(database_url=database_url))
+
+    assert "uq_conditioning_hash" in find_missing_indexes(create_engine(database_url))
+    stored = db_manager.upsert(ConditioningTable(value={}, hash="new"), keys=["hash"])
+    assert db_manager.upsert(ConditioningTable(value={}, hash="new"), keys=["hash"]).id == stored.id
+    assert db_manager.upsert(ConditioningTable(value={}, hash="dup"), keys=["hash"]).id == 1
+    assert len(db_manager.search(ConditioningTable)) == 3
@@ -0,0 +1,100 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from genai_monitor.db.config import SessionManager
+from genai_monitor.db.manager import DBManager
+from genai_monitor.db.schemas.tables import ConditioningTable
+
+NUM_PROCESSES = 4
+WRITES_PER_PROCESS = 25
+
+
+def _pragma(session_manager, name):
+    with session_manager.session_scope() as session:
+        return session.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def _write_conditionings(database_url, worker):
+    db_manager = DBManager(session_manager=SessionManager(database_url=database_url))
+    for index in range(WRITES_PER_PROCESS):
+        with db_manager.unit_of_work():
+            db_manager.upsert(ConditioningTable(value={}, hash=f"{worker}-{index}"), keys=["hash"])
+            db_manager.upsert(ConditioningTable(value={}, hash="shared"), keys=["hash"])
+
+
+def test_sqlite_profile_is_applied(tmp_path):
+    session_manager = SessionManager(database_url=f"sqlite:///{tmp_path / 'profile.db'}")
+
+    assert _pragma(session_manager, "journal_mode") == "wal"
+    assert _pragma(session_manager, "busy_timeout") == 5000
+    assert _pragma(session_manager, "synchronous") == 1  # NORMAL
+    assert _pragma(session_manager, "temp_store") == 2  # MEMORY
+
+
+def test_sqlite_pragmas_can_be_overridden(tmp_path):
+    session_manager = SessionManager(
+        database_url=f"sqlite:///{tmp_path / 'profile.db'}", sqlite_pragmas={"journal_mode": None, "busy_timeout": 100}
+    )
+
+    assert _pragma(session_manager, "journal_mode") == "delete"
+    assert _pragma(session_manager, "busy_timeout") == 100
+
+
+def test_invalid_sqlite_pragma_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Invalid SQLite pragma synchronous"):
+        SessionManager(database_url=f"sqlite:///{tmp_path / 'profile.db'}", sqlite_pragmas={"synchronous": "off; --"})
+
+
+def _can_take_write_lock(database_path):
+    connection = sqlite3.connect(database_path, timeout=0, isolation_level=None)
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute("ROLLBACK")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+def test_immediate_unit_of_work_takes_write_lock_before_reading(tmp_path):
+    database_path = tmp_path / "immediate.db"
+    db_manager = DBManager(session_manager=SessionManager(database_url=f"sqlite:///{database_path}"))
+
+    with db_manager.unit_of_work():
+        db_manager.search(ConditioningTable)
+        assert _can_take_write_lock(database_path)
+
+    with db_manager.unit_of_work(immediate=True):
+        assert not _can_take_write_lock(database_path)
+        db_manager.search(ConditioningTable)
+        db_manager.upsert(ConditioningTable(value={}, hash="immediate"), keys=["hash"])
+
+    assert _can_take_write_lock(database_path)
+    assert len(db_manager.search(ConditioningTable, {"hash": "immediate"})) == 1
+
+
+def test_concurrent_writer_processes(tmp_path):
+    """Several processes writing to the same SQLite database in short transactions all succeed.
+
+    Without WAL journaling and a busy timeout, the writers fail with `database is locked` errors as soon as their
+    transactions overlap.
+    """
+    database_url = f"sqlite:///{tmp_path / 'shared.db'}"
+    SessionManager(database_url=database_url)
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_write_conditionings, args=(database_url, worker)) for worker in range(NUM_PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+
+    assert [process.exitcode for process in processes] == [0] * NUM_PROCESSES
+    db_manager = DBManager(session_manager=SessionManager(database_url=database_url))
+    assert len(db_manager.search(ConditioningTable)) == NUM_PROCESSES * WRITES_PER_PROCESS + 1
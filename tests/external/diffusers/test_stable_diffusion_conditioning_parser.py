@@ -79,3 +79,22 @@ def test_parse_func_arguments_included_given_fields(stable_diffusion_conditionin
     assert result["crops_coords_top_left"] == (0, 0)
     assert result["negative_crops_coords_top_left"] == (0, 0)
     assert result["callback_on_step_end_tensor_inputs"] == ["latents"]
+
+
+def test_prompt_lists_are_split_into_single_prompt_conditionings(stable_diffusion_conditioning_parser):
+    def pipeline(prompt=None, negative_prompt=None, num_inference_steps=50):
+        pass
+
+    rows = stable_diffusion_conditioning_parser.split_rows(pipeline, ["a cat", "a dog"], negative_prompt="blurry")
+    assert rows == [{"prompt": "a cat"}, {"prompt": "a dog"}]
+
+    row_args, row_kwargs = stable_diffusion_conditioning_parser.replace_call_arguments(
+        pipeline, (["a cat", "a dog"],), {"negative_prompt": "blurry"}, rows[1]
+    )
+    row_conditioning = stable_diffusion_conditioning_parser.parse_conditioning(pipeline, *row_args, **row_kwargs)
+    single_conditioning = stable_diffusion_conditioning_parser.parse_conditioning(
+        pipeline, prompt="a dog", negative_prompt="blurry"
+    )
+    assert row_conditioning.hash == single_conditioning.hash
+
+    assert stable_diffusion_conditioning_parser.split_rows(pipeline, "a cat") is None
@@ -65,3 +65,9 @@ def test_litellm_output_parser(llmlite_output_parser, llmlite_completion_respons
     llmlite_completion_response_dict = llmlite_completion_response.to_dict()
     for key in llmlite_completion_response.to_dict():
         assert recreated_output_dict[key] == llmlite_completion_response_dict[key]
+
+
+def test_litellm_stream_model_output_roundtrip(llmlite_output_parser, llmlite_completion_response):
+    chunks = llmlite_output_parser.stream_model_output(llmlite_completion_response, chunk_size=4)
+    assembled_output = llmlite_output_parser.assemble_stream(chunks)
+    assert assembled_output.choices[0].message.content == llmlite_completion_response.choices[0].message.content
@@ -93,3 +93,17 @@ def test_unsupported_model_output_type(openai_output_parser: OpenAIChatOutputPar
     sample = Sample(data=data)
     with pytest.raises(expected_exception=TypeError):
         openai_output_parser.get_model_output_from_sample(sample=sample)
+
+
+def test_stream_model_output_roundtrip(
+    openai_output_parser: OpenAIChatOutputParser, parametrized_completion: Union[Completion, ChatCompletion]
+):
+    chunks = openai_output_parser.stream_model_output(parametrized_completion, chunk_size=4)
+    assert len(chunks) > 2
+
+    assembled_output = openai_output_parser.assemble_stream(chunks)
+    assert isinstance(assembled_output, type(parametrized_completion))
+    assert openai_output_parser.model_output_to_base_type(
+        assembled_output
+    ) == openai_output_parser.model_output_to_base_type(parametrized_completion)
+    assert assembled_output.usage == parametrized_completion.usage
@@ -0,0 +1,72 @@
+import torch
+from transformers import GenerationConfig
+
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.registration.api import register_inference_method
+from genai_monitor.structures.conditioning_parsers.transformers_text_generation import (
+    TransformersTextGenerationConditioningParser,
+)
+from genai_monitor.structures.output_parsers.transformers_text_generation import TransformersTextGenerationParser
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+calls = []
+
+
+class DummyGenerationModel:
+    def __init__(self):
+        self.generation_config = GenerationConfig(eos_token_id=2)
+
+    def generate(self, input_ids, attention_mask=None, **kwargs):
+        calls.append((input_ids.tolist(), attention_mask.tolist()))
+        # The smaller the batch, the more tokens are generated, so that the outputs of separate calls are ragged
+        new_tokens = torch.randint(3, 100, (input_ids.size(0), 4 - input_ids.size(0)))
+        return torch.cat([input_ids, new_tokens], dim=1)
+
+
+def register_generation_model(container, tmp_settings):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    register_inference_method(
+        inference_method=DummyGenerationModel.generate,
+        conditioning_parser=TransformersTextGenerationConditioningParser(),
+        output_parser=TransformersTextGenerationParser(),
+        hashing_function=lambda model: "dummy-generation-model",
+    )
+
+
+def test_transformers_batched_call_runs_only_missing_rows(container, tmp_settings):
+    register_generation_model(container, tmp_settings)
+    model = DummyGenerationModel()
+
+    calls.clear()
+    first_output = model.generate(
+        input_ids=torch.tensor([[5, 6, 7], [0, 8, 9]]), attention_mask=torch.tensor([[1, 1, 1], [0, 1, 1]])
+    )
+    # The prompt [8, 9] is padded differently, but gets the same conditioning
+    second_output = model.generate(
+        input_ids=torch.tensor([[0, 0, 8, 9], [10, 11, 12, 13]]),
+        attention_mask=torch.tensor([[0, 0, 1, 1], [1, 1, 1, 1]]),
+    )
+
+    assert calls == [([[5, 6, 7], [0, 8, 9]], [[1, 1, 1], [0, 1, 1]]), ([[10, 11, 12, 13]], [[1, 1, 1, 1]])]
+    assert first_output.shape == (2, 5)
+    assert second_output.shape == (2, 7)
+    assert torch.equal(second_output[0, :5], first_output[1])
+    assert second_output[0, 5:].tolist() == [2, 2]
+    assert second_output[1, :4].tolist() == [10, 11, 12, 13]
+    assert len(container.db_manager().search(SampleTable)) == 3
+
+
+def test_transformers_call_is_not_decomposed_without_tensor_outputs(container, tmp_settings):
+    register_generation_model(container, tmp_settings)
+    model = DummyGenerationModel()
+
+    calls.clear()
+    input_ids, attention_mask = torch.tensor([[5, 6], [8, 9]]), torch.tensor([[1, 1], [1, 1]])
+    first_output = model.generate(input_ids=input_ids, attention_mask=attention_mask, return_dict_in_generate=True)
+    second_output = model.generate(input_ids=input_ids, attention_mask=attention_mask, return_dict_in_generate=True)
+
+    assert calls == [([[5, 6], [8, 9]], [[1, 1], [1, 1]])]
+    assert torch.equal(first_output, second_output)
+    assert len(container.db_manager().search(SampleTable)) == 1
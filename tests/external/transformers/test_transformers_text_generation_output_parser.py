@@ -26,3 +26,22 @@ def test_bidirectional_conversion(
         assert torch.equal(model_output, reconstructed_output), "Tensor outputs do not match"
     else:
         assert model_output == reconstructed_output, "Dictionary outputs do not match"
+
+
+def test_split_and_merge_generated_sequences(parser: TransformersTextGenerationParser):
+    model_output = torch.tensor([[1, 2, 3], [4, 5, 6]])
+
+    rows = parser.split_model_output(model_output)
+
+    assert [row.tolist() for row in rows] == [[[1, 2, 3]], [[4, 5, 6]]]
+    assert torch.equal(parser.merge_model_outputs(rows[::-1]), torch.tensor([[4, 5, 6], [1, 2, 3]]))
+
+
+def test_merge_pads_sequences_of_different_lengths(parser: TransformersTextGenerationParser):
+    model_outputs = [torch.tensor([[1, 2, 3]]), torch.tensor([[4]])]
+
+    with pytest.raises(ValueError, match="different lengths"):
+        parser.merge_model_outputs(model_outputs)
+
+    parser.pad_token_id = 0
+    assert torch.equal(parser.merge_model_outputs(model_outputs), torch.tensor([[1, 2, 3], [4, 0, 0]]))
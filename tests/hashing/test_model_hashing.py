@@ -1,4 +1,8 @@
-from genai_monitor.utils.model_hashing import default_model_hashing_function
+import hashlib
+
+import torch
+
+from genai_monitor.utils.model_hashing import default_model_hashing_function, memoize_model_hash
 from tests.conftest import DummyPytorchModel
 
 
@@ -6,3 +10,44 @@ def test_pytorch_model_hashing():
     model = DummyPytorchModel()
     model_hash = default_model_hashing_function(model)
     assert isinstance(model_hash, str)
+
+
+def test_memoized_model_hash_recomputes_only_on_weight_changes():
+    calls = []
+
+    def hash_weights(model: torch.nn.Module) -> str:
+        calls.append(type(model).__name__)
+        hasher = hashlib.sha256()
+        for param in model.state_dict().values():
+            hasher.update(param.detach().cpu().numpy().tobytes())
+        return hasher.hexdigest()
+
+    memoized_hash = memoize_model_hash(hash_weights)
+    model = DummyPytorchModel()
+
+    initial_hash = memoized_hash(model)
+    assert memoized_hash(model) == initial_hash
+    assert len(calls) == 1
+
+    with torch.no_grad():
+        model.fc.weight.add_(1.0)
+    updated_hash = memoized_hash(model)
+    assert updated_hash != initial_hash
+    assert len(calls) == 2
+
+    model.load_state_dict(DummyPytorchModel().state_dict())
+    assert memoized_hash(model) != updated_hash
+    assert len(calls) == 3
+
+    model.to(torch.float64)
+    memoized_hash(model)
+    memoized_hash(model)
+    assert len(calls) == 4
+
+    other_model = DummyPytorchModel()
+    memoized_hash(other_model)
+    assert len(calls) == 5
+    assert memoized_hash.cache_info()["size"] == 2
+
+    del other_model
+    assert memoized_hash.cache_info()["size"] == 1
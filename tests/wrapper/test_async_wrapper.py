@@ -0,0 +1,52 @@
+import asyncio
+import random
+
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.injectors.wrapper import AsyncFunctionWrapper, AsyncMethodWrapper
+from genai_monitor.registration.api import register_class, register_function
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+
+async def dummy_async_func(x: float, y: float) -> float:
+    await asyncio.sleep(0)
+    return x + y + random.random()  # noqa: S311
+
+
+class DummyAsyncClass:
+    async def dummy_method(self, x: int, y: int, z: int) -> float:
+        await asyncio.sleep(0)
+        return x + y + z + random.random()  # noqa: S311
+
+
+def test_async_function_registration(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_async_func
+    register_function(**get_registration_params_for_callable)
+
+    assert any(isinstance(wrapper, AsyncFunctionWrapper) for wrapper in container.wrapper_registry()._registry.values())
+
+    async def run_inferences():
+        first = await dummy_async_func(1, 2)
+        concurrent = await asyncio.gather(*(dummy_async_func(1, 2) for _ in range(3)))
+        return first, concurrent
+
+    first_output, concurrent_outputs = asyncio.run(run_inferences())
+    assert all(output == first_output for output in concurrent_outputs)
+    assert len(container.db_manager().search(SampleTable)) == 1
+
+
+def test_async_method_registration(container, tmp_settings, get_registration_params_for_class):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_class["cls"] = DummyAsyncClass
+    register_class(**get_registration_params_for_class)
+
+    assert any(isinstance(wrapper, AsyncMethodWrapper) for wrapper in container.wrapper_registry()._registry.values())
+
+    model = DummyAsyncClass()
+    first_output = asyncio.run(model.dummy_method(1, 2, 3))
+    second_output = asyncio.run(model.dummy_method(1, 2, 3))
+    assert first_output == second_output
@@ -0,0 +1,70 @@
+import random
+import threading
+import time
+
+from genai_monitor.registration.api import register_function
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+started = threading.Event()
+release = threading.Event()
+
+
+def dummy_slow_func(x: float, y: float):
+    started.set()
+    release.wait(timeout=10)
+    return x + y + random.random()  # noqa: S311
+
+
+def _register(container, tmp_settings, registration_params):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    registration_params["func"] = dummy_slow_func
+    register_function(**registration_params)
+
+
+def _call_in_thread(outputs, key):
+    thread = threading.Thread(target=lambda: outputs.update({key: (dummy_slow_func(1, 2), time.monotonic())}))
+    thread.start()
+    return thread
+
+
+def test_waiting_call_is_woken_up_on_completion(container, tmp_settings, get_registration_params_for_callable):
+    started.clear()
+    release.clear()
+    _register(container, tmp_settings, get_registration_params_for_callable)
+
+    outputs = {}
+    producer = _call_in_thread(outputs, "producer")
+    assert started.wait(timeout=10)
+    consumer = _call_in_thread(outputs, "consumer")
+
+    time.sleep(1)
+    released_at = time.monotonic()
+    release.set()
+    producer.join(timeout=10)
+    consumer.join(timeout=10)
+
+    assert outputs["consumer"][0] == outputs["producer"][0]
+    assert outputs["consumer"][1] - released_at < 0.5
+
+
+def test_waiting_call_regenerates_after_timeout(container, tmp_settings, get_registration_params_for_callable):
+    started.clear()
+    release.clear()
+    container.completion_notifier().timeout = 0.2
+    _register(container, tmp_settings, get_registration_params_for_callable)
+
+    outputs = {}
+    producer = _call_in_thread(outputs, "producer")
+    assert started.wait(timeout=10)
+    consumer_done = threading.Event()
+    consumer = threading.Thread(target=lambda: (outputs.update(consumer=dummy_slow_func(1, 2)), consumer_done.set()))
+    consumer.start()
+    time.sleep(0.5)
+    release.set()
+    producer.join(timeout=10)
+    consumer.join(timeout=10)
+
+    assert consumer_done.is_set()
+    assert outputs["consumer"] != outputs["producer"][0]
@@ -0,0 +1,44 @@
+import random
+
+from genai_monitor.db.schemas.tables import ConditioningTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.structures.cache import LRUCache
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+
+def dummy_cached_conditioning_func(x: float, y: float):
+    return x + y + random.random()  # noqa: S311
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 2, "maxsize": 2}
+
+
+def test_conditioning_cache_skips_lookups(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_cached_conditioning_func
+    register_function(**get_registration_params_for_callable)
+    conditioning_cache = container.conditioning_cache()
+
+    first_output = dummy_cached_conditioning_func(1, 2)
+    assert conditioning_cache.stats()["misses"] == 1
+
+    second_output = dummy_cached_conditioning_func(1, 2)
+    assert conditioning_cache.stats()["hits"] == 1
+    assert first_output == second_output
+
+    dummy_cached_conditioning_func(3, 4)
+    assert conditioning_cache.stats()["misses"] == 2
+    assert len(conditioning_cache) == 2
+    assert len(container.db_manager().search(ConditioningTable)) == 2
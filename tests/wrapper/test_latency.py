@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.structures.latency import LatencyHistogram, LatencyRecorder
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+
+def dummy_timed_func(x: float, y: float):
+    return x + y + random.random()  # noqa: S311
+
+
+def test_latency_histogram_quantiles_within_relative_error():
+    histogram = LatencyHistogram()
+    for millis in range(1, 101):
+        histogram.record(millis / 1000)
+
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["p50"] == pytest.approx(0.050, rel=0.05)
+    assert summary["p95"] == pytest.approx(0.095, rel=0.05)
+    assert summary["p99"] == pytest.approx(0.099, rel=0.05)
+    assert summary["max"] == 0.1
+
+
+def test_disabled_latency_recorder_records_nothing():
+    recorder = LatencyRecorder(enabled=False)
+    with recorder.measure("stage"):
+        pass
+    recorder.record("stage", 1.0)
+    assert recorder.snapshot() == {}
+
+
+def test_tracked_call_stages_are_timed(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_timed_func
+    register_function(**get_registration_params_for_callable)
+
+    dummy_timed_func(1, 2)
+    dummy_timed_func(1, 2)
+
+    snapshot = container.latency_recorder().snapshot()
+    assert snapshot["model_execution"]["count"] == 1
+    assert snapshot["parse_conditioning"]["count"] == 2
+    for stage in ["model_hashing", "resolve_conditioning", "get_generations", "output_serialization", "db_commit"]:
+        assert stage in snapshot
+
+    samples = container.db_manager().search(SampleTable)
+    assert samples[0].meta["generation_latency"] >= 0
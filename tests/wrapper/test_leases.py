@@ -0,0 +1,172 @@
+import random
+import threading
+import time
+
+from genai_monitor.common.types import SampleStatus
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.structures.leases import LeaseKeeper
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+started = threading.Event()
+release = threading.Event()
+
+
+def dummy_slow_func(x: float, y: float):
+    started.set()
+    release.wait(timeout=10)
+    return x + y + random.random()  # noqa: S311
+
+
+def _register(container, tmp_settings, registration_params):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    registration_params["func"] = dummy_slow_func
+    register_function(**registration_params)
+
+
+def _abandon_sample(db_manager, sample_id, expires_in):
+    db_manager.update(
+        model=SampleTable,
+        filters={"id": sample_id},
+        values={
+            "status": SampleStatus.IN_PROGRESS.value,
+            "lease_owner": "crashed-host:1:00000000",
+            "lease_expires_at": time.time() + expires_in,
+        },
+    )
+
+
+def test_placeholder_is_leased_until_completion(container, tmp_settings, get_registration_params_for_callable):
+    started.clear()
+    release.clear()
+    _register(container, tmp_settings, get_registration_params_for_callable)
+    lease_keeper = container.lease_keeper()
+    db_manager = container.db_manager()
+
+    thread = threading.Thread(target=dummy_slow_func, args=(1, 2))
+    thread.start()
+    assert started.wait(timeout=10)
+
+    placeholder = db_manager.search(SampleTable, {"status": SampleStatus.IN_PROGRESS.value})[0]
+    assert placeholder.lease_owner == lease_keeper.owner
+    assert placeholder.lease_expires_at > time.time()
+    assert lease_keeper.held() == [placeholder.id]
+
+    release.set()
+    thread.join(timeout=10)
+
+    assert lease_keeper.held() == []
+    assert db_manager.get(SampleTable, placeholder.id).status == SampleStatus.COMPLETE.value
+
+
+def test_waiting_call_takes_over_expired_lease(container, tmp_settings, get_registration_params_for_callable):
+    release.set()
+    _register(container, tmp_settings, get_registration_params_for_callable)
+    lease_keeper = container.lease_keeper()
+    db_manager = container.db_manager()
+
+    first_output = dummy_slow_func(1, 2)
+    sample = db_manager.search(SampleTable)[0]
+    _abandon_sample(db_manager, sample.id, expires_in=-1)
+
+    output = dummy_slow_func(1, 2)
+
+    assert output != first_output
+    taken_over = db_manager.get(SampleTable, sample.id)
+    assert taken_over.status == SampleStatus.COMPLETE.value
+    assert taken_over.lease_owner == lease_keeper.owner
+    assert len(db_manager.search(SampleTable)) == 1
+    assert lease_keeper.held() == []
+    assert dummy_slow_func(1, 2) == output
+
+
+def test_waiting_call_does_not_take_over_live_lease(container, tmp_settings, get_registration_params_for_callable):
+    release.set()
+    container.completion_notifier().timeout = 0.2
+    _register(container, tmp_settings, get_registration_params_for_callable)
+    db_manager = container.db_manager()
+
+    dummy_slow_func(1, 2)
+    sample = db_manager.search(SampleTable)[0]
+    _abandon_sample(db_manager, sample.id, expires_in=60)
+
+    dummy_slow_func(1, 2)
+
+    live = db_manager.get(SampleTable, sample.id)
+    assert live.status == SampleStatus.IN_PROGRESS.value
+    assert live.lease_owner == "crashed-host:1:00000000"
+
+
+def test_generation_does_not_overwrite_taken_over_placeholder(
+    container, tmp_settings, get_registration_params_for_callable
+):
+    started.clear()
+    release.clear()
+    _register(container, tmp_settings, get_registration_params_for_callable)
+    db_manager = container.db_manager()
+
+    thread = threading.Thread(target=dummy_slow_func, args=(1, 2))
+    thread.start()
+    assert started.wait(timeout=10)
+    placeholder = db_manager.search(SampleTable, {"status": SampleStatus.IN_PROGRESS.value})[0]
+    # Another process takes the placeholder over while the model is still running
+    _abandon_sample(db_manager, placeholder.id, expires_in=60)
+
+    release.set()
+    thread.join(timeout=10)
+
+    taken_over = db_manager.get(SampleTable, placeholder.id)
+    assert taken_over.status == SampleStatus.IN_PROGRESS.value
+    assert taken_over.lease_owner == "crashed-host:1:00000000"
+    assert taken_over.hash == placeholder.hash
+    assert container.lease_keeper().held() == []
+
+
+def test_sweep_fails_abandoned_generations(container, tmp_settings, get_registration_params_for_callable):
+    release.set()
+    _register(container, tmp_settings, get_registration_params_for_callable)
+    lease_keeper = container.lease_keeper()
+    db_manager = container.db_manager()
+
+    dummy_slow_func(1, 2)
+    dummy_slow_func(3, 4)
+    abandoned, live = db_manager.search(SampleTable)
+    _abandon_sample(db_manager, abandoned.id, expires_in=-10)
+    _abandon_sample(db_manager, live.id, expires_in=60)
+
+    assert lease_keeper.sweep(db_manager, grace_period=30) == 0
+    assert lease_keeper.sweep(db_manager) == 1
+
+    assert db_manager.get(SampleTable, abandoned.id).status == SampleStatus.FAILED.value
+    assert db_manager.get(SampleTable, live.id).status == SampleStatus.IN_PROGRESS.value
+
+
+def test_heartbeat_renews_held_leases(container, tmp_settings, get_registration_params_for_callable):
+    release.set()
+    _register(container, tmp_settings, get_registration_params_for_callable)
+    lease_keeper = LeaseKeeper(duration=1, heartbeat_interval=0.05)
+    db_manager = container.db_manager()
+
+    dummy_slow_func(1, 2)
+    dummy_slow_func(3, 4)
+    renewed, lost = db_manager.search(SampleTable)
+    for sample in (renewed, lost):
+        db_manager.update(
+            model=SampleTable,
+            filters={"id": sample.id},
+            values={"status": SampleStatus.IN_PROGRESS.value, **lease_keeper.lease_values()},
+        )
+        lease_keeper.hold(db_manager, sample.id)
+    _abandon_sample(db_manager, lost.id, expires_in=60)
+    expires_at = db_manager.get(SampleTable, renewed.id).lease_expires_at
+
+    try:
+        time.sleep(0.3)
+
+        assert db_manager.get(SampleTable, renewed.id).lease_expires_at > expires_at
+        assert lease_keeper.held() == [renewed.id]
+    finally:
+        # Stops the heartbeat, which would otherwise keep committing during the later tests
+        lease_keeper.release(renewed.id)
@@ -0,0 +1,43 @@
+import random
+
+from genai_monitor.registration.api import register_function
+from genai_monitor.structures.cache import ByteBoundedLRUCache
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+
+def dummy_list_output_func(x: float, y: float):
+    return [x + y + random.random()]  # noqa: S311
+
+
+def test_byte_bounded_cache_evicts_above_max_bytes():
+    cache = ByteBoundedLRUCache(maxbytes=10)
+    cache.put("a", 1, size=4)
+    cache.put("b", 2, size=4)
+    assert cache.get("a") == 1
+    cache.put("c", 3, size=4)
+    cache.put("d", 4, size=11)
+
+    assert "b" not in cache
+    assert "d" not in cache
+    assert cache.stats() == {"hits": 1, "misses": 0, "size": 2, "bytes": 8, "maxbytes": 10}
+
+
+def test_output_cache_returns_copies_of_decoded_outputs(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_list_output_func
+    get_registration_params_for_callable["model_output_to_bytes"] = lambda output: str(output[0]).encode()
+    get_registration_params_for_callable["bytes_to_model_output"] = lambda databytes: [float(databytes.decode())]
+    register_function(**get_registration_params_for_callable)
+    output_cache = container.output_cache()
+
+    first_output = dummy_list_output_func(1, 2)
+    second_output = dummy_list_output_func(1, 2)
+    assert output_cache.stats()["misses"] == 1
+    assert len(output_cache) == 1
+
+    second_output.append("modified by the caller")
+    third_output = dummy_list_output_func(1, 2)
+    assert output_cache.stats()["hits"] == 1
+    assert first_output == third_output
@@ -0,0 +1,76 @@
+import random
+
+from genai_monitor.common.structures.data import Artifact
+from genai_monitor.db.schemas.tables import ArtifactTable, SampleTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.structures.sampling import EveryNthSampling, ProbabilisticSampling, RateLimitedSampling
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+
+def dummy_sampled_func(x: float, y: float):
+    return x + y + random.random()  # noqa: S311
+
+
+def test_every_nth_sampling_samples_first_call_of_each_interval():
+    policy = EveryNthSampling(n=3)
+    assert [policy.sample() for _ in range(7)] == [True, False, False, True, False, False, True]
+
+
+def test_probabilistic_sampling_extremes():
+    assert not any(ProbabilisticSampling(rate=0).sample() for _ in range(100))
+    assert all(ProbabilisticSampling(rate=1).sample() for _ in range(100))
+
+
+def test_rate_limited_sampling_caps_burst():
+    policy = RateLimitedSampling(rate=0.001, burst=2)
+    assert [policy.sample() for _ in range(4)] == [True, True, False, False]
+
+
+def test_unsampled_calls_are_not_recorded(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_sampled_func
+    get_registration_params_for_callable["sampling_policy"] = EveryNthSampling(n=2)
+    register_function(**get_registration_params_for_callable)
+
+    outputs = [dummy_sampled_func(x, 1) for x in range(4)]
+
+    assert len(set(outputs)) == 4
+    samples = container.db_manager().search(SampleTable)
+    assert len(samples) == 2
+
+
+def test_unsampled_calls_look_up_existing_generations(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_sampled_func
+    get_registration_params_for_callable["sampling_policy"] = EveryNthSampling(n=100, cache_lookup=True)
+    register_function(**get_registration_params_for_callable)
+
+    recorded_output = dummy_sampled_func(1, 2)
+    looked_up_output = dummy_sampled_func(1, 2)
+    unrecorded_output = dummy_sampled_func(2, 2)
+
+    assert looked_up_output == recorded_output
+    assert unrecorded_output != dummy_sampled_func(2, 2)
+    assert len(container.db_manager().search(SampleTable)) == 1
+
+
+def test_unsampled_calls_discard_pending_artifacts(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_sampled_func
+    get_registration_params_for_callable["sampling_policy"] = EveryNthSampling(n=2)
+    register_function(**get_registration_params_for_callable)
+    runtime_manager = container.runtime_manager()
+
+    dummy_sampled_func(1, 1)
+    runtime_manager.artifacts_for_next_sample.append(Artifact(name="prompt", value="unsampled", hash="abc"))
+    dummy_sampled_func(2, 1)
+    dummy_sampled_func(3, 1)
+
+    assert len(runtime_manager.artifacts_for_next_sample) == 0
+    assert container.db_manager().search(ArtifactTable) == []
@@ -0,0 +1,84 @@
+import random
+import threading
+
+from genai_monitor.common.structures.data import Sample
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.structures.single_flight import SingleFlight
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+calls = []
+release = threading.Event()
+
+
+def dummy_contended_func(x: float, y: float):
+    calls.append((x, y))
+    release.wait(timeout=10)
+    return [x + y + random.random()]  # noqa: S311
+
+
+def test_single_flight_wakes_up_followers():
+    single_flight = SingleFlight()
+    key = ("model", "conditioning", "version", 0)
+    assert single_flight.begin(key, Sample(id=1)) is not None
+    assert single_flight.begin(key, Sample(id=2)) is None
+
+    flight = single_flight.find(key)
+    single_flight.complete(1, "output")
+
+    assert flight.wait(timeout=0)
+    assert flight.model_output == "output"
+    assert single_flight.find(key) is None
+
+
+def test_single_flight_claims_before_reservation():
+    single_flight = SingleFlight()
+    key = ("model", "conditioning", "version", 0)
+    claimed_flight, claimed = single_flight.join(key)
+    followed_flight, followed = single_flight.join(key)
+    assert claimed
+    assert not followed
+    assert followed_flight is claimed_flight
+
+    assert single_flight.begin(key, Sample(id=1)) is claimed_flight
+    single_flight.fail(1)
+    assert claimed_flight.wait(timeout=0)
+    assert claimed_flight.failed
+
+
+def test_single_flight_abandons_unreserved_claims():
+    single_flight = SingleFlight()
+    key = ("model", "conditioning", "version", 0)
+    flight, _ = single_flight.join(key)
+
+    single_flight.abandon(flight, key)
+
+    assert flight.wait(timeout=0)
+    assert flight.failed
+    assert single_flight.find(key) is None
+
+
+def test_concurrent_identical_calls_run_the_model_once(container, tmp_settings, get_registration_params_for_callable):
+    calls.clear()
+    release.clear()
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_contended_func
+    get_registration_params_for_callable["model_output_to_bytes"] = lambda output: str(output[0]).encode()
+    get_registration_params_for_callable["bytes_to_model_output"] = lambda databytes: [float(databytes.decode())]
+    register_function(**get_registration_params_for_callable)
+
+    outputs = []
+    threads = [threading.Thread(target=lambda: outputs.append(dummy_contended_func(1, 2))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert calls == [(1, 2)]
+    assert len(outputs) == 5
+    assert all(output == outputs[0] for output in outputs)
+    assert len({id(output) for output in outputs}) == 5
+    assert len(container.db_manager().search(SampleTable)) == 1
@@ -0,0 +1,131 @@
+import asyncio
+import random
+
+from genai_monitor.common.types import SampleStatus
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+calls = []
+
+
+def split_text(text: str, chunk_size: int):
+    return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def dummy_streamed_func(x: float, y: float, stream: bool = False):
+    calls.append(stream)
+    output = str(x + y + random.random())  # noqa: S311
+    return iter(split_text(output, 2)) if stream else output
+
+
+async def dummy_async_streamed_func(x: float, y: float, stream: bool = False):
+    output = str(x + y + random.random())  # noqa: S311
+    if not stream:
+        return output
+
+    async def chunks():
+        for chunk in split_text(output, 2):
+            await asyncio.sleep(0)
+            yield chunk
+
+    return chunks()
+
+
+def register_streamed_function(container, tmp_settings, registration_params, func):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    registration_params["func"] = func
+    registration_params["model_output_to_bytes"] = lambda output: output.encode()
+    registration_params["bytes_to_model_output"] = lambda databytes: databytes.decode()
+    registration_params["stream_argument"] = "stream"
+    registration_params["assemble_stream"] = "".join
+    registration_params["stream_model_output"] = split_text
+    register_function(**registration_params)
+
+
+def test_streamed_output_is_recorded_and_replayed(container, tmp_settings, get_registration_params_for_callable):
+    register_streamed_function(container, tmp_settings, get_registration_params_for_callable, dummy_streamed_func)
+    calls.clear()
+
+    streamed_output = "".join(dummy_streamed_func(1, 2, stream=True))
+    output = dummy_streamed_func(1, 2)
+    replayed_chunks = list(dummy_streamed_func(1, 2, stream=True))
+
+    assert calls == [True]
+    assert output == streamed_output
+    assert replayed_chunks == split_text(streamed_output, 16)
+    samples = container.db_manager().search(SampleTable)
+    assert [sample.status for sample in samples] == [SampleStatus.COMPLETE.value]
+
+
+def test_closed_stream_fails_the_generation(container, tmp_settings, get_registration_params_for_callable):
+    register_streamed_function(container, tmp_settings, get_registration_params_for_callable, dummy_streamed_func)
+    calls.clear()
+
+    stream = dummy_streamed_func(1, 2, stream=True)
+    next(stream)
+    stream.close()
+    output = dummy_streamed_func(1, 2)
+
+    assert calls == [True, False]
+    assert output == dummy_streamed_func(1, 2)
+    samples = container.db_manager().search(SampleTable)
+    assert sorted(sample.status for sample in samples) == sorted(
+        [SampleStatus.FAILED.value, SampleStatus.COMPLETE.value]
+    )
+
+
+def test_async_streamed_output_is_recorded_and_replayed(container, tmp_settings, get_registration_params_for_callable):
+    register_streamed_function(container, tmp_settings, get_registration_params_for_callable, dummy_async_streamed_func)
+
+    async def consume(stream):
+        return [chunk async for chunk in stream]
+
+    async def run_inferences():
+        streamed_chunks = await consume(await dummy_async_streamed_func(1, 2, stream=True))
+        replayed_chunks = await consume(await dummy_async_streamed_func(1, 2, stream=True))
+        return streamed_chunks, replayed_chunks, await dummy_async_streamed_func(1, 2)
+
+    streamed_chunks, replayed_chunks, output = asyncio.run(run_inferences())
+    assert "".join(streamed_chunks) == "".join(replayed_chunks) == output
+    assert len(container.db_manager().search(SampleTable)) == 1
+
+
+def test_dropped_stream_fails_the_generation(container, tmp_settings, get_registration_params_for_callable):
+    register_streamed_function(container, tmp_settings, get_registration_params_for_callable, dummy_streamed_func)
+    calls.clear()
+
+    stream = dummy_streamed_func(1, 2, stream=True)
+    next(stream)
+    del stream
+    output = dummy_streamed_func(1, 2)
+
+    assert calls == [True, False]
+    assert container.lease_keeper().held() == []
+    samples = container.db_manager().search(SampleTable)
+    assert sorted(sample.status for sample in samples) == sorted(
+        [SampleStatus.FAILED.value, SampleStatus.COMPLETE.value]
+    )
+    assert output == dummy_streamed_func(1, 2)
+
+
+def test_dropped_async_stream_fails_the_generation(container, tmp_settings, get_registration_params_for_callable):
+    register_streamed_function(container, tmp_settings, get_registration_params_for_callable, dummy_async_streamed_func)
+
+    async def drop_stream():
+        stream = await dummy_async_streamed_func(1, 2, stream=True)
+        await stream.__anext__()
+        del stream
+        # The abort is scheduled on the event loop and runs the bookkeeping in a worker thread
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if not container.lease_keeper().held():
+                break
+
+    asyncio.run(drop_stream())
+
+    assert container.lease_keeper().held() == []
+    samples = container.db_manager().search(SampleTable)
+    assert [sample.status for sample in samples] == [SampleStatus.FAILED.value]
@@ -0,0 +1,66 @@
+import random
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from genai_monitor.registration.api import register_function
+from genai_monitor.utils.auto_mode_configuration import load_config
+
+
+def dummy_tracked_func(x: float, y: float):
+    return x + y + random.random()  # noqa: S311
+
+
+def test_tracked_call_commits_at_most_twice(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_tracked_func
+    register_function(**get_registration_params_for_callable)
+
+    commits = []
+
+    def count_commit(session):
+        commits.append(session)
+
+    event.listen(Session, "after_commit", count_commit)
+    try:
+        first_output = dummy_tracked_func(1, 2)
+        commits_first_call = len(commits)
+        second_output = dummy_tracked_func(1, 2)
+        commits_second_call = len(commits) - commits_first_call
+    finally:
+        event.remove(Session, "after_commit", count_commit)
+
+    assert first_output == second_output
+    assert commits_first_call <= 2
+    assert commits_second_call <= 2
+
+
+def test_existing_generation_lookup_reads_only_chosen_sample(
+    container, tmp_settings, get_registration_params_for_callable
+):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api"])
+    get_registration_params_for_callable["func"] = dummy_tracked_func
+    get_registration_params_for_callable["max_unique_instances"] = 5
+    register_function(**get_registration_params_for_callable)
+    outputs = [dummy_tracked_func(1, 2) for _ in range(5)]
+
+    sample_queries = []
+
+    def count_sample_query(conn, cursor, statement, *args):
+        # Lazy loads of relationships (e.g. `conditioning.samples`) are not lookups of the generation slots
+        if "FROM sample" in statement and "= sample." not in statement:
+            sample_queries.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", count_sample_query)
+    try:
+        output = dummy_tracked_func(1, 2)
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_sample_query)
+
+    assert output == outputs[0]
+    assert len(sample_queries) == 2
@@ -0,0 +1,62 @@
+import random
+import threading
+
+from genai_monitor.common.types import SampleStatus
+from genai_monitor.db.config import SessionManager
+from genai_monitor.db.manager import DBManager
+from genai_monitor.db.schemas.tables import SampleTable
+from genai_monitor.registration.api import register_function
+from genai_monitor.structures.write_behind_queue import WriteBehindQueue
+from genai_monitor.utils.auto_mode_configuration import load_config
+from genai_monitor.write_behind import disable_write_behind, enable_write_behind, flush_write_behind
+
+
+def dummy_write_behind_func(x: float, y: float):
+    return x + y + random.random()  # noqa: S311
+
+
+def test_write_behind_records_outputs_in_background(container, tmp_settings, get_registration_params_for_callable):
+    config = load_config(tmp_settings.get("db.url")["value"], tmp_settings)
+    container.config.from_dict(config.model_dump())
+    container.wire(["genai_monitor.registration.api", "genai_monitor.write_behind"])
+    get_registration_params_for_callable["func"] = dummy_write_behind_func
+    get_registration_params_for_callable["max_unique_instances"] = 3
+    register_function(**get_registration_params_for_callable)
+
+    enable_write_behind(max_batch_size=10, max_delay_ms=10)
+    try:
+        outputs = [dummy_write_behind_func(1, 2) for _ in range(3)]
+        assert container.runtime_manager().latest_sample is not None
+        assert flush_write_behind(timeout=10)
+
+        samples = container.db_manager().search(SampleTable)
+        assert len(samples) == 3
+        assert {sample.generation_id for sample in samples} == {0, 1, 2}
+        assert all(sample.status == SampleStatus.COMPLETE.value for sample in samples)
+        assert len(set(outputs)) == 3
+        assert dummy_write_behind_func(1, 2) == outputs[0]
+    finally:
+        disable_write_behind()
+
+    assert container.write_behind_queue().pending == 0
+
+
+def test_failing_commit_callback_does_not_stop_the_worker(tmp_path):
+    db_manager = DBManager(session_manager=SessionManager(database_url=f"sqlite:///{tmp_path / 'queue.db'}"))
+    queue = WriteBehindQueue(max_batch_size=1, max_delay_ms=1)
+    committed = []
+
+    def failing_callback():
+        raise RuntimeError("callback failed")
+
+    queue.enable()
+    try:
+        queue.submit(db_manager, job=lambda: None, on_commit=failing_callback)
+        queue.submit(db_manager, job=lambda: None, on_commit=lambda: committed.append(threading.current_thread()))
+        assert queue.flush(timeout=10)
+    finally:
+        queue.disable()
+
+    # The worker survived the failing callback, so the second job was not written synchronously by the caller
+    assert len(committed) == 1
+    assert committed[0] is not threading.current_thread()